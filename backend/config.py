@@ -17,11 +17,58 @@ SMS_TEMPLATE_CODE = os.getenv("SMS_TEMPLATE_CODE", "")
 # OpenAI配置
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
+# LLM调用配置
+LLM_CONFIG = {
+    'backend': os.getenv("LLM_BACKEND", "openai"),  # openai, stub
+    'model': 'gpt-4',
+    'requests_per_minute': 60,
+    'tokens_per_minute': 40000,
+    'default_completion_tokens': 800,   # 未指定 max_tokens 时预留的输出token
+    'max_retries': 4,
+    'retry_base_delay': 1.0,
+    'retry_max_delay': 20.0,
+    'request_timeout': 120
+}
+
+# LLM响应缓存配置
+LLM_CACHE_CONFIG = {
+    'backend': os.getenv("LLM_CACHE_BACKEND", "disk"),  # disk, mongo, memory
+    'disk_path': os.getenv("LLM_CACHE_DIR", ".cache/llm"),
+    'ttl_seconds': 7 * 24 * 3600,
+    'max_memory_entries': 2000,
+    'max_disk_entries': 50000,
+    'semantic_enabled': os.getenv("LLM_SEMANTIC_CACHE", "0") == "1",
+    'similarity_threshold': 0.97,
+    'max_semantic_entries': 5000,
+    'embedding_model': 'text-embedding-ada-002'
+}
+
 # 数据分析配置
 ANALYSIS_CONFIG = {
     'min_data_points': 10,
     'max_clusters': 5,
-    'sentiment_threshold': 0.5
+    'sentiment_threshold': 0.5,
+    'minibatch_threshold': 20000,     # 超过该样本数改用 MiniBatchKMeans 分块训练
+    'cluster_chunk_size': 8192,       # 分块训练与预测的批大小
+    'silhouette_sample_size': 5000,   # 自动选择 k 时轮廓系数的采样数
+    'random_state': 42,
+    # 特征定义：kind 为 numeric 时取数值，为 length 时取字符串长度
+    'features': [
+        {'name': 'value', 'source': 'value', 'kind': 'numeric', 'default': 0},
+        {'name': 'text_length', 'source': 'text', 'kind': 'length', 'default': ''},
+        {'name': 'importance', 'source': 'importance', 'kind': 'numeric', 'default': 0}
+    ],
+    'feature_dtype': 'float64',
+    'sentiment_workers': 4,           # 情感分析进程池大小
+    'sentiment_chunk_size': 500,      # 每个进程任务处理的文本数
+    'sentiment_inline_max': 50,       # 未命中缓存的文本不超过该数量时在当前进程计算
+    'sentiment_max_inflight': 8,      # 流式处理时同时提交的分块数
+    'sentiment_cache_size': 100000,
+    'trend_chunk_size': 100000,       # 趋势分析每次处理的记录数
+    'trend_window_size': 100,         # 窗口回归的数据点数
+    'trend_max_windows': 1000,        # 结果中保留的最近窗口数
+    'trend_max_change_points': 100,
+    'change_point_z': 4.0             # 相邻窗口均值差异的 z 值阈值
 }
 
 # 风险评估配置
@@ -32,5 +79,123 @@ RISK_CONFIG = {
         'high': {'color': 'red', 'score_range': (0.6, 1.0)},
         'medium': {'color': 'yellow', 'score_range': (0.3, 0.6)},
         'low': {'color': 'green', 'score_range': (0, 0.3)}
-    }
-} 
\ No newline at end of file
+    },
+    'monte_carlo_samples': 5000,
+    'correlation': 0.3,             # 风险因素之间的相关系数（共同冲击）
+    'uncertainty': 0.5,             # 概率和影响在 logit 尺度上的扰动标准差
+    'max_chunk_elements': 2000000,  # 单批采样的最大元素数，限制内存
+    'max_total_elements': 20000000, # 采样总元素数上限，风险因素很多时减少采样次数
+    'min_monte_carlo_samples': 200,
+    'default_probability': 0.6,     # 选项缺点未给出概率和影响时的默认值
+    'default_impact': 0.6,
+    'profile_cache_size': 10000     # 选项风险画像缓存条目数
+}
+
+# 调研抓取配置
+RESEARCH_CONFIG = {
+    'max_concurrency': 20,        # 全局并发抓取上限
+    'per_host_concurrency': 2,    # 单个主机并发上限
+    'deadline_seconds': 60,       # 单次调研截止时间
+    'deadline_grace_seconds': 2,  # 截止后等待已完成页面记录和进度回调的时间
+    'results_per_query': 5,
+    'search_workers': 4,          # DuckDuckGo 同步搜索的线程池大小
+    'max_content_chars': 5000,    # 每个页面保留的文本长度
+    'html_parser': 'auto',        # auto, selectolax, lxml, html.parser, streaming
+    'parse_workers': 2,           # HTML解析进程池大小
+    'parse_inline_max_bytes': 16 * 1024,  # 小页面直接解析，避免进程间传输开销
+    'max_page_bytes': 1024 * 1024,        # 单个页面最多读取的字节数
+    'read_chunk_bytes': 16 * 1024,
+    'charset_sniff_bytes': 4096,          # 响应头未声明编码时，从页面开头的字节判断编码
+    'fallback_charset': 'gb18030',        # 既无声明又不是合法 UTF-8 时使用（兼容 GBK/GB2312）
+    'allowed_content_types': ('text/html', 'application/xhtml+xml')
+}
+
+# HTTP客户端配置
+HTTP_CONFIG = {
+    'pool_limit': 100,            # 连接池总连接数
+    'pool_limit_per_host': 8,     # 单主机连接数
+    'dns_cache_ttl': 300,
+    'keepalive_timeout': 30,
+    'connect_timeout': 5,
+    'read_timeout': 15,
+    'total_timeout': 30,
+    'user_agent': 'Mozilla/5.0 (compatible; ResearchAssistant/1.0)'
+}
+
+# 网页缓存配置
+PAGE_CACHE_CONFIG = {
+    'backend': os.getenv("PAGE_CACHE_BACKEND", "disk"),  # disk, mongo, memory
+    'disk_path': os.getenv("PAGE_CACHE_DIR", ".cache/pages"),
+    'ttl_seconds': 24 * 3600,     # 超过TTL后通过条件请求重新验证
+    'retention_seconds': 7 * 24 * 3600,  # Mongo 后端保留时间，过期条目仍可用于条件请求
+    'max_memory_entries': 1000,
+    'max_disk_entries': 20000
+}
+
+# 后台任务队列配置
+JOB_QUEUE_CONFIG = {
+    'workers': 4,                  # 并发执行的任务数
+    'max_queued': 1000,            # 排队任务上限，超出时拒绝提交
+    'min_priority': 0,             # 优先级取值范围，越小越先执行，超出范围的取边界值
+    'max_priority': 9,
+    'default_priority': 5,
+    'job_retention_seconds': 3600  # 任务结束后保留状态的时间
+}
+
+# 决策分析配置
+DECISION_CONFIG = {
+    'sensitivity_samples': 2000,       # 权重扰动采样数
+    'sensitivity_batch_size': 250,
+    'sensitivity_budget_ms': 50,       # 单次请求的敏感性分析时间预算
+    'min_sensitivity_samples': 16,
+    'score_rtol': 1e-9,                # 增量更新后比较得分时允许的浮点误差
+    'score_atol': 1e-12,
+    # 预估吞吐量（每毫秒处理的矩阵元素数），按问题规模折算采样数；固定种子时采样数只取决于规模，结果可复现
+    'sensitivity_elements_per_ms': 2000000,
+    'break_even_elements_per_ms': 60000,
+    'dirichlet_concentration': 50,     # 越大采样权重越接近用户给定权重
+    'score_noise': 0.05,               # 得分扰动标准差（相对于得分量级）
+    'report_top_k': 10,
+    'max_batch_size': 1000,            # 批量分析的决策数上限
+    'batch_sensitivity_budget_ms': 500, # 批量分析时所有决策共享的敏感性分析时间预算
+    'batch_max_tensor_elements': 5000000, # 同形状决策堆叠计算时单个张量的元素上限
+    'session_cache_size': 1000,         # 保留分析状态用于增量更新的决策数
+    'session_ttl_seconds': 1800
+}
+
+# 认证缓存配置
+AUTH_CACHE_CONFIG = {
+    'token_cache_size': 10000,
+    'token_ttl_seconds': 300,      # 已解码 token 的缓存时间，不超过 token 自身的过期时间
+    'user_cache_size': 10000,
+    'user_ttl_seconds': 60,        # 用户信息缓存时间，多进程部署时决定修改后的最长可见延迟
+    'single_flight': True          # 合并同一用户的并发查询
+}
+
+# 权限索引配置
+PERMISSION_INDEX_CONFIG = {
+    'rebuild_interval_seconds': 300,  # 定期全量重建，兜底其它进程的修改
+    'watch_changes': os.getenv("PERMISSION_WATCH_CHANGES", "0") == "1",  # 需要副本集才能使用 change stream
+    'denormalize': False              # 是否把用户权限集合写入 user_permissions 集合
+}
+
+# 密码加密配置
+PASSWORD_CONFIG = {
+    'algorithm': os.getenv("PASSWORD_ALGORITHM", "scrypt"),  # scrypt, bcrypt, argon2
+    'cost': None,                   # None 时使用算法默认成本
+    'executor': 'thread',           # thread 或 process；scrypt/bcrypt/argon2 计算时均释放 GIL
+    'workers': os.cpu_count() or 4,
+    'max_pending': 256,             # 同时排队的加密请求上限，超出后等待
+    'calibrate_on_startup': False,  # 启动时按目标耗时校准成本
+    'target_ms': 50                 # 单次加密的目标耗时
+}
+
+# 登录记录批量写入配置
+LOGIN_WRITER_CONFIG = {
+    'batch_size': 500,              # 达到该数量立即写入
+    'flush_interval_seconds': 1.0,  # 首条记录入队后最长等待时间
+    'max_queued': 10000,            # 队列上限，写满后登录请求等待
+    'enqueue_timeout': 0.5,         # 队列满时的最长等待，超时丢弃该条记录
+    'max_retries': 3,
+    'shutdown_timeout': 10          # 关闭时写完剩余记录的最长时间
+}
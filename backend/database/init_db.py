@@ -1,5 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from config import MONGODB_URL
+from config import MONGODB_URL, PAGE_CACHE_CONFIG, LLM_CACHE_CONFIG
 import asyncio
 
 async def init_database():
@@ -34,6 +34,9 @@ async def init_database():
     await db.create_collection("role_permissions")
     await db.role_permissions.create_index([("role_id", 1), ("permission_id", 1)], unique=True)
     
+    # 用户权限集合（权限索引的反规范化副本，_id 为用户ID）
+    await db.create_collection("user_permissions")
+    
     # 用户登录历史记录
     await db.create_collection("login_history")
     await db.login_history.create_index("user_id")
@@ -54,6 +57,14 @@ async def init_database():
     await db.goals.create_index("user_id")
     await db.goals.create_index([("status", 1), ("category", 1)])
     await db.goals.create_index("end_date")  # 用于查询即将到期的目标
+    
+    # 调研网页缓存
+    await db.create_collection("page_cache")
+    await db.page_cache.create_index("stored_at", expireAfterSeconds=PAGE_CACHE_CONFIG['retention_seconds'])
+    
+    # LLM响应缓存
+    await db.create_collection("llm_cache")
+    await db.llm_cache.create_index("stored_at", expireAfterSeconds=LLM_CACHE_CONFIG['ttl_seconds'])
 
     print("数据库初始化完成")
 
@@ -1,16 +1,34 @@
-from fastapi import FastAPI, HTTPException, Depends, Query, Body
+from fastapi import FastAPI, HTTPException, Depends, Query, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta
 import jwt
+from jwt import PyJWTError as JWTError
 from models import *
 from database import *
 from schemas import *
 import random
+import json
+import asyncio
 from utils.sms import send_sms
-from utils.encrypt import encrypt_password
+from utils.password_hasher import password_hasher
+from utils.login_writer import login_writer
 from typing import List, Dict, Any
 from utils.research_assistant import ResearchAssistant
 from utils.decision_support import DecisionSupport, DecisionOption, DecisionCriterion
+from config import DECISION_CONFIG, PASSWORD_CONFIG
+from utils.cache import TTLCache, KeyedLock
+from utils.http_client import http_client
+from utils.search_provider import default_search_provider
+from utils.page_cache import page_cache
+from utils.html_extract import shutdown_parse_pool
+from utils.data_analysis import shutdown_sentiment_pool
+from utils.llm_gateway import llm_gateway
+from utils.llm_helper import LLMHelper
+from utils.job_queue import job_queue, Job
+from utils.auth_cache import auth_cache
+from utils.permission_index import permission_index
 
 app = FastAPI()
 
@@ -23,14 +41,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup():
+    # 创建共享HTTP连接池
+    await http_client.start()
+    await job_queue.start()
+    await permission_index.start()
+    await login_writer.start()
+    if PASSWORD_CONFIG['calibrate_on_startup']:
+        await password_hasher.calibrate()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await permission_index.stop()
+    await login_writer.stop()
+    await job_queue.stop()
+    await http_client.close()
+    default_search_provider.close()
+    shutdown_parse_pool()
+    shutdown_sentiment_pool()
+    await llm_gateway.close()
+    password_hasher.close()
+
+# 决策分析状态，PATCH 时增量更新
+decision_sessions = TTLCache(
+    max_size=DECISION_CONFIG['session_cache_size'],
+    ttl=DECISION_CONFIG['session_ttl_seconds']
+)
+# 同一决策的 PATCH 请求串行执行
+decision_locks = KeyedLock()
+
 # JWT配置
 SECRET_KEY = "your-secret-key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 
 # 用户登录
 @app.post("/api/login", response_model=TokenResponse)
-async def login(login_data: LoginRequest):
+async def login(login_data: LoginRequest, request: Request):
+    new_password_hash = None
     # 验证手机号登录
     if login_data.phone:
         # 验证验证码
@@ -47,7 +97,11 @@ async def login(login_data: LoginRequest):
     # 验证邮箱登录
     elif login_data.email:
         user = await User.find_one({"email": login_data.email})
-        if not user or user.password != encrypt_password(login_data.password):
+        if not user:
+            raise HTTPException(status_code=400, detail="邮箱或密码错误")
+        valid, new_password_hash = await password_hasher.verify_and_upgrade(login_data.password, user.password)
+        if not valid:
+            await record_login(request, user, "email", "failed", "密码错误")
             raise HTTPException(status_code=400, detail="邮箱或密码错误")
     
     else:
@@ -59,11 +113,16 @@ async def login(login_data: LoginRequest):
     # 生成token
     access_token = create_access_token(data={"sub": str(user.id)})
     
-    # 更新用户登录时间
-    await User.update_one(
-        {"_id": user.id},
-        {"$set": {"last_login_time": datetime.now()}}
-    )
+    # 旧格式或低成本的密码哈希在登录成功时升级
+    if new_password_hash:
+        await User.update_one(
+            {"_id": user.id},
+            {"$set": {"password": new_password_hash}}
+        )
+        auth_cache.invalidate_user(str(user.id))
+
+    # 登录记录和最后登录时间由后台批量写入
+    await record_login(request, user, "phone" if login_data.phone else "email", "success")
 
     return {
         "access_token": access_token,
@@ -71,6 +130,16 @@ async def login(login_data: LoginRequest):
         "user_info": user.dict(exclude={"password"})
     }
 
+async def record_login(request: Request, user: User, login_type: str, status: str, fail_reason: str = None):
+    await login_writer.record(
+        user_id=user.id,
+        login_type=login_type,
+        status=status,
+        login_ip=request.client.host if request.client else "",
+        device_info=request.headers.get("user-agent", ""),
+        fail_reason=fail_reason
+    )
+
 # 用户注册
 @app.post("/api/register", response_model=RegisterResponse)
 async def register(register_data: RegisterRequest):
@@ -90,7 +159,7 @@ async def register(register_data: RegisterRequest):
         email=register_data.email,
         nickname=register_data.nickname,
         avatar_url=register_data.avatar_url,
-        password=encrypt_password(register_data.password),
+        password=await password_hasher.hash(register_data.password),
         create_time=datetime.now(),
         update_time=datetime.now()
     )
@@ -134,21 +203,35 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 # 验证token
+def decode_access_token(token: str) -> dict:
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+async def load_user(user_id: str):
+    return await User.find_one({"_id": ObjectId(user_id)})
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = auth_cache.decode_token(token, decode_access_token)
         user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="无效的认证信息")
     except JWTError:
         raise HTTPException(status_code=401, detail="无效的认证信息")
         
-    user = await User.find_one({"_id": ObjectId(user_id)})
+    user = await auth_cache.get_user(user_id, load_user)
     if user is None:
         raise HTTPException(status_code=404, detail="用户不存在")
         
     return user 
 
+def require_permission(permission: str):
+    """接口权限校验依赖，只查内存中的权限索引"""
+    async def check_permission(current_user: User = Depends(get_current_user)):
+        if not permission_index.has_permission(str(current_user.id), permission):
+            raise HTTPException(status_code=403, detail="没有操作权限")
+        return current_user
+    return check_permission
+
 # 调研相关API
 @app.post("/api/research", response_model=Research)
 async def create_research(research: Research, current_user: User = Depends(get_current_user)):
@@ -192,6 +275,53 @@ async def get_decision(decision_id: str, current_user: User = Depends(get_curren
         raise HTTPException(status_code=404, detail="Decision not found")
     return decision
 
+@app.patch("/api/decisions/{decision_id}", response_model=Dict[str, Any])
+async def patch_decision(
+    decision_id: str,
+    patch_data: Dict[str, Any] = Body(...),
+    current_user: User = Depends(get_current_user)
+):
+    """增量修改决策（增删改选项、调整权重），只返回变化部分"""
+    session_key = (str(current_user.id), decision_id)
+    # 同一决策的修改串行执行，保证增量状态和保存顺序一致
+    async with decision_locks.acquire(session_key):
+        support = decision_sessions.get(session_key)
+        if support is None:
+            decision = await db.decisions.find_one({
+                "_id": ObjectId(decision_id),
+                "user_id": current_user.id
+            })
+            if not decision:
+                raise HTTPException(status_code=404, detail="Decision not found")
+            support = build_decision_support(decision)
+            support.analyze_decision()
+            decision_sessions.set(session_key, support)
+    
+        try:
+            diff = support.apply_changes(
+                patch_data.get("operations", []),
+                recompute_sensitivity=patch_data.get("recompute_sensitivity", False)
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            # 状态可能已部分修改，下次从数据库重建
+            decision_sessions.delete(session_key)
+            raise HTTPException(status_code=400, detail=f"无效的修改: {str(e)}")
+    
+        await db.decisions.update_one(
+            {"_id": ObjectId(decision_id), "user_id": current_user.id},
+            {"$set": {
+                **support.to_dict(),
+                "analysis": support.report,
+                "update_time": datetime.now()
+            }}
+        )
+
+    return {
+        "success": True,
+        "decision_id": decision_id,
+        "diff": diff
+    }
+
 # 目标相关API
 @app.post("/api/goals", response_model=Goal)
 async def create_goal(goal: Goal, current_user: User = Depends(get_current_user)):
@@ -284,7 +414,15 @@ async def create_auto_research(
         focus_areas=research_data.get("focus_areas")
     )
     
-    # 保存调研结果
+    research_id = await save_auto_research(research_data, results, current_user)
+    return {
+        "success": True,
+        "research_id": research_id,
+        "results": results
+    }
+
+async def save_auto_research(research_data: Dict[str, Any], results: Dict[str, Any], current_user: User) -> str:
+    """保存调研结果"""
     research = Research(
         user_id=current_user.id,
         title=research_data["title"],
@@ -299,12 +437,173 @@ async def create_auto_research(
     )
     
     result = await db.research.insert_one(research.dict())
+    return str(result.inserted_id)
+
+def sse_event(event: str, data: Any) -> str:
+    """格式化一条 server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+def sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# 流式调研：先返回调研结果，再逐段返回LLM总结
+@app.post("/api/research/auto/stream")
+async def stream_auto_research(
+    research_data: Dict[str, Any],
+    current_user: User = Depends(get_current_user)
+):
+    """自动执行调研并以SSE流式返回LLM总结"""
+    async def events():
+        yield sse_event("start", {"title": research_data["title"]})
+        
+        assistant = ResearchAssistant()
+        results = await assistant.start_research(
+            topic=research_data["title"],
+            focus_areas=research_data.get("focus_areas")
+        )
+        yield sse_event("findings", results)
+        
+        findings_text = "\n\n".join(
+            f"{finding['title']}\n{finding['content'][:500]}" for finding in results["findings"]
+        )
+        summary_parts = []
+        async for delta in LLMHelper.stream_analyze_text(
+            findings_text,
+            f"你是一个专业的研究分析师，请针对主题“{research_data['title']}”总结以下调研发现的关键结论、趋势和建议。"
+        ):
+            summary_parts.append(delta)
+            yield sse_event("token", delta)
+        
+        results["summary"]["llm_summary"] = "".join(summary_parts)
+        research_id = await save_auto_research(research_data, results, current_user)
+        yield sse_event("done", {"research_id": research_id})
+    
+    return sse_response(events())
+
+# 调研任务：提交后立即返回任务ID，后台执行并增量保存结果
+@app.post("/api/research/jobs", response_model=Dict[str, Any])
+async def submit_research_job(
+    research_data: Dict[str, Any],
+    current_user: User = Depends(get_current_user)
+):
+    """提交后台调研任务"""
+    research = Research(
+        user_id=current_user.id,
+        title=research_data["title"],
+        description=research_data.get("description", ""),
+        research_type=research_data["research_type"],
+        status="in_progress",
+        data_sources=[],
+        findings=[],
+        create_time=datetime.now(),
+        update_time=datetime.now()
+    )
+    result = await db.research.insert_one(research.dict())
+    
+    try:
+        job = job_queue.submit(
+            run_research_job,
+            result.inserted_id,
+            research_data,
+            priority=research_data.get("priority"),
+            owner=current_user.id,
+            on_cancel=cancel_queued_research
+        )
+    except (asyncio.QueueFull, ValueError) as e:
+        await db.research.update_one(
+            {"_id": result.inserted_id},
+            {"$set": {"status": "failed", "update_time": datetime.now()}}
+        )
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=503, detail="调研任务队列已满，请稍后重试")
+    
     return {
         "success": True,
-        "research_id": str(result.inserted_id),
-        "results": results
+        "job_id": job.id,
+        "research_id": str(result.inserted_id)
     }
 
+async def run_research_job(job: Job, research_id: ObjectId, research_data: Dict[str, Any]) -> Dict[str, Any]:
+    """执行调研任务，每个查询完成后把新发现写入 db.research"""
+    async def save_progress(findings: List[Dict[str, Any]], progress: Dict[str, Any]):
+        update = {"$set": {"progress": progress, "update_time": datetime.now()}}
+        if findings:
+            update["$push"] = {"findings": {"$each": findings}}
+            update["$addToSet"] = {"data_sources": {"$each": [f["source"] for f in findings]}}
+        await db.research.update_one({"_id": research_id}, update)
+        await job.report(**progress, new_findings=findings)
+    
+    assistant = ResearchAssistant(on_progress=save_progress)
+    try:
+        results = await assistant.start_research(
+            topic=research_data["title"],
+            focus_areas=research_data.get("focus_areas")
+        )
+    except asyncio.CancelledError:
+        await db.research.update_one(
+            {"_id": research_id},
+            {"$set": {"status": "cancelled", "update_time": datetime.now()}}
+        )
+        raise
+    except Exception:
+        await db.research.update_one(
+            {"_id": research_id},
+            {"$set": {"status": "failed", "update_time": datetime.now()}}
+        )
+        raise
+    
+    await db.research.update_one(
+        {"_id": research_id},
+        {"$set": {
+            "status": "completed",
+            "summary": results["summary"],
+            "partial": results["partial"],
+            "update_time": datetime.now()
+        }}
+    )
+    return {"research_id": str(research_id)}
+
+async def cancel_queued_research(job: Job):
+    """任务开始前被取消（含应用关闭）时 run_research_job 不会执行，在这里更新调研状态"""
+    await db.research.update_one(
+        {"_id": job.args[0]},
+        {"$set": {"status": "cancelled", "update_time": datetime.now()}}
+    )
+
+def get_user_job(job_id: str, current_user: User) -> Job:
+    job = job_queue.get(job_id)
+    if job is None or job.owner != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/research/jobs/{job_id}", response_model=Dict[str, Any])
+async def get_research_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """查询调研任务状态"""
+    job = get_user_job(job_id, current_user)
+    return {**job.to_dict(), "research_id": str(job.args[0])}
+
+@app.get("/api/research/jobs/{job_id}/stream")
+async def stream_research_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """以SSE推送调研任务进度和新发现"""
+    job = get_user_job(job_id, current_user)
+    
+    async def events():
+        async for event, data in job.events():
+            yield sse_event(event, data)
+    
+    return sse_response(events())
+
+@app.delete("/api/research/jobs/{job_id}", response_model=BaseResponse)
+async def cancel_research_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """取消调研任务，已保存的发现会保留"""
+    job = get_user_job(job_id, current_user)
+    return {"success": job_queue.cancel(job.id)}
+
 # 分析决策
 @app.post("/api/decisions/analyze", response_model=Dict[str, Any])
 async def analyze_decision(
@@ -312,6 +611,20 @@ async def analyze_decision(
     current_user: User = Depends(get_current_user)
 ):
     """分析决策并提供建议"""
+    support = build_decision_support(decision_data)
+    
+    # 执行决策分析
+    analysis = support.analyze_decision(seed=decision_data.get("sensitivity_seed"))
+    
+    decision_id = await save_decision(decision_data, analysis, current_user)
+    return {
+        "success": True,
+        "decision_id": decision_id,
+        "analysis": analysis
+    }
+
+def build_decision_support(decision_data: Dict[str, Any]) -> DecisionSupport:
+    """根据请求数据构建决策分析器"""
     support = DecisionSupport()
     
     # 添加决策标准
@@ -329,14 +642,15 @@ async def analyze_decision(
             description=option["description"],
             pros=option.get("pros", []),
             cons=option.get("cons", []),
-            criteria_scores=option["criteria_scores"]
+            criteria_scores=option["criteria_scores"],
+            risks=option.get("risks", [])
         ))
     
-    # 执行决策分析
-    analysis = support.analyze_decision()
-    
-    # 保存决策记录
-    decision = Decision(
+    return support
+
+def build_decision_document(decision_data: Dict[str, Any], analysis: Dict[str, Any], current_user: User) -> dict:
+    """构建决策记录文档"""
+    return Decision(
         user_id=current_user.id,
         title=decision_data["title"],
         description=decision_data["description"],
@@ -346,11 +660,178 @@ async def analyze_decision(
         status="completed",
         create_time=datetime.now(),
         update_time=datetime.now()
-    )
+    ).dict()
+
+async def save_decision(decision_data: Dict[str, Any], analysis: Dict[str, Any], current_user: User) -> str:
+    """保存决策记录"""
+    result = await db.decisions.insert_one(build_decision_document(decision_data, analysis, current_user))
+    return str(result.inserted_id)
+
+# 批量分析决策
+@app.post("/api/decisions/analyze/batch", response_model=Dict[str, Any])
+async def analyze_decision_batch(
+    batch_data: Dict[str, Any],
+    current_user: User = Depends(get_current_user)
+):
+    """批量分析多个决策方案，逐项返回结果或错误"""
+    decisions = batch_data.get("decisions", [])
+    if len(decisions) > DECISION_CONFIG['max_batch_size']:
+        raise HTTPException(status_code=400, detail=f"单次最多分析{DECISION_CONFIG['max_batch_size']}个决策")
+    
+    results: List[Dict[str, Any]] = [None] * len(decisions)
+    supports, indexes = [], []
+    for i, decision_data in enumerate(decisions):
+        try:
+            supports.append(build_decision_support(decision_data))
+            indexes.append(i)
+        except (KeyError, TypeError, ValueError) as e:
+            results[i] = {"index": i, "success": False, "error": f"决策数据无效: {str(e)}"}
+    
+    analyses = DecisionSupport.analyze_batch(supports, seed=batch_data.get("sensitivity_seed"))
+    
+    # 成功的决策一次性写入
+    documents, saved = [], []
+    for i, item in zip(indexes, analyses):
+        if not item["success"]:
+            results[i] = {"index": i, **item}
+            continue
+        try:
+            documents.append(build_decision_document(decisions[i], item["analysis"], current_user))
+            saved.append(i)
+        except (KeyError, ValueError) as e:
+            results[i] = {"index": i, "success": False, "error": f"决策数据无效: {str(e)}"}
+            continue
+        results[i] = {"index": i, "success": True, "analysis": item["analysis"]}
+    
+    if documents:
+        inserted = await db.decisions.insert_many(documents)
+        for i, decision_id in zip(saved, inserted.inserted_ids):
+            results[i]["decision_id"] = str(decision_id)
     
-    result = await db.decisions.insert_one(decision.dict())
     return {
         "success": True,
-        "decision_id": str(result.inserted_id),
-        "analysis": analysis
-    } 
\ No newline at end of file
+        "total": len(decisions),
+        "succeeded": len(saved),
+        "results": results
+    }
+
+# 流式决策分析：先返回评分结果，再逐段返回LLM建议
+@app.post("/api/decisions/analyze/stream")
+async def stream_analyze_decision(
+    decision_data: Dict[str, Any],
+    current_user: User = Depends(get_current_user)
+):
+    """分析决策并以SSE流式返回LLM建议"""
+    support = build_decision_support(decision_data)
+    analysis = support.analyze_decision(seed=decision_data.get("sensitivity_seed"))
+    
+    async def events():
+        yield sse_event("analysis", analysis)
+        
+        advice_parts = []
+        async for delta in LLMHelper.stream_decision_criteria(
+            decision_data["options"],
+            decision_data["criteria"]
+        ):
+            advice_parts.append(delta)
+            yield sse_event("token", delta)
+        
+        analysis["llm_advice"] = "".join(advice_parts)
+        decision_id = await save_decision(decision_data, analysis, current_user)
+        yield sse_event("done", {"decision_id": decision_id})
+    
+    return sse_response(events())
+
+# 决策风险评估
+@app.post("/api/decisions/risks", response_model=Dict[str, Any])
+async def assess_decision_risks(
+    decision_data: Dict[str, Any],
+    current_user: User = Depends(get_current_user)
+):
+    """单独评估决策选项的风险，无需决策标准"""
+    try:
+        support = build_decision_support({
+            "criteria": [],
+            "options": [
+                {"criteria_scores": {}, "description": "", **option}
+                for option in decision_data["options"]
+            ]
+        })
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"决策数据无效: {str(e)}")
+    return {
+        "success": True,
+        "risks": support.assess_option_risks(
+            monte_carlo=decision_data.get("monte_carlo", False),
+            seed=decision_data.get("seed")
+        )
+    }
+
+# HTTP连接池统计
+@app.get("/api/metrics/http", response_model=Dict[str, Any])
+async def get_http_metrics(current_user: User = Depends(require_permission("role:manage"))):
+    """查看调研抓取连接池的复用率与耗时统计"""
+    return http_client.get_stats()
+
+# 网页缓存统计
+@app.get("/api/metrics/page-cache", response_model=Dict[str, Any])
+async def get_page_cache_metrics(current_user: User = Depends(require_permission("role:manage"))):
+    """查看调研网页缓存命中情况"""
+    return page_cache.get_stats()
+
+# LLM调用统计
+@app.get("/api/metrics/llm", response_model=Dict[str, Any])
+async def get_llm_metrics(current_user: User = Depends(require_permission("role:manage"))):
+    """查看LLM调用延迟、token用量与限流情况"""
+    return llm_gateway.get_stats()
+
+# 密码加密统计
+@app.get("/api/metrics/password", response_model=Dict[str, Any])
+async def get_password_metrics(current_user: User = Depends(require_permission("role:manage"))):
+    """查看密码加密耗时与旧哈希升级情况"""
+    return password_hasher.get_stats()
+
+# 登录记录写入统计
+@app.get("/api/metrics/login-writer", response_model=Dict[str, Any])
+async def get_login_writer_metrics(current_user: User = Depends(require_permission("role:manage"))):
+    """查看登录记录批量写入的队列与写入情况"""
+    return login_writer.get_stats()
+
+# 认证缓存统计
+@app.get("/api/metrics/auth", response_model=Dict[str, Any])
+async def get_auth_metrics(current_user: User = Depends(require_permission("role:manage"))):
+    """查看token与用户缓存命中情况"""
+    return auth_cache.get_stats()
+
+# 权限索引
+@app.get("/api/metrics/permissions", response_model=Dict[str, Any])
+async def get_permission_metrics(current_user: User = Depends(require_permission("role:manage"))):
+    """查看权限索引状态"""
+    return permission_index.get_stats()
+
+@app.post("/api/admin/permissions/rebuild", response_model=BaseResponse)
+async def rebuild_permission_index(current_user: User = Depends(require_permission("role:manage"))):
+    """用户角色或角色权限被直接修改后，手动重建权限索引"""
+    await permission_index.rebuild()
+    return {"success": True}
+
+# 角色分配与授权：写入后立即刷新权限索引
+@app.post("/api/admin/users/{user_id}/roles/{role_id}", response_model=BaseResponse)
+async def assign_user_role(user_id: str, role_id: str, current_user: User = Depends(require_permission("role:manage"))):
+    await permission_index.assign_role(user_id, role_id)
+    return {"success": True}
+
+@app.delete("/api/admin/users/{user_id}/roles/{role_id}", response_model=BaseResponse)
+async def revoke_user_role(user_id: str, role_id: str, current_user: User = Depends(require_permission("role:manage"))):
+    await permission_index.revoke_role(user_id, role_id)
+    return {"success": True}
+
+@app.post("/api/admin/roles/{role_id}/permissions/{permission_id}", response_model=BaseResponse)
+async def grant_role_permission(role_id: str, permission_id: str, current_user: User = Depends(require_permission("role:manage"))):
+    await permission_index.grant_permission(role_id, permission_id)
+    return {"success": True}
+
+@app.delete("/api/admin/roles/{role_id}/permissions/{permission_id}", response_model=BaseResponse)
+async def revoke_role_permission(role_id: str, permission_id: str, current_user: User = Depends(require_permission("role:manage"))):
+    await permission_index.revoke_permission(role_id, permission_id)
+    return {"success": True}
@@ -0,0 +1,97 @@
+"""测试用的内存替身"""
+import asyncio
+import copy
+import itertools
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from utils.search_provider import SearchProvider
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs if length is None else self.docs[:length]
+
+class FakeCollection:
+    """支持等值和 $in 查询的内存集合，覆盖业务代码用到的 Motor 方法"""
+
+    def __init__(self):
+        self.docs: List[Dict[str, Any]] = []
+        self.bulk_writes: List[List[Any]] = []
+        self._ids = itertools.count(1)
+
+    @staticmethod
+    def _match(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+        for key, expected in (query or {}).items():
+            if isinstance(expected, dict) and "$in" in expected:
+                if doc.get(key) not in expected["$in"]:
+                    return False
+            elif doc.get(key) != expected:
+                return False
+        return True
+
+    def find(self, query=None, projection=None) -> FakeCursor:
+        return FakeCursor([copy.deepcopy(doc) for doc in self.docs if self._match(doc, query)])
+
+    async def find_one(self, query=None, projection=None):
+        docs = self.find(query).docs
+        return docs[0] if docs else None
+
+    async def insert_one(self, doc: Dict[str, Any]):
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", next(self._ids))
+        self.docs.append(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: List[Dict[str, Any]], ordered=True):
+        return SimpleNamespace(inserted_ids=[(await self.insert_one(doc)).inserted_id for doc in docs])
+
+    async def bulk_write(self, requests: List[Any], ordered=True):
+        self.bulk_writes.append(list(requests))
+
+    async def update_one(self, query, update, upsert=False):
+        for doc in self.docs:
+            if self._match(doc, query):
+                doc.update(update.get("$set", {}))
+                return
+        if upsert:
+            self.docs.append({**query, **update.get("$setOnInsert", {}), **update.get("$set", {})})
+
+    async def delete_one(self, query):
+        for i, doc in enumerate(self.docs):
+            if self._match(doc, query):
+                del self.docs[i]
+                return
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection())
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+class FakeSearchProvider(SearchProvider):
+    """内存搜索实现，未配置的查询返回固定格式的结果"""
+
+    def __init__(self, results: Dict[str, List[Dict[str, Any]]] = None, delay: float = 0.0):
+        self.results = results or {}
+        self.delay = delay
+        self.queries: List[str] = []
+
+    async def search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        self.queries.append(query)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if query in self.results:
+            return self.results[query][:max_results]
+        return [
+            {"title": f"{query} {i + 1}", "link": f"https://example.com/{i + 1}?q={query}"}
+            for i in range(max_results)
+        ]
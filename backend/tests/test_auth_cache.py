@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+from utils.auth_cache import AuthCache
+
+def make_decoder(payload):
+    calls = []
+
+    def decode(token):
+        calls.append(token)
+        return dict(payload)
+
+    return decode, calls
+
+def test_token_cache_is_capped_by_expiry():
+    cache = AuthCache({"token_ttl_seconds": 300})
+    decode, calls = make_decoder({"sub": "u1", "exp": time.time() + 0.05})
+    cache.decode_token("short", decode)
+    cache.decode_token("short", decode)
+    assert calls == ["short"]
+    # token 过期后不再使用缓存的载荷
+    time.sleep(0.1)
+    cache.decode_token("short", decode)
+    assert calls == ["short", "short"]
+
+def test_expired_token_is_not_cached():
+    cache = AuthCache()
+    decode, calls = make_decoder({"sub": "u1", "exp": time.time() - 1})
+    cache.decode_token("expired", decode)
+    cache.decode_token("expired", decode)
+    assert calls == ["expired", "expired"]
+    assert len(cache.tokens) == 0
+
+def test_token_cache_uses_configured_ttl_without_expiry():
+    cache = AuthCache({"token_ttl_seconds": 0.05})
+    decode, calls = make_decoder({"sub": "u1", "exp": time.time() + 3600})
+    cache.decode_token("long", decode)
+    time.sleep(0.1)
+    cache.decode_token("long", decode)
+    assert calls == ["long", "long"]
+
+def test_password_change_is_seen_after_invalidation():
+    cache = AuthCache({"user_ttl_seconds": 60})
+    users = {"u1": {"id": "u1", "password": "old-hash"}}
+    loads = []
+
+    async def load(user_id):
+        loads.append(user_id)
+        return dict(users[user_id])
+
+    async def scenario():
+        first = await cache.get_user("u1", load)
+        users["u1"]["password"] = "new-hash"
+        stale = await cache.get_user("u1", load)
+        cache.invalidate_user("u1")
+        fresh = await cache.get_user("u1", load)
+        return first, stale, fresh
+
+    first, stale, fresh = asyncio.run(scenario())
+    assert first["password"] == stale["password"] == "old-hash"
+    assert fresh["password"] == "new-hash"
+    assert loads == ["u1", "u1"]
+
+def test_invalidate_user_accepts_non_string_ids():
+    class UserId:
+        def __str__(self):
+            return "u1"
+
+    cache = AuthCache()
+
+    async def load(user_id):
+        return {"id": user_id}
+
+    asyncio.run(cache.get_user("u1", load))
+    cache.invalidate_user(UserId())
+    assert cache.users.get("u1") is None
+
+def test_concurrent_lookups_are_coalesced():
+    cache = AuthCache({"single_flight": True})
+    loads = []
+
+    async def load(user_id):
+        loads.append(user_id)
+        await asyncio.sleep(0.01)
+        return {"id": user_id}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_user("u1", load) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert all(result == {"id": "u1"} for result in results)
+    assert loads == ["u1"]
+    assert cache.get_stats()["coalesced_lookups"] == 4
+
+def test_invalidation_during_lookup_is_not_overwritten():
+    cache = AuthCache({"single_flight": True})
+    users = {"u1": {"id": "u1", "password": "old-hash"}}
+    started = []
+
+    async def load(user_id):
+        snapshot = dict(users[user_id])
+        started.append(user_id)
+        await asyncio.sleep(0.02)
+        return snapshot
+
+    async def scenario():
+        in_flight = asyncio.ensure_future(cache.get_user("u1", load))
+        await asyncio.sleep(0.005)
+        users["u1"]["password"] = "new-hash"
+        cache.invalidate_user("u1")
+        # 失效之后的查询不复用修改前发起的查询
+        fresh = await cache.get_user("u1", load)
+        stale = await in_flight
+        cached = await cache.get_user("u1", load)
+        return stale, fresh, cached
+
+    stale, fresh, cached = asyncio.run(scenario())
+    assert stale["password"] == "old-hash"
+    assert fresh["password"] == cached["password"] == "new-hash"
+    assert started == ["u1", "u1"]
@@ -0,0 +1,51 @@
+import asyncio
+
+from utils.cache import DiskStore
+
+def test_disk_store_creates_directory_on_first_write(tmp_path):
+    path = tmp_path / "pages"
+    store = DiskStore(str(path), max_entries=2, evict_interval=1)
+    assert not path.exists()
+
+    async def scenario():
+        missing = await store.get("a")
+        for key in "abc":
+            await store.set(key, {"key": key})
+        return missing, [await store.get(key) for key in "abc"]
+
+    missing, entries = asyncio.run(scenario())
+    assert missing is None
+    assert len(list(path.glob("*.json"))) == 2
+    assert entries[-1] == {"key": "c"}
+
+def test_keyed_lock_serializes_same_key():
+    from utils.cache import KeyedLock
+
+    lock = KeyedLock()
+    events = []
+
+    async def hold(key, name):
+        async with lock.acquire(key):
+            events.append(f"{name}+")
+            await asyncio.sleep(0.01)
+            events.append(f"{name}-")
+
+    async def scenario():
+        await asyncio.gather(hold("a", "first"), hold("a", "second"), hold("b", "other"))
+        return len(lock)
+
+    assert asyncio.run(scenario()) == 0
+    assert events.index("first-") < events.index("second+")
+    # 不同 key 互不阻塞
+    assert events.index("other+") < events.index("first-")
+
+def test_concurrent_writes_of_same_key(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    store = DiskStore(str(tmp_path), max_entries=10)
+    payloads = [{"value": "x" * 5000, "writer": i} for i in range(200)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda entry: store._write("same", entry), payloads))
+    # 每次写入都完整替换，不残留临时文件
+    assert store._read("same") in payloads
+    assert [p.name for p in tmp_path.iterdir()] == ["same.json"]
@@ -0,0 +1,156 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("textblob")
+
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import MinMaxScaler
+
+import utils.data_analysis as data_analysis
+from config import ANALYSIS_CONFIG
+from utils.data_analysis import DataAnalyzer
+
+TEXTS = ["I love this product", "This is terrible", "An average day", "I love this product"]
+
+@pytest.fixture
+def scored(monkeypatch):
+    """记录实际计算情感的文本，每个测试使用独立缓存"""
+    calls = []
+    original = data_analysis.score_sentiments
+
+    def score(texts):
+        calls.append(list(texts))
+        return original(texts)
+
+    monkeypatch.setattr(data_analysis, "score_sentiments", score)
+    monkeypatch.setattr(data_analysis, "sentiment_cache", data_analysis.TTLCache(max_size=100))
+    return calls
+
+def test_sentiments_are_cached_by_text(scored):
+    analyzer = DataAnalyzer()
+    first = analyzer.sentiment_analysis(TEXTS)
+    second = analyzer.sentiment_analysis(TEXTS + ["Something new"])
+    assert first["count"] == 4
+    assert [item["text"] for item in first["detailed_sentiments"]] == TEXTS
+    assert first["detailed_sentiments"][0]["polarity"] > 0 > first["detailed_sentiments"][1]["polarity"]
+    # 重复文本只计算一次，第二次只计算新文本
+    assert scored == [TEXTS[:3], ["Something new"]]
+    assert second["detailed_sentiments"][:4] == first["detailed_sentiments"]
+
+def test_summary_only_matches_full_result(scored):
+    analyzer = DataAnalyzer()
+    full = analyzer.sentiment_analysis(TEXTS)
+    summary = analyzer.sentiment_analysis(iter(TEXTS), summary_only=True)
+    assert "detailed_sentiments" not in summary
+    assert summary["count"] == full["count"]
+    assert summary["overall_sentiment"] == pytest.approx(full["overall_sentiment"])
+
+def test_inflight_chunks_are_bounded(scored, monkeypatch):
+    class RecordingPool(ThreadPoolExecutor):
+        def __init__(self):
+            super().__init__(2)
+            self.submitted = 0
+
+        def submit(self, *args, **kwargs):
+            self.submitted += 1
+            return super().submit(*args, **kwargs)
+
+    pool = RecordingPool()
+    monkeypatch.setattr(data_analysis, "get_sentiment_pool", lambda: pool)
+    monkeypatch.setitem(ANALYSIS_CONFIG, "sentiment_chunk_size", 2)
+    monkeypatch.setitem(ANALYSIS_CONFIG, "sentiment_inline_max", 0)
+    monkeypatch.setitem(ANALYSIS_CONFIG, "sentiment_max_inflight", 3)
+
+    consumed = []
+
+    def texts():
+        for i in range(40):
+            consumed.append(i)
+            yield f"text number {i}"
+
+    results = DataAnalyzer().iter_sentiments(texts())
+    first = next(results)
+    # 产出第一条结果前最多读取并提交 max_inflight 个分块
+    assert first["text"] == "text number 0"
+    assert pool.submitted == 3 and len(consumed) == 6
+    assert [item["text"] for item in [first, *results]] == [f"text number {i}" for i in range(40)]
+    assert pool.submitted == 20
+    pool.shutdown()
+
+def test_shutdown_sentiment_pool_is_idempotent():
+    pool = data_analysis.get_sentiment_pool()
+    assert data_analysis.get_sentiment_pool() is pool
+    data_analysis.shutdown_sentiment_pool()
+    data_analysis.shutdown_sentiment_pool()
+    assert data_analysis._sentiment_pool is None
+
+def blobs(n_per_cluster, seed=0):
+    """三个分离良好的簇，转成原实现使用的记录格式"""
+    rng = np.random.default_rng(seed)
+    records = []
+    for center in ((0, 5, 0), (50, 40, 5), (100, 5, 10)):
+        for value, length, importance in rng.normal(center, (2, 1, 0.5), (n_per_cluster, 3)):
+            records.append({"value": value, "text": "x" * max(int(round(length)), 0), "importance": importance})
+    return records
+
+def baseline_features(data):
+    return np.array([[float(item.get("value", 0)), len(str(item.get("text", ""))), item.get("importance", 0)] for item in data])
+
+def test_prepare_features_matches_baseline():
+    records = blobs(20) + [{"value": 3}, {"text": "abc"}, {}]
+    expected = baseline_features(records)
+    analyzer = DataAnalyzer()
+    np.testing.assert_array_equal(analyzer.prepare_features(records), expected)
+    frame = pd.DataFrame(records)
+    np.testing.assert_array_equal(analyzer.prepare_features(frame), expected)
+    # 按配置增减特征和精度
+    subset = analyzer.prepare_features(records, features=ANALYSIS_CONFIG["features"][1:2], dtype="float32")
+    assert subset.dtype == np.float32 and subset.shape == (len(records), 1)
+    np.testing.assert_array_equal(subset[:, 0], expected[:, 1])
+
+def test_prepare_features_from_arrow():
+    pa = pytest.importorskip("pyarrow")
+    records = blobs(5) + [{"value": 3}, {"text": "abc"}]
+    table = pa.Table.from_pylist(records)
+    np.testing.assert_array_equal(DataAnalyzer().prepare_features(table), baseline_features(records))
+
+def test_kmeans_matches_baseline_stats():
+    records = blobs(30)
+    result = DataAnalyzer().cluster_analysis(records, n_clusters=3)
+    features = baseline_features(records)
+    scaled = MinMaxScaler().fit_transform(features)
+    labels = KMeans(n_clusters=3, random_state=42).fit_predict(scaled)
+    assert result["algorithm"] == "kmeans"
+    assert result["labels"] == labels.tolist()
+    for i, stats in enumerate(result["cluster_stats"]):
+        members = features[labels == i]
+        assert stats["size"] == len(members)
+        assert stats["variance"] == pytest.approx(members.var(axis=0).mean())
+
+def test_minibatch_clustering_for_large_inputs(monkeypatch):
+    monkeypatch.setitem(ANALYSIS_CONFIG, "minibatch_threshold", 100)
+    monkeypatch.setitem(ANALYSIS_CONFIG, "cluster_chunk_size", 64)
+    records = blobs(200)
+    result = DataAnalyzer().cluster_analysis(records, n_clusters=3)
+    assert result["algorithm"] == "minibatch_kmeans"
+    labels = np.array(result["labels"])
+    # 每个真实簇整体落入同一个预测簇
+    assert len({tuple(np.unique(labels[i * 200:(i + 1) * 200])) for i in range(3)}) == 3
+    features = baseline_features(records)
+    for i, stats in enumerate(result["cluster_stats"]):
+        members = features[labels == i]
+        assert stats["size"] == len(members) == 200
+        assert stats["variance"] == pytest.approx(members.var(axis=0).mean())
+    summary = DataAnalyzer().cluster_analysis(records, n_clusters=3, include_labels=False)
+    assert "labels" not in summary and summary["cluster_stats"] == result["cluster_stats"]
+
+def test_automatic_cluster_count():
+    result = DataAnalyzer().cluster_analysis(blobs(40), n_clusters=None)
+    assert result["n_clusters"] == 3
+    assert max(result["silhouette_scores"], key=result["silhouette_scores"].get) == 3
+    assert set(result["silhouette_scores"]) == set(range(2, ANALYSIS_CONFIG["max_clusters"] + 1))
@@ -0,0 +1,256 @@
+import numpy as np
+import pytest
+
+from config import DECISION_CONFIG, RISK_CONFIG
+from utils.cache import TTLCache
+from utils.decision_support import DecisionCriterion, DecisionOption, DecisionSupport
+
+def build(options, weights):
+    support = DecisionSupport()
+    for name, weight in weights.items():
+        support.add_criterion(DecisionCriterion(name=name, weight=weight, description=""))
+    for title, scores in options.items():
+        support.add_option(DecisionOption(
+            title=title, description="", pros=[], cons=[], criteria_scores=scores
+        ))
+    return support
+
+def random_support(n_options, n_criteria, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"c{j}" for j in range(n_criteria)]
+    return build(
+        {f"o{i}": dict(zip(names, rng.integers(0, 10, n_criteria).tolist())) for i in range(n_options)},
+        dict(zip(names, rng.uniform(0.1, 1.0, n_criteria).tolist()))
+    )
+
+def without_timing(report):
+    return {key: value for key, value in report["sensitivity_analysis"].items() if key != "elapsed_ms"}
+
+def test_break_even_weights():
+    support = build(
+        {"A": {"c1": 10, "c2": 0}, "B": {"c1": 0, "c2": 10}},
+        {"c1": 0.6, "c2": 0.4}
+    )
+    report = support.analyze_decision(seed=1)
+    break_even = {item["criterion"]: item for item in report["sensitivity_analysis"]["break_even_weights"]}
+    assert report["recommendation"]["best_option"] == "A"
+    assert break_even["c1"]["break_even_weight"] == pytest.approx(0.4)
+    assert break_even["c2"]["break_even_weight"] == pytest.approx(0.6)
+    assert break_even["c1"]["competitor"] == "B"
+
+def test_seeded_sensitivity_is_reproducible():
+    first = without_timing(random_support(200, 8).analyze_decision(seed=7))
+    second = without_timing(random_support(200, 8).analyze_decision(seed=7))
+    assert first == second
+    assert sum(first["win_probability"].values()) <= 1.0 + 1e-9
+
+def test_sample_count_shrinks_with_problem_size():
+    small = random_support(20, 4).analyze_decision(seed=1)["sensitivity_analysis"]
+    large = random_support(4000, 150).analyze_decision(seed=1)["sensitivity_analysis"]
+    assert small["samples"] == DECISION_CONFIG["sensitivity_samples"]
+    assert DECISION_CONFIG["min_sensitivity_samples"] <= large["samples"] < small["samples"]
+    # 固定种子时采样数只取决于规模
+    assert random_support(4000, 150, seed=3).analyze_decision(seed=2)["sensitivity_analysis"]["samples"] == large["samples"]
+
+def test_batch_matches_single_analysis(monkeypatch):
+    # 元素上限设小，使同形状的决策也要分成多个张量
+    monkeypatch.setitem(DECISION_CONFIG, "batch_max_tensor_elements", 100)
+    supports = [random_support(n, m, seed=k) for k, (n, m) in enumerate([(3, 2), (30, 5), (30, 5), (3, 2), (7, 4)])]
+    batch = DecisionSupport.analyze_batch(supports, seed=5)
+    for i, (support, item) in enumerate(zip(supports, batch)):
+        single = support.analyze_decision(seed=5 + i)
+        assert item["success"]
+        assert item["analysis"]["recommendation"] == single["recommendation"]
+        assert item["analysis"]["rankings"] == single["rankings"]
+
+def rebuild(support):
+    fresh = DecisionSupport()
+    state = support.to_dict()
+    for criterion in state["criteria"]:
+        fresh.add_criterion(DecisionCriterion(**criterion))
+    for option in state["options"]:
+        fresh.add_option(DecisionOption(**option))
+    fresh.analyze_decision(seed=0)
+    return fresh
+
+def risk_key(risk):
+    return risk["option"], risk["risk"]
+
+def test_apply_changes_matches_full_reanalysis():
+    support = build(
+        {"A": {"c1": 8, "c2": 2}, "B": {"c1": 4, "c2": 6}, "C": {"c1": 6, "c2": 4}, "D": {"c1": 1, "c2": 1}},
+        {"c1": 2.0, "c2": 1.0}
+    )
+    support.options[1].cons = ["成本高"]
+    before = {item["title"]: item for item in support.analyze_decision(seed=0)["rankings"]}
+
+    diff = support.apply_changes([
+        {"op": "set_weight", "criterion": "c2", "weight": 4.0},
+        {"op": "update_option", "title": "C", "option": {"criteria_scores": {"c1": 9, "c2": 9}, "cons": ["风险大"]}},
+        {"op": "remove_option", "title": "D"},
+        {"op": "add_option", "option": {"title": "E", "description": "", "criteria_scores": {"c1": 2}}}
+    ])
+    fresh = rebuild(support)
+
+    assert support.report["rankings"] == fresh.report["rankings"]
+    assert support.report["recommendation"] == fresh.report["recommendation"]
+    assert sorted(support.report["risk_analysis"], key=risk_key) == sorted(fresh.report["risk_analysis"], key=risk_key)
+    assert support.report["risk_profiles"] == fresh.report["risk_profiles"]
+
+    after = {item["title"]: item for item in fresh.report["rankings"]}
+    assert diff["changed_scores"] == {
+        title: item["score"] for title, item in after.items()
+        if title not in before or before[title]["score"] != item["score"]
+    }
+    assert {change["title"] for change in diff["rank_changes"]} == {
+        title for title, item in after.items() if title not in before or before[title]["rank"] != item["rank"]
+    }
+    assert diff["removed"] == ["D"]
+    assert diff["recommendation"]["best_option"] == "C"
+    assert {risk["option"] for risk in diff["risk_analysis"]} == {"C"}
+    assert diff["sensitivity_stale"]
+
+def test_apply_changes_without_ranking_change():
+    support = build({"A": {"c1": 9}, "B": {"c1": 1}}, {"c1": 1.0})
+    support.analyze_decision(seed=0)
+    diff = support.apply_changes([{"op": "update_option", "title": "B", "option": {"criteria_scores": {"c1": 2}}}])
+    assert diff["changed_scores"] == {"B": 2.0}
+    assert diff["rank_changes"] == [] and diff["removed"] == []
+    assert "recommendation" not in diff
+    with pytest.raises(ValueError):
+        support.apply_changes([{"op": "rename"}])
+
+def test_negative_weight_is_sampled_with_its_sign():
+    # 成本类标准用负权重表示越低越好
+    support = build(
+        {"A": {"quality": 8, "cost": 9}, "B": {"quality": 7, "cost": 2}, "C": {"quality": 3, "cost": 1}},
+        {"quality": 1.0, "cost": -0.5}
+    )
+    report = support.analyze_decision(seed=3)
+    sensitivity = report["sensitivity_analysis"]
+    assert report["recommendation"]["best_option"] == "B"
+    assert sensitivity["samples"] > 0
+    assert max(sensitivity["win_probability"], key=sensitivity["win_probability"].get) == "B"
+
+def test_rank_one_drift_is_not_reported_as_change():
+    support = build({"A": {"c1": 6.4, "c2": 1}, "B": {"c1": 1, "c2": 9}}, {"c1": 0.1, "c2": 0.3})
+    support.analyze_decision(seed=0)
+    # 权重改动后又改回原值，得分只差浮点误差
+    diff = support.apply_changes([
+        {"op": "set_weight", "criterion": "c1", "weight": 0.7},
+        {"op": "set_weight", "criterion": "c1", "weight": 0.1}
+    ])
+    assert diff["changed_scores"] == {}
+    assert diff["rank_changes"] == []
+
+def baseline_ranking(support):
+    """原实现：逐选项逐标准累加加权得分，按得分降序稳定排序"""
+    scores = {}
+    for option in support.options:
+        total = 0
+        for criterion in support.criteria:
+            if criterion.name in option.criteria_scores:
+                total += option.criteria_scores[criterion.name] * criterion.weight
+        scores[option.title] = total
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+def test_matrix_scoring_matches_baseline_ranking():
+    support = random_support(300, 12, seed=4)
+    # 同名标准的权重累加，选项中多余的标准不计分，缺失的标准按 0 分
+    support.add_criterion(DecisionCriterion(name="c0", weight=0.25, description=""))
+    for i, option in enumerate(support.options):
+        option.criteria_scores["unused"] = 100
+        if i % 3 == 0:
+            del option.criteria_scores["c5"]
+    rankings = support.analyze_decision(seed=0)["rankings"]
+    expected = baseline_ranking(support)
+    assert [item["title"] for item in rankings] == [title for title, _ in expected]
+    assert [item["score"] for item in rankings] == pytest.approx([score for _, score in expected])
+    assert [item["rank"] for item in rankings] == list(range(1, 301))
+
+def test_tied_scores_keep_insertion_order():
+    support = build(
+        {"A": {"c1": 1}, "B": {"c1": 3}, "C": {"c1": 1}, "D": {"c1": 3}},
+        {"c1": 1.0}
+    )
+    rankings = support.analyze_decision(seed=0)["rankings"]
+    assert [item["title"] for item in rankings] == [title for title, _ in baseline_ranking(support)] == ["B", "D", "A", "C"]
+
+def risky_support():
+    support = build({"A": {"c1": 8}, "B": {"c1": 5}}, {"c1": 1.0})
+    support.options[0].cons = ["成本高", "周期长"]
+    support.options[1].risks = [
+        {"name": "供应中断", "probability": 0.9, "impact": 0.9, "mitigation": "备选供应商"},
+        {"name": "汇率波动", "probability": 0.2, "impact": 0.5}
+    ]
+    return support
+
+def test_risk_analysis_scores_cons_and_quantified_risks():
+    report = risky_support().analyze_decision(seed=0)
+    risks = {risk["risk"]: risk for risk in report["risk_analysis"]}
+    # 只有文字描述的缺点使用默认概率和影响，与原实现一样为“中”
+    assert risks["成本高"]["severity"] == "中"
+    assert risks["成本高"]["score"] == pytest.approx(RISK_CONFIG["default_probability"] * RISK_CONFIG["default_impact"])
+    assert (risks["供应中断"]["severity"], risks["供应中断"]["mitigation"]) == ("高", "备选供应商")
+    assert risks["汇率波动"]["level"] == "low"
+    assert report["risk_profiles"]["A"]["medium_risk_count"] == 2
+    assert report["risk_profiles"]["B"]["high_risk_count"] == 1
+
+def test_risk_profiles_are_cached_and_batched(monkeypatch):
+    import utils.decision_support as decision_module
+    monkeypatch.setattr(decision_module, "risk_profile_cache", TTLCache(max_size=100))
+    calls = []
+    original = decision_module.risk_assessor.assess_risks
+
+    def counting(factors, **kwargs):
+        calls.append(len(factors))
+        return original(factors, **kwargs)
+
+    monkeypatch.setattr(decision_module.risk_assessor, "assess_risks", counting)
+    support = risky_support()
+    # 缺点相同的选项只评估一次
+    support.add_option(DecisionOption(title="C", description="", pros=[], cons=["成本高", "周期长"], criteria_scores={"c1": 1}))
+    first = support.analyze_decision(seed=0)
+    assert calls == [4]
+    second = support.analyze_decision(seed=0)
+    assert calls == [4]
+    assert first["risk_profiles"] == second["risk_profiles"]
+    assert first["risk_profiles"]["A"] == first["risk_profiles"]["C"]
+
+def test_assess_option_risks_portfolio():
+    result = risky_support().assess_option_risks(monte_carlo=True, seed=1)
+    assert [item["option"] for item in result["options"]] == ["A", "B"]
+    portfolio = result["portfolio"]
+    assert "risk_factors" not in portfolio
+    overall = portfolio["overall_assessment"]
+    assert (overall["high_risk_count"], overall["medium_risk_count"], overall["low_risk_count"]) == (1, 2, 1)
+    assert portfolio["monte_carlo"]["samples"] > 0
+
+def test_risk_endpoint_rejects_malformed_options():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("motor")
+    from types import SimpleNamespace
+    from fastapi.testclient import TestClient
+    import main
+
+    main.app.dependency_overrides[main.get_current_user] = lambda: SimpleNamespace(id="u1")
+    client = TestClient(main.app)
+    try:
+        ok = client.post("/api/decisions/risks", json={"options": [{"title": "A", "cons": ["成本高"]}]})
+        missing_title = client.post("/api/decisions/risks", json={"options": [{"cons": ["成本高"]}]})
+        bad_risk = client.post("/api/decisions/risks", json={"options": [{"title": "A", "risks": [{"probability": 0.5}]}]})
+    finally:
+        main.app.dependency_overrides.clear()
+    assert ok.status_code == 200
+    assert ok.json()["risks"]["options"][0]["overall"]["medium_risk_count"] == 1
+    assert missing_title.status_code == 400
+    assert bad_risk.status_code == 400
+
+def test_malformed_risks_are_rejected_when_added():
+    support = risky_support()
+    with pytest.raises(KeyError):
+        support.add_option(DecisionOption(title="C", description="", pros=[], cons=[], criteria_scores={}, risks=[{"probability": 0.5}]))
+    with pytest.raises(ValueError):
+        support.update_option("A", {"risks": [{"name": "x", "probability": "高"}]})
+    assert [option.title for option in support.options] == ["A", "B"]
+    assert support.options[0].risks == []
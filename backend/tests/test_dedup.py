@@ -0,0 +1,53 @@
+import pytest
+
+from utils.dedup import NearDuplicateIndex, canonicalize_url, hamming_distance, simhash
+
+@pytest.mark.parametrize("variant", [
+    "https://example.com/news/1",
+    "http://example.com/news/1",
+    "https://www.example.com/news/1/",
+    "https://m.Example.COM/news/1",
+    "https://example.com:443/news/1#comments",
+    "https://example.com/news/1?utm_source=feed&utm_medium=rss",
+    "https://example.com/news/1?spm=a.b.c&fbclid=xyz",
+    "https://amp.example.com/news/1/amp"
+])
+def test_canonicalize_url_merges_variants(variant):
+    assert canonicalize_url(variant) == "https://example.com/news/1"
+
+def test_canonicalize_url_keeps_meaningful_differences():
+    assert canonicalize_url("https://example.com/a?b=2&a=1") == canonicalize_url("https://example.com/a?a=1&b=2")
+    assert canonicalize_url("https://example.com/a?id=1") != canonicalize_url("https://example.com/a?id=2")
+    assert canonicalize_url("https://example.com:8080/a") != canonicalize_url("https://example.com/a")
+    assert canonicalize_url("https://example.com/a") != canonicalize_url("https://example.org/a")
+    assert canonicalize_url("https://example.com") == "https://example.com/"
+
+ARTICLE = "".join(f"第{i}段，市场规模持续增长，主要厂商加大投入，行业集中度进一步提高。" for i in range(40))
+
+def test_simhash_is_stable_and_near_for_small_edits():
+    assert simhash(ARTICLE) == simhash(ARTICLE)
+    # 空白和大小写不影响指纹
+    assert simhash("Hello World " * 20) == simhash("hello   world" * 20)
+    edited = ARTICLE.replace("第7段", "第七段")
+    assert hamming_distance(simhash(ARTICLE), simhash(edited)) <= 3
+    other = "".join(f"条目{i}：用户反馈集中在价格、售后和配送时效三个方面。" for i in range(40))
+    assert hamming_distance(simhash(ARTICLE), simhash(other)) > 3
+
+def test_simhash_short_and_empty_text():
+    assert simhash("") == 0
+    assert simhash("abc") != 0
+    assert 0 <= simhash(ARTICLE) < 2 ** 64
+
+def test_near_duplicate_index():
+    index = NearDuplicateIndex(max_distance=3)
+    base = simhash(ARTICLE)
+    assert index.add(base)
+    assert not index.add(base)
+    # 每段各翻一位，仍能通过分段找到
+    for flips in ([0], [0, 20], [5, 30, 60]):
+        fingerprint = base
+        for bit in flips:
+            fingerprint ^= 1 << bit
+        assert index.is_duplicate(fingerprint)
+    assert not index.is_duplicate(base ^ 0b1111)
+    assert index.add(base ^ ((1 << 64) - 1))
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from utils.html_extract import extract_text_from_stream, sniff_charset
+
+TEXT = "人工智能行业 发展趋势 研究报告"
+
+def gbk_page(meta=True):
+    head = '<meta http-equiv="Content-Type" content="text/html; charset=gb2312">' if meta else ''
+    return f"<html><head>{head}</head><body><p>{TEXT}</p></body></html>".encode("gbk")
+
+async def iterate(data, chunk_size=7, consumed=None):
+    for start in range(0, len(data), chunk_size):
+        if consumed is not None:
+            consumed.append(start)
+        yield data[start:start + chunk_size]
+
+def extract(data, **kwargs):
+    return asyncio.run(extract_text_from_stream(iterate(data), parser="html.parser", **kwargs))
+
+@pytest.mark.parametrize("data", [
+    gbk_page(meta=True),
+    gbk_page(meta=False),
+    f"<p>{TEXT}</p>".encode("utf-8"),
+    f"<p>{TEXT}</p>".encode("utf-8-sig"),
+    f'<meta charset="GBK"><p>{TEXT}</p>'.encode("gbk")
+])
+def test_charset_detected_without_header(data):
+    assert extract(data) == TEXT
+
+def test_header_charset_takes_precedence():
+    assert extract(gbk_page(meta=False), encoding="GB2312") == TEXT
+    # 无法识别的编码名按未声明处理
+    assert extract(gbk_page(meta=True), encoding="x-unknown") == TEXT
+
+def test_sniff_ignores_multibyte_split_at_window_end():
+    assert sniff_charset("中文".encode("utf-8")[:4]) == "utf-8"
+
+def test_download_stops_at_byte_cap():
+    data = ("<p>" + "数据" * 5000 + "</p>").encode("utf-8")
+    consumed = []
+
+    async def scenario():
+        return await extract_text_from_stream(
+            iterate(data, 1000, consumed), encoding="utf-8", max_bytes=3001, parser="html.parser", max_chars=10**6
+        )
+
+    text = asyncio.run(scenario())
+    assert len(consumed) == 4
+    # 截断在多字节字符中间时以替换符结尾，不抛出异常
+    assert text.startswith("数据") and len(text.rstrip("�")) == (3001 - 3) // 3
+
+def test_text_truncated_to_char_budget():
+    data = ("<p>" + "字" * 300 + "</p>").encode("utf-8")
+    assert extract(data, max_chars=50) == "字" * 50
+
+PAGE = (
+    "<html><head><title>标题</title><style>p { color: red }</style><script>var x = 1;</script></head>"
+    "<body><h1>市场 分析</h1><p>第一段   内容&amp;细节</p><div>second <b>paragraph</b></div></body></html>"
+)
+
+@pytest.fixture
+def parse_pool():
+    from utils import html_extract
+    yield html_extract
+    html_extract.shutdown_parse_pool()
+
+@pytest.mark.parametrize("parser", ["selectolax", "lxml", "html.parser", "streaming"])
+def test_inline_and_pooled_parsing_agree(monkeypatch, parse_pool, parser):
+    inline = parse_pool.extract_text(PAGE, parser, 5000)
+    monkeypatch.setitem(parse_pool.RESEARCH_CONFIG, "parse_inline_max_bytes", 0)
+    pooled = asyncio.run(parse_pool.extract_text_async(PAGE, parser, 5000))
+    assert pooled == inline
+    assert "第一段 内容&细节" in inline and "var x" not in inline
+
+def test_inline_limit_counts_bytes(monkeypatch, parse_pool):
+    from concurrent.futures import ThreadPoolExecutor
+
+    class RecordingPool(ThreadPoolExecutor):
+        submitted = 0
+
+        def submit(self, *args, **kwargs):
+            RecordingPool.submitted += 1
+            return super().submit(*args, **kwargs)
+
+    pool = RecordingPool(1)
+    monkeypatch.setattr(parse_pool, "get_parse_pool", lambda: pool)
+    page = "<p>" + "中" * 100 + "</p>"
+    monkeypatch.setitem(parse_pool.RESEARCH_CONFIG, "parse_inline_max_bytes", 200)
+    # 107 个字符、307 个字节，超出字节上限交给进程池
+    assert asyncio.run(parse_pool.extract_text_async(page, "html.parser")) == "中" * 100
+    assert RecordingPool.submitted == 1
+    monkeypatch.setitem(parse_pool.RESEARCH_CONFIG, "parse_inline_max_bytes", 400)
+    asyncio.run(parse_pool.extract_text_async(page, "html.parser"))
+    assert RecordingPool.submitted == 1
+    pool.shutdown()
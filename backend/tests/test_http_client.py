@@ -0,0 +1,74 @@
+import asyncio
+
+from aiohttp import web
+
+from config import HTTP_CONFIG
+from utils.http_client import HTTPClient
+
+BODY = b"x" * 5000
+
+async def serve():
+    async def handle(request):
+        return web.Response(body=BODY, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{name}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+def test_requests_share_one_pooled_session():
+    client = HTTPClient(HTTP_CONFIG)
+
+    async def scenario():
+        runner, port = await serve()
+        try:
+            await client.start()
+            session = client.session
+            for i in range(5):
+                async with client.session.get(f"http://127.0.0.1:{port}/page{i}") as response:
+                    assert await response.read() == BODY
+            assert client.session is session
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+    stats = client.get_stats()
+    assert stats["requests"] == 5
+    # 顺序请求同一主机时复用同一条连接
+    assert stats["connections_created"] == 1
+    assert stats["connections_reused"] == 4
+    assert stats["connection_reuse_ratio"] == 0.8
+    assert stats["bytes_fetched"] == 5 * len(BODY)
+
+def test_iter_body_counts_streamed_bytes():
+    client = HTTPClient(HTTP_CONFIG)
+
+    async def scenario():
+        runner, port = await serve()
+        try:
+            async with client.session.get(f"http://127.0.0.1:{port}/page") as response:
+                return b"".join([chunk async for chunk in client.iter_body(response, 1024)])
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == BODY
+    assert client.get_stats()["bytes_fetched"] == len(BODY)
+
+def test_session_is_recreated_after_close():
+    client = HTTPClient(HTTP_CONFIG)
+
+    async def scenario():
+        first = client.session
+        await client.close()
+        assert first.closed
+        second = client.session
+        await client.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first is not second
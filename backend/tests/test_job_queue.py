@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from config import JOB_QUEUE_CONFIG
+from utils.job_queue import JobQueue
+
+def make_queue(**overrides):
+    return JobQueue({**JOB_QUEUE_CONFIG, "workers": 1, **overrides})
+
+def test_priority_order_and_clamping():
+    async def scenario():
+        queue = make_queue()
+        await queue.start()
+        order = []
+        gate = asyncio.Event()
+
+        async def record(job, name):
+            await gate.wait()
+            order.append(name)
+
+        # 第一个任务占住唯一的工作协程，其余任务在队列中按优先级排序
+        queue.submit(record, "first")
+        await asyncio.sleep(0)
+        low = queue.submit(record, "low", priority=9)
+        high = queue.submit(record, "high", priority="1")
+        jumper = queue.submit(record, "jumper", priority=-10**9)
+        gate.set()
+        while len(order) < 4:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return order, low.priority, high.priority, jumper.priority
+
+    order, low, high, jumper = asyncio.run(scenario())
+    assert (low, high, jumper) == (9, 1, JOB_QUEUE_CONFIG["min_priority"])
+    assert order == ["first", "jumper", "high", "low"]
+
+@pytest.mark.parametrize("priority", ["urgent", [1], True, float("inf")])
+def test_invalid_priority_is_rejected(priority):
+    async def scenario():
+        queue = make_queue()
+        await queue.start()
+        try:
+            with pytest.raises(ValueError):
+                queue.submit(asyncio.sleep, priority=priority)
+            return queue.jobs
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(scenario()) == {}
+
+def test_cancel_queued_job_runs_hook():
+    async def scenario():
+        queue = make_queue()
+        await queue.start()
+        ran, cancelled = [], []
+        gate = asyncio.Event()
+
+        async def work(job):
+            ran.append(job.id)
+            await gate.wait()
+
+        async def on_cancel(job):
+            cancelled.append(job.id)
+
+        running = queue.submit(work, on_cancel=on_cancel)
+        await asyncio.sleep(0)
+        queued = queue.submit(work, on_cancel=on_cancel)
+        assert queue.cancel(queued.id)
+        assert not queue.cancel(queued.id)
+        await asyncio.sleep(0)
+        assert queued.status == "cancelled"
+        assert cancelled == [queued.id]
+
+        # 应用关闭时仍在排队的任务同样触发回调，运行中的任务由执行函数自己处理
+        pending = queue.submit(work, on_cancel=on_cancel)
+        await queue.stop()
+        return ran, cancelled, running, queued, pending
+
+    ran, cancelled, running, queued, pending = asyncio.run(scenario())
+    assert ran == [running.id]
+    assert cancelled == [queued.id, pending.id]
+    assert running.status == pending.status == "cancelled"
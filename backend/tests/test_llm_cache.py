@@ -0,0 +1,82 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from config import LLM_CACHE_CONFIG
+from utils.llm_cache import LLMResponseCache, SemanticIndex
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def disk_cache(path):
+    return LLMResponseCache({**LLM_CACHE_CONFIG, "backend": "disk", "disk_path": str(path), "semantic_enabled": False})
+
+def test_import_does_not_touch_disk(tmp_path):
+    subprocess.run(
+        [sys.executable, "-c", "import utils.llm_gateway, utils.page_cache"],
+        cwd=tmp_path, env={**os.environ, "PYTHONPATH": BACKEND_DIR}, check=True
+    )
+    assert list(tmp_path.iterdir()) == []
+
+def test_disk_entries_survive_restart(tmp_path):
+    path = tmp_path / "llm"
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def scenario():
+        first = disk_cache(path)
+        assert not path.exists()
+        assert await first.get("k", "model", messages, {}) is None
+        await first.set("k", "model", messages, {}, "hello")
+        # 新实例没有内存缓存，从磁盘读取
+        return await disk_cache(path).get("k", "model", messages, {})
+
+    assert asyncio.run(scenario()) == "hello"
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def test_semantic_index_grows_and_caps():
+    index = SemanticIndex(threshold=0.99, max_entries=40)
+    rng = np.random.default_rng(0)
+    vectors = [unit(*rng.normal(size=8)) for _ in range(50)]
+    for i, vector in enumerate(vectors[:30]):
+        index.add("ns", vector, f"k{i}")
+    assert index.size("ns") == 30 and len(index._vectors["ns"]) == 32
+    assert index.search("ns", vectors[7]) == "k7"
+    assert index.search("other", vectors[7]) is None
+
+    for i, vector in enumerate(vectors[30:], start=30):
+        index.add("ns", vector, f"k{i}")
+    # 达到上限后覆盖最早的向量
+    assert index.size("ns") == 40 and len(index._vectors["ns"]) == 40
+    assert index.search("ns", vectors[5]) is None
+    assert index.search("ns", vectors[49]) == "k49"
+
+def test_embedding_skipped_until_namespace_has_vectors():
+    embedded = []
+
+    async def embed(text):
+        embedded.append(text)
+        # 只按首个单词决定向量，改写后的问题视为相似
+        return [1.0, 0.0] if text.startswith("weather") else [0.0, 1.0]
+
+    cache = LLMResponseCache(
+        {**LLM_CACHE_CONFIG, "backend": "memory", "semantic_enabled": True, "similarity_threshold": 0.95},
+        embed=embed
+    )
+    first = [{"role": "user", "content": "weather in Paris?"}]
+    second = [{"role": "user", "content": "weather in Paris today?"}]
+
+    async def scenario():
+        assert await cache.get("k1", "m", first, {}) is None
+        assert embedded == []
+        await cache.set("k1", "m", first, {}, "sunny")
+        assert embedded == ["weather in Paris?"]
+        return await cache.get("k2", "m", second, {})
+
+    assert asyncio.run(scenario()) == "sunny"
+    assert embedded == ["weather in Paris?", "weather in Paris today?"]
+    assert cache.semantic_hits == 1
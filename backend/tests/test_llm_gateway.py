@@ -0,0 +1,167 @@
+import asyncio
+import json
+
+import pytest
+
+from config import LLM_CACHE_CONFIG, LLM_CONFIG
+from utils.llm_cache import LLMResponseCache
+from utils.llm_gateway import LLMGateway, StubBackend
+
+CONFIG = {**LLM_CONFIG, "retry_base_delay": 0.001, "retry_max_delay": 0.001}
+MESSAGES = [{"role": "user", "content": "北京天气 today"}]
+
+class FlakyBackend(StubBackend):
+    """前 failures 次调用抛出指定异常"""
+
+    def __init__(self, failures, error, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.error = error
+
+    async def complete(self, model, messages, **params):
+        if self.failures:
+            self.failures -= 1
+            self.calls.append({"model": model, "failed": True})
+            raise self.error
+        return await super().complete(model, messages, **params)
+
+def memory_cache():
+    return LLMResponseCache({**LLM_CACHE_CONFIG, "backend": "memory", "semantic_enabled": False})
+
+def test_identical_inflight_requests_are_coalesced():
+    backend = StubBackend(latency=0.05)
+    gateway = LLMGateway(backend=backend, config=CONFIG)
+
+    async def scenario():
+        return await asyncio.gather(*[gateway.chat(MESSAGES) for _ in range(5)])
+
+    assert asyncio.run(scenario()) == ["stub: 北京天气 today"] * 5
+    assert len(backend.calls) == 1
+    stats = gateway.get_stats()
+    assert stats["coalesced"] == 4
+    assert stats["calls"] == 1
+
+def test_retryable_errors_are_retried():
+    backend = FlakyBackend(2, ConnectionError("reset"))
+    gateway = LLMGateway(backend=backend, config=CONFIG)
+    assert asyncio.run(gateway.chat(MESSAGES)) == "stub: 北京天气 today"
+    assert len(backend.calls) == 3
+    assert gateway.metrics.retries == 2
+    assert gateway.metrics.failures == 0
+
+def test_non_retryable_error_fails_immediately():
+    backend = FlakyBackend(1, ValueError("bad request"))
+    gateway = LLMGateway(backend=backend, config=CONFIG)
+    with pytest.raises(ValueError):
+        asyncio.run(gateway.chat(MESSAGES))
+    assert len(backend.calls) == 1
+    assert gateway.metrics.failures == 1
+
+def test_stream_result_is_cached():
+    backend = StubBackend(responder=lambda messages: "第一段 second part")
+    gateway = LLMGateway(backend=backend, config=CONFIG, cache=memory_cache())
+
+    async def scenario():
+        streamed = [delta async for delta in gateway.stream(MESSAGES)]
+        return streamed, await gateway.chat(MESSAGES), [delta async for delta in gateway.stream(MESSAGES)]
+
+    streamed, chatted, replayed = asyncio.run(scenario())
+    assert len(streamed) > 1 and "".join(streamed) == "第一段 second part"
+    assert chatted == "第一段 second part"
+    assert replayed == ["第一段 second part"]
+    assert len(backend.calls) == 1
+    assert gateway.get_stats()["cache"]["exact_hits"] == 2
+
+class BrokenStreamBackend(StubBackend):
+    """流式输出到第 fail_after 个片段时断开，前 failures 次调用生效"""
+
+    def __init__(self, failures, fail_after, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.fail_after = fail_after
+
+    async def stream(self, model, messages, **params):
+        count = 0
+        async for delta in super().stream(model, messages, **params):
+            if self.failures and count == self.fail_after:
+                self.failures -= 1
+                raise ConnectionError("reset")
+            count += 1
+            yield delta
+
+def collect(gateway):
+    async def scenario():
+        return [delta async for delta in gateway.stream(MESSAGES)]
+    return asyncio.run(scenario())
+
+def test_stream_retries_before_first_delta():
+    backend = BrokenStreamBackend(2, 0)
+    gateway = LLMGateway(backend=backend, config=CONFIG)
+    assert "".join(collect(gateway)) == "stub: 北京天气 today"
+    assert gateway.metrics.retries == 2
+    stats = gateway.get_stats()
+    assert stats["streams"] == 1
+    assert stats["first_token_p50"] >= 0
+
+def test_stream_is_not_retried_after_output():
+    backend = BrokenStreamBackend(1, 1)
+    gateway = LLMGateway(backend=backend, config=CONFIG, cache=memory_cache())
+    received = []
+
+    async def scenario():
+        async for delta in gateway.stream(MESSAGES):
+            received.append(delta)
+
+    # 已输出的片段不能撤回，中途失败直接抛出
+    with pytest.raises(ConnectionError):
+        asyncio.run(scenario())
+    assert received == ["stub: "]
+    assert gateway.metrics.retries == 0
+    assert gateway.metrics.failures == 1
+    # 不完整的结果不写入缓存
+    assert collect(gateway) == ["stub: ", "北京天气 ", "today"]
+
+def test_decision_stream_endpoint(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("motor")
+    from types import SimpleNamespace
+    from bson import ObjectId
+    from fastapi.testclient import TestClient
+    from fakes import FakeDatabase
+    import main
+    import utils.llm_helper as llm_helper
+
+    db = FakeDatabase()
+    monkeypatch.setattr(main, "db", db)
+    monkeypatch.setattr(llm_helper, "llm_gateway", LLMGateway(
+        backend=StubBackend(responder=lambda messages: "建议 选择 A"), config=CONFIG
+    ))
+    main.app.dependency_overrides[main.get_current_user] = lambda: SimpleNamespace(id=ObjectId())
+    decision = {
+        "title": "选址",
+        "description": "",
+        "criteria": [{"name": "成本", "weight": 1.0}],
+        "options": [
+            {"title": "A", "description": "", "criteria_scores": {"成本": 8}},
+            {"title": "B", "description": "", "criteria_scores": {"成本": 5}}
+        ],
+        "sensitivity_seed": 1
+    }
+    try:
+        response = TestClient(main.app).post("/api/decisions/analyze/stream", json=decision)
+    finally:
+        main.app.dependency_overrides.clear()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+        for block in response.text.strip().split("\n\n")
+    ]
+    names = [name for name, _ in events]
+    assert names[0] == "analysis" and names[-1] == "done"
+    assert events[0][1]["recommendation"]["best_option"] == "A"
+    assert "".join(data for name, data in events if name == "token") == "建议 选择 A"
+    # 流结束后保存完整建议
+    saved = db.decisions.docs
+    assert len(saved) == 1 and saved[0]["analysis"]["llm_advice"] == "建议 选择 A"
+    assert events[-1][1]["decision_id"] == str(saved[0]["_id"])
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("motor")
+from bson import ObjectId
+
+import utils.login_writer as writer_module
+from fakes import FakeDatabase
+from utils.login_writer import LoginEventWriter
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDatabase()
+    monkeypatch.setattr(writer_module, "db", db)
+    return db
+
+def make_writer(**config):
+    return LoginEventWriter({
+        "batch_size": 3,
+        "flush_interval_seconds": 0.05,
+        "max_queued": 100,
+        "enqueue_timeout": 0.05,
+        "max_retries": 0,
+        "shutdown_timeout": 1,
+        **config
+    })
+
+def test_flushes_when_batch_is_full(db):
+    writer = make_writer(flush_interval_seconds=10)
+    user_id = ObjectId()
+
+    async def scenario():
+        await writer.start()
+        for _ in range(3):
+            await writer.record(user_id, "password", "success")
+        # 批次写满后无需等待 flush_interval_seconds
+        for _ in range(50):
+            if writer.batches:
+                break
+            await asyncio.sleep(0.01)
+        written = len(db.login_history.docs)
+        await writer.stop()
+        return written
+
+    assert asyncio.run(scenario()) == 3
+    assert writer.batches == 1
+    assert len(db.users.bulk_writes) == 1
+
+def test_flushes_after_interval(db):
+    writer = make_writer(batch_size=100)
+
+    async def scenario():
+        await writer.start()
+        await writer.record(ObjectId(), "password", "failed", fail_reason="wrong password")
+        await asyncio.sleep(0.01)
+        before = len(db.login_history.docs)
+        await asyncio.sleep(0.1)
+        after = len(db.login_history.docs)
+        await writer.stop()
+        return before, after
+
+    assert asyncio.run(scenario()) == (0, 1)
+    # 失败的登录不更新最后登录时间
+    assert db.users.bulk_writes == []
+
+def test_drops_events_under_backpressure(db):
+    writer = make_writer(max_queued=2)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def blocked_insert(docs, ordered=True):
+            await release.wait()
+            db.login_history.docs.extend(docs)
+
+        db.login_history.insert_many = blocked_insert
+        await writer.start()
+        for _ in range(6):
+            await writer.record(ObjectId(), "password", "success")
+        release.set()
+        await writer.stop()
+
+    asyncio.run(scenario())
+    assert writer.dropped > 0
+    assert writer.backpressure_waits >= writer.dropped
+    assert writer.enqueued + writer.dropped == 6
+    assert writer.written == len(db.login_history.docs) == writer.enqueued
+
+def test_stop_flushes_remaining_events(db):
+    writer = make_writer(batch_size=100, flush_interval_seconds=10)
+
+    async def scenario():
+        await writer.start()
+        for _ in range(5):
+            await writer.record(ObjectId(), "password", "success")
+        await writer.stop()
+        # 关闭后的记录直接写入
+        await writer.record(ObjectId(), "password", "success")
+
+    asyncio.run(scenario())
+    assert len(db.login_history.docs) == 6
+    assert writer.get_stats()["queued"] == 0
+
+def test_stop_is_bounded_when_queue_is_full(db):
+    writer = make_writer(max_queued=2, shutdown_timeout=0.2)
+
+    async def scenario():
+        async def stuck_insert(docs, ordered=True):
+            await asyncio.Event().wait()
+
+        db.login_history.insert_many = stuck_insert
+        await writer.start()
+        # 写入任务卡在第一批，之后的记录填满队列
+        for _ in range(6):
+            await writer.record(ObjectId(), "password", "success")
+        assert writer.get_stats()["queued"] == 2
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await writer.stop()
+        return loop.time() - started
+
+    assert asyncio.run(scenario()) < 0.5
+    assert writer._task is None
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+import utils.password_hasher as password_module
+from utils.encrypt import encrypt_password, hash_password, needs_rehash, verify_password
+from utils.password_hasher import PasswordHasher
+
+def make_hasher(**config):
+    return PasswordHasher({"algorithm": "scrypt", "cost": 10, "executor": "thread", "workers": 2, **config})
+
+def test_md5_password_is_upgraded_on_login():
+    hasher = make_hasher()
+    legacy = encrypt_password("secret")
+
+    async def scenario():
+        wrong = await hasher.verify_and_upgrade("wrong", legacy)
+        valid, upgraded = await hasher.verify_and_upgrade("secret", legacy)
+        again = await hasher.verify_and_upgrade("secret", upgraded)
+        return wrong, valid, upgraded, again
+
+    try:
+        wrong, valid, upgraded, again = asyncio.run(scenario())
+    finally:
+        hasher.close()
+    assert wrong == (False, None)
+    assert valid and upgraded.startswith("scrypt$10$")
+    assert verify_password("secret", upgraded)
+    # 升级后的哈希不再需要重新加密
+    assert again == (True, None)
+    assert hasher.rehashes == 1
+
+def test_needs_rehash():
+    current = hash_password("secret", "scrypt", 10)
+    assert needs_rehash(encrypt_password("secret"), "scrypt", 10)
+    assert needs_rehash(current, "scrypt", 11)
+    assert not needs_rehash(current, "scrypt", 10)
+    assert needs_rehash("$2b$12$" + "a" * 53, "scrypt", 10)
+
+@pytest.mark.parametrize("stored", [
+    "scrypt$abc$8$1$c2FsdA==$ZGlnZXN0",
+    "scrypt$10$8$1$c2FsdA==",
+    "scrypt$10$8$1$not base64!$ZGlnZXN0",
+    "scrypt$10$x$1$c2FsdA==$ZGlnZXN0",
+    "garbage"
+])
+def test_malformed_hash_fails_login(stored):
+    hasher = make_hasher()
+    try:
+        assert asyncio.run(hasher.verify_and_upgrade("secret", stored)) == (False, None)
+    finally:
+        hasher.close()
+
+def test_calibrate_picks_largest_cost_within_target(monkeypatch):
+    # 每提高一级成本耗时翻倍
+    monkeypatch.setattr(password_module, "benchmark", lambda algorithm, cost: 2.0 ** (cost - 10))
+    assert password_module.calibrate("scrypt", target_ms=10) == (13, 8.0)
+    assert password_module.calibrate("scrypt", target_ms=0.5) == (10, 1.0)
+
+def test_calibrate_waits_for_pending_limit(monkeypatch):
+    events = []
+
+    def fake_calibrate(algorithm, target_ms):
+        events.append("calibrate")
+        return 12, 40.0
+
+    def slow_hash(*args):
+        time.sleep(0.1)
+        events.append("hash")
+        return "done"
+
+    monkeypatch.setattr(password_module, "calibrate", fake_calibrate)
+    monkeypatch.setattr(password_module, "hash_password", slow_hash)
+    hasher = make_hasher(max_pending=1)
+
+    async def scenario():
+        hashing = asyncio.ensure_future(hasher.hash("secret"))
+        await asyncio.sleep(0)
+        result = await hasher.calibrate(target_ms=50)
+        await hashing
+        return result
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        hasher.close()
+    assert events == ["hash", "calibrate"]
+    assert result["cost"] == hasher.cost == 12
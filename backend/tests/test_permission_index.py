@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("motor")
+from bson import ObjectId
+
+import utils.permission_index as permission_module
+from fakes import FakeDatabase
+from utils.permission_index import PermissionIndex
+
+ADMIN, MEMBER = ObjectId(), ObjectId()
+ALICE, BOB = ObjectId(), ObjectId()
+MANAGE, VIEW = ObjectId(), ObjectId()
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDatabase()
+    db.permissions.docs = [{"_id": MANAGE, "permission_name": "role:manage"}, {"_id": VIEW, "permission_name": "user:view"}]
+    db.role_permissions.docs = [
+        {"role_id": ADMIN, "permission_id": MANAGE},
+        {"role_id": ADMIN, "permission_id": VIEW},
+        {"role_id": MEMBER, "permission_id": VIEW}
+    ]
+    db.user_roles.docs = [{"user_id": ALICE, "role_id": ADMIN}, {"user_id": BOB, "role_id": MEMBER}]
+    monkeypatch.setattr(permission_module, "db", db)
+    return db
+
+def build_index():
+    index = PermissionIndex({"denormalize": False})
+    asyncio.run(index.rebuild())
+    return index
+
+def test_rebuild_resolves_permissions(db):
+    index = build_index()
+    assert index.has_permission(str(ALICE), "role:manage")
+    assert index.has_permission(str(BOB), "user:view")
+    assert not index.has_permission(str(BOB), "role:manage")
+    assert not index.has_permission(str(ObjectId()), "user:view")
+
+def test_role_assignment_takes_effect_without_rebuild(db):
+    index = build_index()
+    asyncio.run(index.assign_role(str(BOB), str(ADMIN)))
+    assert index.has_permission(str(BOB), "role:manage")
+    asyncio.run(index.revoke_role(str(BOB), str(ADMIN)))
+    assert not index.has_permission(str(BOB), "role:manage")
+    assert index.has_permission(str(BOB), "user:view")
+    asyncio.run(index.revoke_role(str(BOB), str(MEMBER)))
+    assert index.get_permissions(str(BOB)) == frozenset()
+    assert index.rebuilds == 1
+
+def test_permission_grant_refreshes_role_members(db):
+    index = build_index()
+    asyncio.run(index.grant_permission(str(MEMBER), str(MANAGE)))
+    assert index.has_permission(str(BOB), "role:manage")
+    asyncio.run(index.revoke_permission(str(ADMIN), str(MANAGE)))
+    assert not index.has_permission(str(ALICE), "role:manage")
+    assert index.has_permission(str(ALICE), "user:view")
+
+def test_require_permission_allows_and_denies(db, monkeypatch):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    import main
+
+    index = build_index()
+    monkeypatch.setattr(main, "permission_index", index)
+    client = TestClient(main.app)
+    try:
+        for user, expected in ((ALICE, 200), (BOB, 403)):
+            main.app.dependency_overrides[main.get_current_user] = lambda user=user: SimpleNamespace(id=user)
+            assert client.get("/api/metrics/permissions").status_code == expected
+        # 授权接口写入后立即生效
+        main.app.dependency_overrides[main.get_current_user] = lambda: SimpleNamespace(id=ALICE)
+        assert client.post(f"/api/admin/users/{BOB}/roles/{ADMIN}").status_code == 200
+        main.app.dependency_overrides[main.get_current_user] = lambda: SimpleNamespace(id=BOB)
+        assert client.get("/api/metrics/permissions").status_code == 200
+    finally:
+        main.app.dependency_overrides.clear()
+
+@pytest.mark.parametrize("path", [
+    "/api/metrics/http",
+    "/api/metrics/page-cache",
+    "/api/metrics/llm",
+    "/api/metrics/password",
+    "/api/metrics/login-writer",
+    "/api/metrics/auth",
+    "/api/metrics/permissions"
+])
+def test_metrics_require_role_manage(db, monkeypatch, path):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    import main
+
+    monkeypatch.setattr(main, "permission_index", build_index())
+    client = TestClient(main.app)
+    try:
+        main.app.dependency_overrides[main.get_current_user] = lambda: SimpleNamespace(id=BOB)
+        assert client.get(path).status_code == 403
+        main.app.dependency_overrides[main.get_current_user] = lambda: SimpleNamespace(id=ALICE)
+        assert client.get(path).status_code == 200
+    finally:
+        main.app.dependency_overrides.clear()
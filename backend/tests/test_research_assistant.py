@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from config import PAGE_CACHE_CONFIG, RESEARCH_CONFIG
+import utils.research_assistant as research_assistant
+from utils.http_client import http_client
+from utils.page_cache import PageCache
+from utils.research_assistant import ResearchAssistant
+from fakes import FakeSearchProvider
+
+AREAS = ["领域A", "领域B"]
+
+def page(name: str) -> str:
+    words = " ".join(f"{name}_{i}_{hash((name, i)) % 9973}" for i in range(80))
+    return f"<html><body><p>{words}</p></body></html>"
+
+async def handle_page(request: web.Request) -> web.Response:
+    name = request.match_info["name"]
+    if name.startswith("slow"):
+        await asyncio.sleep(3)
+    if name.startswith("copy_"):
+        # 转载页：不同地址、相同内容
+        name = name[len("copy_"):]
+    return web.Response(text=page(name), content_type="text/html")
+
+async def run_research(monkeypatch, with_slow: bool, deadline: float, with_duplicates: bool = False):
+    monkeypatch.setattr(research_assistant, "page_cache", PageCache({**PAGE_CACHE_CONFIG, "backend": "memory"}))
+    # 所有页面都在同一本地主机上，放开单主机并发，避免慢页面占满主机配额
+    monkeypatch.setitem(RESEARCH_CONFIG, "per_host_concurrency", RESEARCH_CONFIG["max_concurrency"])
+    app = web.Application()
+    app.router.add_get("/{name}", handle_page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    assistant = ResearchAssistant(search_provider=FakeSearchProvider())
+    results = {}
+    for area in AREAS:
+        for q, query in enumerate(assistant.generate_search_queries(area)):
+            links = [
+                {"title": f"fast{a}", "link": f"http://127.0.0.1:{port}/fast{AREAS.index(area)}_{q}_{a}"}
+                for a in range(2)
+            ]
+            if with_duplicates:
+                first = links[0]["link"]
+                links.append({"title": "tracked", "link": f"{first}?utm_source=feed#top"})
+                links.append({"title": "copy", "link": first.replace("/fast", "/copy_fast")})
+            if with_slow:
+                links.append({"title": "slow", "link": f"http://127.0.0.1:{port}/slow{AREAS.index(area)}_{q}"})
+            results[query] = links
+    assistant.search_provider = FakeSearchProvider(results)
+
+    progress = []
+
+    async def on_progress(findings, state):
+        progress.append((len(findings), state["findings"]))
+
+    assistant.on_progress = on_progress
+    try:
+        start = time.monotonic()
+        result = await assistant.start_research("主题", AREAS, deadline_seconds=deadline)
+        return result, time.monotonic() - start, progress
+    finally:
+        await http_client.close()
+        await runner.cleanup()
+
+def test_fast_pages_all_recorded(monkeypatch):
+    result, _, _ = asyncio.run(run_research(monkeypatch, with_slow=False, deadline=5))
+    assert not result["partial"]
+    assert len(result["findings"]) == 12
+
+def test_duplicate_urls_and_pages_are_skipped(monkeypatch):
+    result, _, _ = asyncio.run(run_research(monkeypatch, with_slow=False, deadline=5, with_duplicates=True))
+    assert len(result["findings"]) == 12
+    # 每个查询各有一个跟踪参数变体和一个转载页
+    assert result["dedup"] == {"duplicate_urls": 6, "duplicate_pages": 6}
+    assert not any(finding["title"] == "tracked" for finding in result["findings"])
+
+def test_deadline_keeps_pages_finished_before_it(monkeypatch):
+    result, elapsed, progress = asyncio.run(run_research(monkeypatch, with_slow=True, deadline=1.5))
+    assert len(result["findings"]) == 12
+    assert all(finding["title"].startswith("fast") for finding in result["findings"])
+    assert elapsed < 2.5
+    # 每个页面完成后立即回调进度
+    assert sum(count for count, _ in progress) == 12
+
+class FailingSearchProvider(FakeSearchProvider):
+    async def search(self, query, max_results):
+        if query.endswith("数据分析"):
+            raise RuntimeError("search down")
+        return await super().search(query, max_results)
+
+def run_focus_area(provider):
+    assistant = ResearchAssistant(search_provider=provider)
+
+    async def fetch_and_parse(session, url):
+        return page(url.rsplit("/", 1)[-1])
+
+    assistant.fetch_and_parse = fetch_and_parse
+
+    async def scenario():
+        try:
+            start = time.monotonic()
+            findings = await assistant.research_focus_area("领域A")
+            return findings, time.monotonic() - start
+        finally:
+            await http_client.close()
+
+    return assistant, asyncio.run(scenario())
+
+def test_searches_run_concurrently():
+    provider = FakeSearchProvider(delay=0.3)
+    assistant, (findings, elapsed) = run_focus_area(provider)
+    assert provider.queries == assistant.generate_search_queries("领域A")
+    assert elapsed < 0.6
+    assert len(findings) == 3 * RESEARCH_CONFIG["results_per_query"]
+
+def test_failed_search_skips_only_its_query():
+    provider = FailingSearchProvider()
+    assistant, (findings, _) = run_focus_area(provider)
+    assert len(findings) == 2 * RESEARCH_CONFIG["results_per_query"]
+    assert not any("数据分析" in finding["source"] for finding in findings)
+
+def test_non_html_response_is_rejected_unread(monkeypatch):
+    cache = PageCache({**PAGE_CACHE_CONFIG, "backend": "memory"})
+    monkeypatch.setattr(research_assistant, "page_cache", cache)
+
+    async def handle(request):
+        body = "<p>中文页面</p>".encode("gbk")
+        if request.match_info["name"] == "pdf":
+            return web.Response(body=b"%PDF-1.4", content_type="application/pdf")
+        return web.Response(body=body, headers={"Content-Type": "text/html"})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/{name}", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        assistant = ResearchAssistant(search_provider=FakeSearchProvider())
+        try:
+            return [
+                await assistant.fetch_and_parse(http_client.session, f"http://127.0.0.1:{port}/{name}")
+                for name in ("pdf", "gbk")
+            ]
+        finally:
+            await http_client.close()
+            await runner.cleanup()
+
+    pdf, gbk = asyncio.run(scenario())
+    assert pdf is None
+    # 响应头未声明编码的 GBK 页面按内容判断编码
+    assert gbk == "中文页面"
+    assert len(cache.memory) == 1
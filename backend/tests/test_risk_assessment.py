@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from utils.risk_assessment import RiskAssessor, RiskFactor
+
+def baseline_level(score):
+    """原实现：按区间逐个判断，落不进任何区间的归为 high"""
+    for level, (min_score, max_score) in {"low": (0, 0.3), "medium": (0.3, 0.6), "high": (0.6, 1.0)}.items():
+        if min_score <= score < max_score:
+            return level
+    return "high"
+
+def factor(probability, impact, name="f"):
+    return RiskFactor(name=name, probability=probability, impact=impact, description="", mitigation="")
+
+@pytest.mark.parametrize("score", [-1.0, -0.01, 0.0, 0.1, 0.2999, 0.3, 0.45, 0.5999, 0.6, 0.99, 1.0, 1.5, float("nan")])
+def test_risk_level_matches_baseline(score):
+    assert RiskAssessor().determine_risk_level(score) == baseline_level(score)
+
+def test_assess_risks_matches_baseline():
+    rng = np.random.default_rng(0)
+    factors = [factor(p, i, name=f"f{k}") for k, (p, i) in enumerate(rng.uniform(-0.2, 1.2, (500, 2)).tolist())]
+    result = RiskAssessor().assess_risks(factors)
+    levels = [baseline_level(f.probability * f.impact) for f in factors]
+    assert [item["level"] for item in result["risk_factors"]] == levels
+    assert [item["score"] for item in result["risk_factors"]] == pytest.approx([f.probability * f.impact for f in factors])
+    overall = result["overall_assessment"]
+    for name in ("low", "medium", "high"):
+        assert overall[f"{name}_risk_count"] == levels.count(name)
+    average = np.mean([f.probability * f.impact for f in factors])
+    assert overall["average_score"] == pytest.approx(average)
+    assert overall["risk_level"] == baseline_level(average)
+
+def test_calculate_overall_risk_and_summary_only():
+    assessor = RiskAssessor()
+    factors = [factor(0.9, 0.9), factor(0.5, 0.8), factor(0.1, 0.5)]
+    full = assessor.assess_risks(factors)
+    summary = assessor.assess_risks(factors, include_factors=False)
+    assert "risk_factors" not in summary
+    assert summary["overall_assessment"] == full["overall_assessment"]
+    assert assessor.calculate_overall_risk(full["risk_factors"]) == full["overall_assessment"]
+    assert (full["overall_assessment"]["high_risk_count"], full["overall_assessment"]["medium_risk_count"]) == (1, 1)
+
+def test_empty_factor_list():
+    result = RiskAssessor().assess_risks([], monte_carlo=True)
+    assert result["risk_factors"] == []
+    assert result["overall_assessment"]["average_score"] == 0.0
+    assert result["monte_carlo"] == {"samples": 0}
+
+def test_monte_carlo_is_seeded_and_consistent():
+    assessor = RiskAssessor()
+    factors = [factor(0.7, 0.8), factor(0.2, 0.3), factor(0.5, 0.5)]
+    first = assessor.assess_risks(factors, monte_carlo=True, seed=3)["monte_carlo"]
+    second = assessor.assess_risks(factors, monte_carlo=True, seed=3)["monte_carlo"]
+    assert first == second
+    assert sum(first["level_probability"].values()) == pytest.approx(1.0)
+    assert 0 <= first["average_score"]["p5"] <= first["average_score"]["p50"] <= first["average_score"]["p95"] <= 1
+    assert first["high_risk_count"]["p95"] <= len(factors)
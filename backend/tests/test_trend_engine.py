@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from utils.trend_engine import TrendEngine, to_seconds
+
+def step_series(n=200, step_at=120, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0, 1, n) + np.arange(n) * 0.01
+    values[step_at:] += 20
+    return values
+
+def split(values, sizes):
+    bounds = np.cumsum([0, *sizes])
+    return [values[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+def test_to_seconds_is_resolution_independent():
+    expected = [100.0, 1704067200.5]
+    text = to_seconds(["1970-01-01T00:01:40.000Z", "2024-01-01T00:00:00.500Z", "not a date"])
+    assert text[:2].tolist() == expected
+    assert np.isnan(text[2])
+    for unit in ("ns", "us", "ms"):
+        stamps = np.array(["1970-01-01T00:01:40", "2024-01-01T00:00:00.5"], dtype=f"datetime64[{unit}]")
+        assert to_seconds(stamps).tolist() == expected
+
+def test_index_merge_matches_single_pass():
+    values = step_series()
+    single = TrendEngine(window_size=10).update(values).result()
+    shards = [TrendEngine(window_size=10).update(part) for part in split(values, [30, 50, 120])]
+    merged = TrendEngine.merge_all(shards).result()
+
+    assert merged["statistics"] == pytest.approx(single["statistics"])
+    assert merged["slope"] == pytest.approx(np.polyfit(np.arange(len(values)), values, 1)[0])
+    assert merged["statistics"]["std"] == pytest.approx(values.std(ddof=1))
+    # 分片边界与窗口对齐时窗口和变点也完全一致
+    assert merged["windows"] == pytest.approx(single["windows"])
+    assert [point["position"] for point in merged["change_points"]] == [120]
+    assert [point["position"] for point in single["change_points"]] == [120]
+
+def test_unaligned_shards_keep_moments():
+    values = step_series()
+    single = TrendEngine(window_size=10).update(values).result()
+    shards = [TrendEngine(window_size=10).update(part) for part in split(values, [7, 64, 129])]
+    merged = TrendEngine.merge_all(shards).result()
+    assert merged["statistics"] == pytest.approx(single["statistics"])
+    assert merged["slope"] == pytest.approx(single["slope"])
+    # 左分片尾部单独成窗，只有最后一个分片尾部不足一个窗口的数据未计入窗口
+    assert len(values) - 10 < sum(window["count"] for window in merged["windows"]) <= len(values)
+
+def test_time_based_merge_is_order_independent():
+    values = step_series()
+    stamps = pd.date_range("2024-01-01", periods=len(values), freq="min", tz="UTC")
+    single = TrendEngine(window_size=10).update(values, stamps).result()
+    late, early = (
+        TrendEngine(window_size=10).update(values[100:], stamps[100:]),
+        TrendEngine(window_size=10).update(values[:100], stamps[:100])
+    )
+    merged = TrendEngine.merge_all([late, early]).result()
+
+    seconds = (stamps - stamps[0]) / pd.Timedelta(seconds=1)
+    assert merged["slope"] == pytest.approx(np.polyfit(np.asarray(seconds), values, 1)[0])
+    assert merged["slope"] == pytest.approx(single["slope"])
+    assert merged["statistics"] == pytest.approx(single["statistics"])
+    assert merged["first"]["position"] == "2024-01-01T00:00:00+00:00"
+    assert [point["position"] for point in merged["change_points"]] == ["2024-01-01T02:00:00+00:00"]
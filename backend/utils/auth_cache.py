@@ -0,0 +1,63 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+import time
+from config import AUTH_CACHE_CONFIG
+from utils.cache import TTLCache, SingleFlight
+
+class AuthCache:
+    """缓存已验证的 token 载荷和用户信息，减少每个请求的 JWT 校验和数据库查询"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**AUTH_CACHE_CONFIG, **(config or {})}
+        self.tokens = TTLCache(max_size=self.config['token_cache_size'], ttl=self.config['token_ttl_seconds'])
+        self.users = TTLCache(max_size=self.config['user_cache_size'], ttl=self.config['user_ttl_seconds'])
+        self._flight = SingleFlight() if self.config['single_flight'] else None
+        # 查询期间发生过失效时不缓存查询结果，避免写回修改前的用户信息
+        self._invalidations = 0
+
+    def decode_token(self, token: str, decode: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """返回 token 载荷，未命中时调用 decode 校验；缓存时间不超过 token 的 exp"""
+        payload = self.tokens.get(token)
+        if payload is not None:
+            return payload
+
+        payload = decode(token)
+        ttl = self.config['token_ttl_seconds']
+        if payload.get("exp") is not None:
+            ttl = min(ttl, float(payload["exp"]) - time.time())
+        if ttl > 0:
+            self.tokens.set(token, payload, ttl=ttl)
+        return payload
+
+    async def get_user(self, user_id: str, load: Callable[[str], Awaitable[Any]]) -> Any:
+        """返回用户，未命中时调用 load 查询；同一用户的并发查询只执行一次"""
+        user = self.users.get(user_id)
+        if user is not None:
+            return user
+
+        invalidations = self._invalidations
+        if self._flight is not None:
+            user = await self._flight.do(user_id, load, user_id)
+        else:
+            user = await load(user_id)
+        if user is not None and invalidations == self._invalidations:
+            self.users.set(user_id, user)
+        return user
+
+    def invalidate_user(self, user_id: str):
+        """用户信息更新后调用"""
+        self._invalidations += 1
+        self.users.delete(str(user_id))
+        if self._flight is not None:
+            self._flight.discard(str(user_id))
+
+    def invalidate_token(self, token: str):
+        self.tokens.delete(token)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens.get_stats(),
+            "users": self.users.get_stats(),
+            "coalesced_lookups": self._flight.coalesced if self._flight is not None else 0
+        }
+
+auth_cache = AuthCache()
@@ -0,0 +1,218 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+_MISSING = object()
+
+class TTLCache:
+    """进程内 LRU 缓存，支持全局 TTL 和单条目 TTL"""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._expires: Dict[Hashable, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.delete(key)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if ttl is not None:
+            self._expires[key] = time.monotonic() + ttl
+        else:
+            self._expires.pop(key, None)
+
+        while len(self._data) > self.max_size:
+            oldest, _ = self._data.popitem(last=False)
+            self._expires.pop(oldest, None)
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+        self._expires.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+        self._expires.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        expires_at = self._expires.get(key)
+        return key in self._data and (expires_at is None or expires_at > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0
+        }
+
+class SingleFlight:
+    """合并相同 key 的并发请求，只执行一次，结果共享给所有等待者"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            # 以独立任务执行，首个调用方被取消时不影响其它等待者
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def discard(self, key: Hashable):
+        """之后的调用不再复用进行中的请求，已在等待的调用方不受影响"""
+        self._calls.pop(key, None)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # 标记异常已读取，避免无人等待时的告警
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+class KeyedLock:
+    """按 key 互斥的异步锁，没有持有者和等待者时清理该 key 的锁"""
+
+    def __init__(self):
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self._holders: Dict[Hashable, int] = {}
+
+    @asynccontextmanager
+    async def acquire(self, key: Hashable) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._holders[key] = self._holders.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._holders[key] -= 1
+            if not self._holders[key]:
+                del self._holders[key]
+                del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+class DiskStore:
+    """本地磁盘键值存储，每个条目一个JSON文件，超出上限时淘汰最久未访问的文件"""
+
+    def __init__(self, path: str, max_entries: int, evict_interval: int = 100):
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_interval = evict_interval
+        self._writes = 0
+        # 目录在首次写入时创建，导入模块时不触碰磁盘
+        self._dir_ready = False
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.get_running_loop().run_in_executor(None, self._read, key)
+
+    async def set(self, key: str, entry: Dict[str, Any]):
+        await asyncio.get_running_loop().run_in_executor(None, self._write, key, entry)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file(key), encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(self._file(key))  # 更新访问时间用于LRU淘汰
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, entry: Dict[str, Any]):
+        if not self._dir_ready:
+            os.makedirs(self.path, exist_ok=True)
+            self._dir_ready = True
+        # 临时文件名唯一，同一 key 并发写入时互不覆盖，os.replace 保证读到完整文件
+        fd, tmp_file = tempfile.mkstemp(dir=self.path, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_file, self._file(key))
+        except BaseException:
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+            raise
+        # 每隔若干次写入扫描一次目录，避免每次写入都遍历
+        self._writes += 1
+        if self._writes % self.evict_interval == 0:
+            self._evict()
+
+    def _evict(self):
+        try:
+            files = [f for f in os.scandir(self.path) if f.name.endswith(".json")]
+        except OSError:
+            return
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=lambda f: f.stat().st_mtime)
+        for f in files[:len(files) - self.max_entries]:
+            try:
+                os.remove(f.path)
+            except OSError:
+                pass
+
+class MongoStore:
+    """MongoDB键值存储，过期由集合 stored_at 字段上的TTL索引负责"""
+
+    def __init__(self, collection_name: str):
+        from database import db
+        self.collection = db[collection_name]
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        doc = await self.collection.find_one({"_id": key})
+        if doc:
+            doc.pop("_id", None)
+            doc.pop("stored_at", None)
+        return doc
+
+    async def set(self, key: str, entry: Dict[str, Any]):
+        await self.collection.replace_one(
+            {"_id": key},
+            {**entry, "stored_at": datetime.utcnow()},
+            upsert=True
+        )
@@ -1,117 +1,332 @@
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any
+import hashlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, AsyncIterable, Iterable, Iterator, Optional, Tuple, Union
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
 from textblob import TextBlob
+from config import ANALYSIS_CONFIG
+from utils.cache import TTLCache
+from utils.trend_engine import TrendEngine
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+def score_sentiments(texts: List[str]) -> List[Tuple[float, float]]:
+    """计算一批文本的 (polarity, subjectivity)，供进程池调用"""
+    results = []
+    for text in texts:
+        sentiment = TextBlob(text).sentiment
+        results.append((sentiment.polarity, sentiment.subjectivity))
+    return results
+
+_sentiment_pool: ProcessPoolExecutor = None
+
+def get_sentiment_pool() -> ProcessPoolExecutor:
+    global _sentiment_pool
+    if _sentiment_pool is None:
+        _sentiment_pool = ProcessPoolExecutor(max_workers=ANALYSIS_CONFIG['sentiment_workers'])
+    return _sentiment_pool
+
+def shutdown_sentiment_pool():
+    global _sentiment_pool
+    if _sentiment_pool is not None:
+        _sentiment_pool.shutdown(wait=False, cancel_futures=True)
+        _sentiment_pool = None
+
+# 单条文本的情感结果缓存，按文本哈希
+sentiment_cache = TTLCache(max_size=ANALYSIS_CONFIG['sentiment_cache_size'])
 
 class DataAnalyzer:
     def __init__(self):
         self.scaler = MinMaxScaler()
         
-    def analyze_trends(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """分析数据趋势"""
+    def analyze_trends(self, data: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """分析数据趋势，分块累计统计量，可直接传入生成器"""
         try:
-            df = pd.DataFrame(data)
-            
-            # 时间序列分析
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                df = df.sort_values('timestamp')
-                
-            # 计算基本统计量
-            stats = {
-                'count': len(df),
-                'mean': df.get('value', 0).mean(),
-                'std': df.get('value', 0).std(),
-                'min': df.get('value', 0).min(),
-                'max': df.get('value', 0).max()
-            }
-            
-            # 识别趋势
-            if len(df) > 1:
-                trend = 'increasing' if df['value'].iloc[-1] > df['value'].iloc[0] else 'decreasing'
-            else:
-                trend = 'unknown'
-                
-            return {
-                'statistics': stats,
-                'trend': trend
-            }
+            engine = TrendEngine()
+            data = iter(data)
+            while True:
+                chunk = list(islice(data, ANALYSIS_CONFIG['trend_chunk_size']))
+                if not chunk:
+                    break
+                engine.update_records(chunk)
+            return engine.result()
+        except Exception as e:
+            print(f"趋势分析错误: {str(e)}")
+            return {}
+    
+    async def analyze_trends_stream(self, chunks: AsyncIterable[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """分析异步数据流的趋势"""
+        try:
+            engine = await TrendEngine().consume(chunks)
+            return engine.result()
         except Exception as e:
             print(f"趋势分析错误: {str(e)}")
             return {}
             
-    def cluster_analysis(self, data: List[Dict[str, Any]], n_clusters: int = 3) -> Dict[str, Any]:
-        """聚类分析"""
+    def cluster_analysis(
+        self,
+        data: Union[List[Dict[str, Any]], pd.DataFrame, np.ndarray],
+        n_clusters: Optional[int] = 3,
+        include_labels: bool = True
+    ) -> Dict[str, Any]:
+        """聚类分析，n_clusters 为 None 时按轮廓系数自动选择；数据量大时分块训练 MiniBatchKMeans"""
         try:
             # 准备数据
-            features = self.prepare_features(data)
+            features = data if isinstance(data, np.ndarray) else self.prepare_features(data)
+            large = len(features) > ANALYSIS_CONFIG['minibatch_threshold']
             
-            # 标准化
-            scaled_features = self.scaler.fit_transform(features)
+            # 分块拟合标准化参数，避免生成完整的标准化副本
+            self.scaler = MinMaxScaler()
+            for start in range(0, len(features), ANALYSIS_CONFIG['cluster_chunk_size']):
+                self.scaler.partial_fit(features[start:start + ANALYSIS_CONFIG['cluster_chunk_size']])
             
-            # KMeans聚类
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-            clusters = kmeans.fit_predict(scaled_features)
+            silhouette_scores = None
+            if n_clusters is None:
+                n_clusters, silhouette_scores = self._select_n_clusters(features)
             
-            # 分析结果
-            cluster_stats = []
-            for i in range(n_clusters):
-                cluster_data = features[clusters == i]
-                stats = {
-                    'size': len(cluster_data),
-                    'center': kmeans.cluster_centers_[i].tolist(),
-                    'variance': cluster_data.var(axis=0).mean()
-                }
-                cluster_stats.append(stats)
-                
-            return {
+            labels = None
+            if large:
+                model = self._fit_minibatch(features, n_clusters)
+            else:
+                model = KMeans(n_clusters=n_clusters, random_state=ANALYSIS_CONFIG['random_state'])
+                labels = model.fit_predict(self.scaler.transform(features))
+            
+            clusters, cluster_stats = self._cluster_stats(features, model, labels)
+            
+            result = {
                 'n_clusters': n_clusters,
-                'cluster_stats': cluster_stats,
-                'labels': clusters.tolist()
+                'algorithm': 'minibatch_kmeans' if large else 'kmeans',
+                'cluster_stats': cluster_stats
             }
+            if silhouette_scores is not None:
+                result['silhouette_scores'] = silhouette_scores
+            if include_labels:
+                result['labels'] = clusters.tolist()
+            return result
         except Exception as e:
             print(f"聚类分析错误: {str(e)}")
             return {}
+    
+    def _select_n_clusters(self, features: np.ndarray) -> Tuple[int, Dict[int, float]]:
+        """在采样数据上按轮廓系数选择聚类数"""
+        rng = np.random.default_rng(ANALYSIS_CONFIG['random_state'])
+        size = min(len(features), ANALYSIS_CONFIG['silhouette_sample_size'])
+        if size < len(features):
+            features = features[np.sort(rng.choice(len(features), size, replace=False))]
+        sample = self.scaler.transform(features)
+        
+        scores = {}
+        for k in range(2, min(ANALYSIS_CONFIG['max_clusters'], size - 1) + 1):
+            labels = KMeans(n_clusters=k, random_state=ANALYSIS_CONFIG['random_state']).fit_predict(sample)
+            if len(np.unique(labels)) > 1:
+                scores[k] = float(silhouette_score(sample, labels))
+        
+        if not scores:
+            return 1, scores
+        return max(scores, key=scores.get), scores
+    
+    def _fit_minibatch(self, features: np.ndarray, n_clusters: int) -> MiniBatchKMeans:
+        """按随机顺序逐块 partial_fit，内存占用只与块大小有关"""
+        chunk_size = ANALYSIS_CONFIG['cluster_chunk_size']
+        model = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            batch_size=chunk_size,
+            random_state=ANALYSIS_CONFIG['random_state']
+        )
+        rng = np.random.default_rng(ANALYSIS_CONFIG['random_state'])
+        for start in rng.permutation(np.arange(0, len(features), chunk_size)):
+            batch = features[start:start + chunk_size]
+            # 末尾不足 n_clusters 的小块无法初始化中心，直接跳过
+            if len(batch) >= n_clusters:
+                model.partial_fit(self.scaler.transform(batch))
+        return model
+    
+    def _cluster_stats(
+        self,
+        features: np.ndarray,
+        model: Union[KMeans, MiniBatchKMeans],
+        labels: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """一次遍历分块预测标签并按簇累计样本数、和与平方和"""
+        chunk_size = ANALYSIS_CONFIG['cluster_chunk_size']
+        n_clusters = model.n_clusters
+        n_samples, n_features = features.shape
+        
+        # 以首块均值平移，减小平方和公式的舍入误差
+        shift = features[:chunk_size].mean(axis=0)
+        clusters = np.empty(n_samples, dtype=np.int32)
+        sums = np.zeros((n_clusters, n_features))
+        squares = np.zeros((n_clusters, n_features))
+        
+        for start in range(0, n_samples, chunk_size):
+            block = features[start:start + chunk_size]
+            if labels is None:
+                clusters[start:start + len(block)] = model.predict(self.scaler.transform(block))
+            else:
+                clusters[start:start + len(block)] = labels[start:start + len(block)]
+            one_hot = np.eye(n_clusters)[clusters[start:start + len(block)]]
+            centered = block - shift
+            sums += one_hot.T @ centered
+            squares += one_hot.T @ (centered * centered)
+        
+        sizes = np.bincount(clusters, minlength=n_clusters)
+        counts = np.maximum(sizes, 1)[:, None]
+        means = sums / counts
+        variances = np.maximum(squares / counts - means * means, 0).mean(axis=1)
+        
+        cluster_stats = [
+            {
+                'size': int(size),
+                'center': center.tolist(),
+                'variance': float(variance)
+            }
+            for size, center, variance in zip(sizes, model.cluster_centers_, variances)
+        ]
+        return clusters, cluster_stats
             
-    def sentiment_analysis(self, texts: List[str]) -> Dict[str, Any]:
-        """情感分析"""
+    def sentiment_analysis(self, texts: Iterable[str], summary_only: bool = False) -> Dict[str, Any]:
+        """情感分析，summary_only 时只累计整体情感，不保留逐条结果"""
         try:
             sentiments = []
-            for text in texts:
-                blob = TextBlob(text)
-                sentiment = {
-                    'text': text,
-                    'polarity': blob.sentiment.polarity,
-                    'subjectivity': blob.sentiment.subjectivity
-                }
-                sentiments.append(sentiment)
+            count = 0
+            total_polarity = 0.0
+            total_subjectivity = 0.0
+            for sentiment in self.iter_sentiments(texts):
+                count += 1
+                total_polarity += sentiment['polarity']
+                total_subjectivity += sentiment['subjectivity']
+                if not summary_only:
+                    sentiments.append(sentiment)
                 
             # 计算整体情感
-            avg_polarity = sum(s['polarity'] for s in sentiments) / len(sentiments)
-            avg_subjectivity = sum(s['subjectivity'] for s in sentiments) / len(sentiments)
-            
-            return {
+            result = {
+                'count': count,
                 'overall_sentiment': {
-                    'polarity': avg_polarity,
-                    'subjectivity': avg_subjectivity
-                },
-                'detailed_sentiments': sentiments
+                    'polarity': total_polarity / count,
+                    'subjectivity': total_subjectivity / count
+                }
             }
+            if not summary_only:
+                result['detailed_sentiments'] = sentiments
+            return result
         except Exception as e:
             print(f"情感分析错误: {str(e)}")
             return {}
+    
+    def iter_sentiments(self, texts: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """按输入顺序逐条产出情感结果，分块提交进程池并限制在途分块数"""
+        texts = iter(texts)
+        pending = deque()
+        while True:
+            chunk = list(islice(texts, ANALYSIS_CONFIG['sentiment_chunk_size']))
+            if not chunk:
+                break
+            pending.append(self._submit_sentiments(chunk))
+            if len(pending) >= ANALYSIS_CONFIG['sentiment_max_inflight']:
+                yield from self._collect_sentiments(*pending.popleft())
+        while pending:
+            yield from self._collect_sentiments(*pending.popleft())
+    
+    def _submit_sentiments(self, chunk: List[str]) -> Tuple[List[str], List[bytes], Dict[bytes, Tuple[float, float]], List[bytes], Future]:
+        """查缓存并提交未命中的文本，少量文本直接在当前进程计算"""
+        keys = [hashlib.sha1(text.encode('utf-8')).digest() for text in chunk]
+        known = {}
+        missing = {}
+        for key, text in zip(keys, chunk):
+            if key in known or key in missing:
+                continue
+            cached = sentiment_cache.get(key)
+            if cached is None:
+                missing[key] = text
+            else:
+                known[key] = cached
+        
+        if len(missing) <= ANALYSIS_CONFIG['sentiment_inline_max']:
+            future = Future()
+            future.set_result(score_sentiments(list(missing.values())))
+        else:
+            future = get_sentiment_pool().submit(score_sentiments, list(missing.values()))
+        return chunk, keys, known, list(missing), future
+    
+    def _collect_sentiments(
+        self,
+        chunk: List[str],
+        keys: List[bytes],
+        known: Dict[bytes, Tuple[float, float]],
+        missing: List[bytes],
+        future: Future
+    ) -> Iterator[Dict[str, Any]]:
+        for key, result in zip(missing, future.result()):
+            sentiment_cache.set(key, result)
+            known[key] = result
+        for text, key in zip(chunk, keys):
+            polarity, subjectivity = known[key]
+            yield {
+                'text': text,
+                'polarity': polarity,
+                'subjectivity': subjectivity
+            }
             
-    def prepare_features(self, data: List[Dict[str, Any]]) -> np.ndarray:
-        """准备特征数据"""
-        # 示例特征提取，需要根据实际数据调整
-        features = []
-        for item in data:
-            feature = [
-                float(item.get('value', 0)),
-                len(str(item.get('text', ''))),
-                item.get('importance', 0)
-            ]
-            features.append(feature)
-        return np.array(features) 
\ No newline at end of file
+    def prepare_features(
+        self,
+        data: Union[List[Dict[str, Any]], pd.DataFrame, Any],
+        features: Optional[List[Dict[str, Any]]] = None,
+        dtype: Optional[str] = None
+    ) -> np.ndarray:
+        """按特征定义逐列构建特征矩阵，支持字典列表、DataFrame 和 Arrow 表"""
+        features = features or ANALYSIS_CONFIG['features']
+        dtype = np.dtype(dtype or ANALYSIS_CONFIG['feature_dtype'])
+        
+        if isinstance(data, pd.DataFrame):
+            extract = self._dataframe_column
+        elif pa is not None and isinstance(data, pa.Table):
+            extract = self._arrow_column
+        else:
+            extract = self._records_column
+        
+        matrix = np.empty((len(data), len(features)), dtype=dtype)
+        for i, feature in enumerate(features):
+            matrix[:, i] = extract(data, feature, dtype)
+        return matrix
+    
+    @staticmethod
+    def _records_column(data: List[Dict[str, Any]], feature: Dict[str, Any], dtype: np.dtype) -> np.ndarray:
+        source, default = feature['source'], feature.get('default')
+        if feature['kind'] == 'length':
+            values = (len(str(item.get(source, default))) for item in data)
+        else:
+            values = (item.get(source, default) for item in data)
+        return np.fromiter(values, dtype=dtype, count=len(data))
+    
+    @staticmethod
+    def _dataframe_column(data: pd.DataFrame, feature: Dict[str, Any], dtype: np.dtype) -> np.ndarray:
+        source, default = feature['source'], feature.get('default')
+        if source not in data.columns:
+            column = pd.Series(default, index=data.index)
+        else:
+            column = data[source].fillna(default)
+        if feature['kind'] == 'length':
+            return column.astype(str).str.len().to_numpy(dtype=dtype)
+        return column.to_numpy(dtype=dtype)
+    
+    @staticmethod
+    def _arrow_column(data: Any, feature: Dict[str, Any], dtype: np.dtype) -> np.ndarray:
+        source, default = feature['source'], feature.get('default')
+        if source not in data.column_names:
+            fill = len(str(default)) if feature['kind'] == 'length' else default
+            return np.full(data.num_rows, fill, dtype=dtype)
+        column = data.column(source)
+        if feature['kind'] == 'length':
+            column = pc.fill_null(pc.utf8_length(pc.cast(column, pa.string())), len(str(default)))
+        else:
+            column = pc.fill_null(column, default)
+        return column.to_numpy().astype(dtype, copy=False)
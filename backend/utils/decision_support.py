@@ -1,6 +1,19 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+import json
+import time
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field, replace
+from config import DECISION_CONFIG, RISK_CONFIG
+from utils.cache import TTLCache
+from utils.risk_assessment import RiskAssessor, RiskFactor
+
+SEVERITY_LABELS = {'high': '高', 'medium': '中', 'low': '低'}
+
+risk_assessor = RiskAssessor()
+
+# 选项风险画像缓存，按风险相关内容的哈希复用
+risk_profile_cache = TTLCache(max_size=RISK_CONFIG['profile_cache_size'])
 
 @dataclass
 class DecisionOption:
@@ -9,6 +22,8 @@ class DecisionOption:
     pros: List[str]
     cons: List[str]
     criteria_scores: Dict[str, float]
+    # 可选的量化风险：name, probability, impact, description, mitigation
+    risks: List[Dict[str, Any]] = field(default_factory=list)
 
 @dataclass
 class DecisionCriterion:
@@ -20,17 +35,76 @@ class DecisionSupport:
     def __init__(self):
         self.options: List[DecisionOption] = []
         self.criteria: List[DecisionCriterion] = []
+        self.criterion_names: List[str] = []
+        self.score_matrix: np.ndarray = None
+        self.weights: np.ndarray = None
+        # 最近一次分析的得分和报告，用于增量更新
+        self.scores: np.ndarray = None
+        self.report: Dict[str, Any] = None
+        self._title_index: Dict[str, int] = None
     
     def add_option(self, option: DecisionOption):
-        """添加决策选项"""
+        """添加决策选项，已分析过时只计算新增行"""
+        # 量化风险缺少字段或数值无效时立即报错，而不是等到风险分析时
+        self._risk_factors(option)
         self.options.append(option)
+        if self.scores is not None:
+            row = self._option_row(option)
+            self.score_matrix = np.vstack([self.score_matrix, row])
+            self.scores = np.append(self.scores, row @ self.weights)
+            self._title_index = None
+    
+    def update_option(self, title: str, changes: Dict[str, Any]):
+        """修改选项，criteria_scores 按标准合并，只重算该选项的得分"""
+        i = self._index_of(title)
+        changes = dict(changes)
+        if "criteria_scores" in changes:
+            changes["criteria_scores"] = {**self.options[i].criteria_scores, **changes["criteria_scores"]}
+        option = replace(self.options[i], **changes)
+        self._risk_factors(option)
+        self.options[i] = option
+        self._title_index = None
+        if self.scores is not None:
+            self.score_matrix[i] = self._option_row(self.options[i])
+            self.scores[i] = self.score_matrix[i] @ self.weights
+    
+    def remove_option(self, title: str):
+        """删除选项"""
+        i = self._index_of(title)
+        del self.options[i]
+        self._title_index = None
+        if self.scores is not None:
+            self.score_matrix = np.delete(self.score_matrix, i, axis=0)
+            self.scores = np.delete(self.scores, i)
+    
+    def set_weight(self, name: str, weight: float):
+        """修改标准权重，得分按变化量做秩一更新"""
+        matching = [criterion for criterion in self.criteria if criterion.name == name]
+        if not matching:
+            self.add_criterion(DecisionCriterion(name=name, weight=weight, description=""))
+            if self.scores is not None:
+                column = np.array([option.criteria_scores.get(name, 0.0) for option in self.options], dtype=float)
+                self.criterion_names.append(name)
+                self.score_matrix = np.column_stack([self.score_matrix, column])
+                self.weights = np.append(self.weights, weight)
+                self.scores = self.scores + column * weight
+            return
+        
+        # 同名标准合并为一个权重
+        matching[0].weight = weight
+        for criterion in matching[1:]:
+            criterion.weight = 0.0
+        if self.scores is not None:
+            j = self.criterion_names.index(name)
+            self.scores = self.scores + self.score_matrix[:, j] * (weight - self.weights[j])
+            self.weights[j] = weight
     
     def add_criterion(self, criterion: DecisionCriterion):
         """添加决策标准"""
         self.criteria.append(criterion)
     
-    def analyze_decision(self) -> Dict[str, Any]:
-        """分析决策并提供建议"""
+    def analyze_decision(self, seed: Optional[int] = None) -> Dict[str, Any]:
+        """分析决策并提供建议，seed 用于复现敏感性分析结果"""
         if not self.options or not self.criteria:
             raise ValueError("需要至少一个选项和标准")
         
@@ -41,63 +115,245 @@ class DecisionSupport:
         ranked_options = self._rank_options(scores)
         
         # 生成分析报告
-        return self._generate_analysis_report(ranked_options)
-    
-    def _calculate_weighted_scores(self) -> Dict[str, float]:
-        """计算每个选项的加权得分"""
-        scores = {}
-        
-        for option in self.options:
-            total_score = 0
-            for criterion in self.criteria:
-                if criterion.name in option.criteria_scores:
-                    score = option.criteria_scores[criterion.name]
-                    weighted_score = score * criterion.weight
-                    total_score += weighted_score
-            scores[option.title] = total_score
-            
-        return scores
+        return self._generate_analysis_report(ranked_options, scores, seed)
     
-    def _rank_options(self, scores: Dict[str, float]) -> List[Dict[str, Any]]:
-        """对选项进行排序"""
-        ranked = [
-            {
-                "title": title,
-                "score": score,
-                "option": next(opt for opt in self.options if opt.title == title)
-            }
-            for title, score in scores.items()
-        ]
+    @classmethod
+    def analyze_batch(
+        cls,
+        supports: List["DecisionSupport"],
+        seed: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """批量分析多个决策：同形状的决策堆叠为 (决策 × 选项 × 标准) 张量统一计算得分，单项出错不影响其它项"""
+        results: List[Dict[str, Any]] = [None] * len(supports)
+        valid = []
+        for i, support in enumerate(supports):
+            if not support.options or not support.criteria:
+                results[i] = {"success": False, "error": "需要至少一个选项和标准"}
+                continue
+            try:
+                support.criterion_names, support.score_matrix, support.weights = support._build_matrices()
+            except (TypeError, ValueError) as e:
+                results[i] = {"success": False, "error": f"评分数据无效: {str(e)}"}
+                continue
+            valid.append(i)
         
-        return sorted(ranked, key=lambda x: x["score"], reverse=True)
+        if not valid:
+            return results
+        
+        # 选项数和标准数相同的决策堆叠为一个张量计算，避免按最大形状补零；
+        # 每个张量的元素数有上限，形状独特的决策直接做矩阵向量乘
+        shapes: Dict[Tuple[int, int], List[int]] = {}
+        for i in valid:
+            shapes.setdefault(supports[i].score_matrix.shape, []).append(i)
+        item_scores: Dict[int, np.ndarray] = {}
+        for (n_options, n_criteria), members in shapes.items():
+            chunk = max(1, DECISION_CONFIG['batch_max_tensor_elements'] // max(n_options * n_criteria, 1))
+            for start in range(0, len(members), chunk):
+                part = members[start:start + chunk]
+                if len(part) == 1:
+                    item_scores[part[0]] = supports[part[0]].score_matrix @ supports[part[0]].weights
+                    continue
+                tensor = np.stack([supports[i].score_matrix for i in part])
+                weights = np.stack([supports[i].weights for i in part])
+                for i, scores in zip(part, np.einsum("boc,bc->bo", tensor, weights)):
+                    item_scores[i] = scores
+        
+        budget_ms = DECISION_CONFIG['batch_sensitivity_budget_ms'] / len(valid)
+        for i in valid:
+            support = supports[i]
+            scores = item_scores[i]
+            try:
+                analysis = support._generate_analysis_report(
+                    support._rank_options(scores),
+                    scores,
+                    None if seed is None else seed + i,
+                    budget_ms
+                )
+            except Exception as e:
+                results[i] = {"success": False, "error": str(e)}
+            else:
+                results[i] = {"success": True, "analysis": analysis}
+        return results
     
-    def _generate_analysis_report(self, ranked_options: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """生成决策分析报告"""
-        best_option = ranked_options[0]
-        score_range = max(opt["score"] for opt in ranked_options) - min(opt["score"] for opt in ranked_options)
+    def apply_changes(self, operations: List[Dict[str, Any]], recompute_sensitivity: bool = False) -> Dict[str, Any]:
+        """增量应用修改（增删改选项、调整权重），只返回与上次分析结果的差异"""
+        if self.report is None:
+            self.analyze_decision()
+        previous = {item["title"]: item for item in self.report["rankings"]}
+        previous_best = self.report["recommendation"]["best_option"]
+        touched = set()
         
-        report = {
-            "recommendation": {
-                "best_option": best_option["title"],
-                "confidence": self._calculate_confidence(best_option["score"], score_range),
-                "reasoning": self._generate_reasoning(best_option["option"])
+        for operation in operations:
+            kind = operation.get("op")
+            if kind == "add_option":
+                option = DecisionOption(**{"pros": [], "cons": [], **operation["option"]})
+                self.add_option(option)
+                touched.add(option.title)
+            elif kind == "update_option":
+                self.update_option(operation["title"], operation["option"])
+                touched.add(operation["option"].get("title", operation["title"]))
+            elif kind == "remove_option":
+                self.remove_option(operation["title"])
+            elif kind == "set_weight":
+                self.set_weight(operation["criterion"], float(operation["weight"]))
+            else:
+                raise ValueError(f"不支持的操作: {kind}")
+        
+        if not self.options:
+            raise ValueError("需要至少一个选项和标准")
+        self._refresh_report(touched, recompute_sensitivity)
+        
+        current = {item["title"]: item for item in self.report["rankings"]}
+        diff = {
+            "changed_scores": {
+                title: item["score"] for title, item in current.items()
+                if title not in previous or not self._same_score(previous[title]["score"], item["score"])
             },
-            "rankings": [
+            "rank_changes": [
                 {
-                    "rank": i + 1,
-                    "title": opt["title"],
-                    "score": opt["score"],
-                    "pros": opt["option"].pros,
-                    "cons": opt["option"].cons
+                    "title": title,
+                    "old_rank": previous[title]["rank"] if title in previous else None,
+                    "new_rank": item["rank"]
                 }
-                for i, opt in enumerate(ranked_options)
+                for title, item in current.items()
+                if title not in previous or previous[title]["rank"] != item["rank"]
             ],
-            "sensitivity_analysis": self._perform_sensitivity_analysis(),
-            "risk_analysis": self._analyze_risks()
+            "removed": [title for title in previous if title not in current],
+            "risk_analysis": [risk for risk in self.report["risk_analysis"] if risk["option"] in touched],
+            "sensitivity_stale": self.report["sensitivity_analysis"].get("stale", False)
+        }
+        if self.report["recommendation"]["best_option"] != previous_best:
+            diff["recommendation"] = self.report["recommendation"]
+        if recompute_sensitivity:
+            diff["sensitivity_analysis"] = self.report["sensitivity_analysis"]
+        return diff
+    
+    @staticmethod
+    def _same_score(old: float, new: float) -> bool:
+        """秩一更新会累积浮点误差，误差范围内的得分视为未变化"""
+        return bool(np.isclose(old, new, rtol=DECISION_CONFIG['score_rtol'], atol=DECISION_CONFIG['score_atol']))
+    
+    def _refresh_report(self, touched: set, recompute_sensitivity: bool):
+        """基于当前得分刷新报告：重排名次，只重算受影响选项的风险"""
+        ranked_options = self._rank_options(self.scores)
+        report = self.report
+        report["recommendation"] = self._build_recommendation(ranked_options)
+        report["rankings"] = self._build_rankings(ranked_options)
+        
+        titles = {option.title for option in self.options}
+        touched_risks, touched_profiles = self._analyze_risks(
+            [option for option in self.options if option.title in touched]
+        )
+        report["risk_analysis"] = [
+            risk for risk in report["risk_analysis"]
+            if risk["option"] in titles and risk["option"] not in touched
+        ] + touched_risks
+        report["risk_profiles"] = {
+            title: profile for title, profile in report["risk_profiles"].items()
+            if title in titles and title not in touched
+        }
+        report["risk_profiles"].update(touched_profiles)
+        
+        if recompute_sensitivity:
+            report["sensitivity_analysis"] = self._perform_sensitivity_analysis(self.scores)
+        else:
+            report["sensitivity_analysis"]["stale"] = True
+    
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """导出当前选项和标准，用于保存"""
+        return {
+            "options": [asdict(option) for option in self.options],
+            "criteria": [asdict(criterion) for criterion in self.criteria]
+        }
+    
+    def _index_of(self, title: str) -> int:
+        if self._title_index is None:
+            self._title_index = {}
+            for i, option in enumerate(self.options):
+                self._title_index.setdefault(option.title, i)
+        if title not in self._title_index:
+            raise KeyError(f"选项不存在: {title}")
+        return self._title_index[title]
+    
+    def _option_row(self, option: DecisionOption) -> np.ndarray:
+        return np.array([option.criteria_scores.get(name, 0.0) for name in self.criterion_names], dtype=float)
+    
+    def _build_matrices(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """把选项和标准打包为得分矩阵（选项 × 标准）和权重向量，同名标准的权重合并"""
+        names = list(dict.fromkeys(criterion.name for criterion in self.criteria))
+        column = {name: j for j, name in enumerate(names)}
+        
+        weights = np.zeros(len(names))
+        np.add.at(
+            weights,
+            [column[criterion.name] for criterion in self.criteria],
+            [criterion.weight for criterion in self.criteria]
+        )
+        
+        # 选项缺少的标准得分按 0 计
+        matrix = np.array(
+            [[option.criteria_scores.get(name, 0.0) for name in names] for option in self.options],
+            dtype=float
+        ).reshape(len(self.options), len(names))
+        return names, matrix, weights
+    
+    def _calculate_weighted_scores(self) -> np.ndarray:
+        """计算每个选项的加权得分（矩阵与权重向量相乘）"""
+        self.criterion_names, self.score_matrix, self.weights = self._build_matrices()
+        return self.score_matrix @ self.weights
+    
+    def _rank_options(self, scores: np.ndarray) -> List[Dict[str, Any]]:
+        """对选项进行排序（得分相同时保持添加顺序）"""
+        order = np.argsort(-scores, kind="stable")
+        return [
+            {
+                "title": self.options[i].title,
+                "score": float(scores[i]),
+                "option": self.options[i]
+            }
+            for i in order
+        ]
+    
+    def _generate_analysis_report(
+        self,
+        ranked_options: List[Dict[str, Any]],
+        scores: np.ndarray,
+        seed: Optional[int] = None,
+        budget_ms: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """生成决策分析报告"""
+        report = {
+            "recommendation": self._build_recommendation(ranked_options),
+            "rankings": self._build_rankings(ranked_options),
+            "sensitivity_analysis": self._perform_sensitivity_analysis(scores, seed, budget_ms)
         }
+        report["risk_analysis"], report["risk_profiles"] = self._analyze_risks()
         
+        self.scores = scores
+        self.report = report
         return report
     
+    def _build_recommendation(self, ranked_options: List[Dict[str, Any]]) -> Dict[str, Any]:
+        best_option = ranked_options[0]
+        score_range = ranked_options[0]["score"] - ranked_options[-1]["score"]
+        return {
+            "best_option": best_option["title"],
+            "confidence": self._calculate_confidence(best_option["score"], score_range),
+            "reasoning": self._generate_reasoning(best_option["option"])
+        }
+    
+    def _build_rankings(self, ranked_options: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "rank": i + 1,
+                "title": opt["title"],
+                "score": opt["score"],
+                "pros": opt["option"].pros,
+                "cons": opt["option"].cons
+            }
+            for i, opt in enumerate(ranked_options)
+        ]
+    
     def _calculate_confidence(self, best_score: float, score_range: float) -> str:
         """计算推荐的置信度"""
         if score_range == 0:
@@ -116,22 +372,278 @@ class DecisionSupport:
         pros_text = "、".join(option.pros[:3])
         return f"该选项的主要优势在于：{pros_text}"
     
-    def _perform_sensitivity_analysis(self) -> Dict[str, Any]:
-        """执行敏感性分析"""
-        # TODO: 实现更复杂的敏感性分析
+    def _perform_sensitivity_analysis(
+        self,
+        scores: np.ndarray,
+        seed: Optional[int] = None,
+        budget_ms: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """执行敏感性分析：在用户权重附近按 Dirichlet 分布采样权重并扰动得分，批量计算排名变化"""
+        matrix, weights = self.score_matrix, self.weights
+        # 按权重绝对值采样，再恢复负权重的符号
+        signs = np.where(weights < 0, -1.0, 1.0)
+        total_weight = np.abs(weights).sum()
+        n_options = len(scores)
+        if n_options < 2 or total_weight <= 0:
+            return {
+                "most_sensitive_criterion": self.criterion_names[0] if self.criterion_names else None,
+                "sensitivity_level": "低",
+                "samples": 0
+            }
+        
+        config = DECISION_CONFIG
+        rng = np.random.default_rng(seed)
+        alpha = config['dirichlet_concentration'] * np.abs(weights) / total_weight + 1e-3
+        noise_scale = config['score_noise'] * (np.abs(matrix).max() or 1.0)
+        
+        top_k = config['report_top_k']
+        base_order = np.argsort(-scores, kind="stable")
+        tracked = base_order[:top_k]
+        best = base_order[0]
+        
+        win_counts = np.zeros(n_options, dtype=np.int64)
+        rank_kept = np.zeros(len(tracked), dtype=np.int64)
+        flipped_sum = np.zeros(len(weights))
+        kept_sum = np.zeros(len(weights))
+        flipped_total = 0
+        samples = 0
+        
+        start = time.perf_counter()
+        budget_ms = budget_ms or config['sensitivity_budget_ms']
+        n_samples = self._sensitivity_sample_count(budget_ms, len(tracked))
+        # 至少分 4 批，未固定种子时每批后检查耗时
+        batch_size = max(1, min(config['sensitivity_batch_size'], -(-n_samples // 4)))
+        while samples < n_samples:
+            batch = min(batch_size, n_samples - samples)
+            sampled_weights = rng.dirichlet(alpha, size=batch) * (signs * total_weight)
+            # 各标准得分加独立高斯噪声，等价于总分加标准差为 噪声 × ||w|| 的噪声
+            totals = sampled_weights @ matrix.T
+            totals += rng.standard_normal(totals.shape) * (noise_scale * np.linalg.norm(sampled_weights, axis=1))[:, None]
+            
+            winners = totals.argmax(axis=1)
+            win_counts += np.bincount(winners, minlength=n_options)
+            # 只统计排名靠前的选项：名次 = 得分更高的选项数
+            tracked_ranks = (totals[:, None, :] > totals[:, tracked][:, :, None]).sum(axis=2)
+            rank_kept += (tracked_ranks == np.arange(len(tracked))).sum(axis=0)
+            
+            flipped = winners != best
+            deviations = sampled_weights - weights
+            flipped_sum += deviations[flipped].sum(axis=0)
+            kept_sum += deviations[~flipped].sum(axis=0)
+            flipped_total += int(flipped.sum())
+            samples += batch
+            
+            if seed is None and time.perf_counter() - start > budget_ms / 1000:
+                break
+        
+        # 权重偏移与冠军变化的关联程度
+        influence = np.zeros(len(weights))
+        if 0 < flipped_total < samples:
+            influence = np.abs(flipped_sum / flipped_total - kept_sum / (samples - flipped_total)) / total_weight
+        break_even = self._break_even_weights(scores, best)
+        
+        if influence.any():
+            most_sensitive = self.criterion_names[int(influence.argmax())]
+        else:
+            candidates = [item for item in break_even if item["break_even_weight"] is not None]
+            most_sensitive = min(
+                candidates,
+                key=lambda item: abs(item["break_even_weight"] - item["current_weight"])
+            )["criterion"] if candidates else self.criterion_names[0]
+        
+        win_probability = win_counts / samples
+        stability = win_probability[best]
+        if stability >= 0.9:
+            level = "低"
+        elif stability >= 0.7:
+            level = "中"
+        else:
+            level = "高"
+        
         return {
-            "most_sensitive_criterion": self.criteria[0].name if self.criteria else None,
-            "sensitivity_level": "中"
+            "most_sensitive_criterion": most_sensitive,
+            "sensitivity_level": level,
+            "samples": samples,
+            "seed": seed,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            "win_probability": {
+                self.options[i].title: float(win_probability[i])
+                for i in np.argsort(-win_probability, kind="stable")[:top_k] if win_counts[i]
+            },
+            "rank_stability": [
+                {
+                    "title": self.options[i].title,
+                    "rank": rank + 1,
+                    "probability": float(rank_kept[rank] / samples)
+                }
+                for rank, i in enumerate(tracked)
+            ],
+            "criteria_influence": {
+                name: float(value) for name, value in zip(self.criterion_names, influence)
+            },
+            "break_even_weights": break_even
         }
     
-    def _analyze_risks(self) -> List[Dict[str, Any]]:
-        """分析潜在风险"""
+    def _sensitivity_sample_count(self, budget_ms: float, n_tracked: int) -> int:
+        """按问题规模和时间预算估算采样数（扣除临界权重计算的固定开销），只依赖规模因此可复现"""
+        config = DECISION_CONFIG
+        n_options, n_criteria = self.score_matrix.shape
+        sampling_ms = budget_ms - n_options * n_criteria / config['break_even_elements_per_ms']
+        per_sample = n_options * (n_criteria + n_tracked + 4)
+        affordable = int(max(sampling_ms, 0) * config['sensitivity_elements_per_ms'] // per_sample)
+        return int(np.clip(affordable, config['min_sensitivity_samples'], config['sensitivity_samples']))
+    
+    def _break_even_weights(self, scores: np.ndarray, best: int) -> List[Dict[str, Any]]:
+        """单独调整每个标准的权重时，最优选项被其它选项追平的临界权重（按行分块，控制临时数组大小）"""
+        n_options, n_criteria = self.score_matrix.shape
+        rows = max(1, 262144 // max(n_criteria, 1))
+        gaps = scores[best] - scores                      # 各选项与最优选项的差距
+        columns = np.arange(n_criteria)
+        best_distances = np.full(n_criteria, np.inf)
+        competitors = np.zeros(n_criteria, dtype=np.int64)
+        best_deltas = np.zeros(n_criteria)
+        
+        for start in range(0, n_options, rows):
+            # 权重变化 1 时差距缩小的量，原地换算为追平所需的权重变化
+            deltas = self.score_matrix[start:start + rows] - self.score_matrix[best]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                np.divide(gaps[start:start + rows, None], deltas, out=deltas)
+            # 只保留可以让差距缩小到 0 且权重不为负的变化
+            distances = np.abs(deltas)
+            invalid = ~np.isfinite(distances)
+            invalid |= deltas < -self.weights
+            if start <= best < start + rows:
+                invalid[best - start] = True
+            distances[invalid] = np.inf
+            
+            local = distances.argmin(axis=0)
+            local_distances = distances[local, columns]
+            closer = local_distances < best_distances
+            best_distances[closer] = local_distances[closer]
+            competitors[closer] = local[closer] + start
+            best_deltas[closer] = deltas[local, columns][closer]
+        
+        result = []
+        for j, name in enumerate(self.criterion_names):
+            competitor = competitors[j]
+            if np.isinf(best_distances[j]):
+                result.append({
+                    "criterion": name,
+                    "current_weight": float(self.weights[j]),
+                    "break_even_weight": None,
+                    "competitor": None
+                })
+            else:
+                result.append({
+                    "criterion": name,
+                    "current_weight": float(self.weights[j]),
+                    "break_even_weight": float(self.weights[j] + best_deltas[j]),
+                    "competitor": self.options[competitor].title
+                })
+        return result
+    
+    def _analyze_risks(
+        self,
+        options: Optional[List[DecisionOption]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """分析潜在风险，返回风险列表和各选项的整体风险"""
+        options = self.options if options is None else options
         risks = []
-        for option in self.options:
-            for con in option.cons:
+        profiles = {}
+        for option, profile in zip(options, self._risk_profiles(options)):
+            for item in profile["risks"]:
                 risks.append({
                     "option": option.title,
-                    "risk": con,
-                    "severity": "中"  # TODO: 实现风险等级评估
+                    "risk": item["factor"],
+                    "severity": SEVERITY_LABELS.get(item["level"], "中"),
+                    "level": item["level"],
+                    "score": item["score"],
+                    "probability": item["probability"],
+                    "impact": item["impact"],
+                    "mitigation": item["mitigation"]
                 })
-        return risks 
\ No newline at end of file
+            profiles[option.title] = profile["overall"]
+        return risks, profiles
+    
+    def assess_option_risks(self, monte_carlo: bool = False, seed: Optional[int] = None) -> Dict[str, Any]:
+        """独立的风险评估：各选项风险画像及所有风险因素的整体评估"""
+        profiles = self._risk_profiles(self.options)
+        factors = [factor for option in self.options for factor in self._risk_factors(option)]
+        return {
+            "options": [
+                {"option": option.title, **profile}
+                for option, profile in zip(self.options, profiles)
+            ],
+            "portfolio": risk_assessor.assess_risks(
+                factors,
+                include_factors=False,
+                monte_carlo=monte_carlo and bool(factors),
+                seed=seed
+            )
+        }
+    
+    def _risk_profiles(self, options: List[DecisionOption]) -> List[Dict[str, Any]]:
+        """计算选项风险画像，未缓存的选项合并为一批评估"""
+        keys = [self._risk_key(option) for option in options]
+        profiles = {}
+        pending = {}
+        for key, option in zip(keys, options):
+            if key in profiles or key in pending:
+                continue
+            profile = risk_profile_cache.get(key)
+            if profile is None:
+                pending[key] = self._risk_factors(option)
+            else:
+                profiles[key] = profile
+        
+        if pending:
+            assessed = risk_assessor.assess_risks(
+                [factor for factors in pending.values() for factor in factors]
+            )["risk_factors"]
+            offset = 0
+            for key, factors in pending.items():
+                items = assessed[offset:offset + len(factors)]
+                offset += len(factors)
+                profile = {
+                    "risks": items,
+                    "overall": risk_assessor.calculate_overall_risk(items)
+                }
+                risk_profile_cache.set(key, profile)
+                profiles[key] = profile
+        
+        return [profiles[key] for key in keys]
+    
+    @staticmethod
+    def _risk_key(option: DecisionOption) -> str:
+        payload = json.dumps(
+            [option.cons, option.risks, RISK_CONFIG['default_probability'], RISK_CONFIG['default_impact']],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    @staticmethod
+    def _risk_factors(option: DecisionOption) -> List[RiskFactor]:
+        """由选项的缺点和量化风险构建风险因素，缺点使用默认概率和影响"""
+        factors = [
+            RiskFactor(
+                name=con,
+                probability=RISK_CONFIG['default_probability'],
+                impact=RISK_CONFIG['default_impact'],
+                description=con,
+                mitigation=""
+            )
+            for con in option.cons
+        ]
+        factors.extend(
+            RiskFactor(
+                name=risk["name"],
+                probability=float(risk.get("probability", RISK_CONFIG['default_probability'])),
+                impact=float(risk.get("impact", RISK_CONFIG['default_impact'])),
+                description=risk.get("description", ""),
+                mitigation=risk.get("mitigation", "")
+            )
+            for risk in option.risks
+        )
+        return factors
@@ -0,0 +1,86 @@
+from typing import Dict, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import hashlib
+import numpy as np
+
+# 不影响页面内容的跟踪参数
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'yclid', 'spm', 'from', 'ref', 'ref_src',
+    'source', 'share', 'share_source', 'share_medium', 'mc_cid', 'mc_eid', '_ga'
+}
+MIRROR_HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+def canonicalize_url(url: str) -> str:
+    """URL规范化：统一协议和主机、去掉默认端口/片段/跟踪参数，并对查询参数排序"""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    for prefix in MIRROR_HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    if path.endswith('/amp'):
+        path = path[:-4] or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    # http 和 https 视为同一资源
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+def simhash(text: str, shingle_size: int = 4) -> int:
+    """基于字符 n-gram 的 64 位 SimHash（兼容无空格的中文文本）"""
+    text = ''.join(text.lower().split())
+    if len(text) < shingle_size:
+        shingles = [text] if text else []
+    else:
+        shingles = {text[i:i + shingle_size] for i in range(len(text) - shingle_size + 1)}
+    if not shingles:
+        return 0
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), 'little') for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0) * 2 > len(hashes)
+    return int(np.packbits(votes[::-1]).view('>u8')[0])
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+class NearDuplicateIndex:
+    """SimHash 近重复索引，按分段分桶查找，汉明距离不超过阈值视为重复"""
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        # 按鸽巢原理分段：距离不超过 k 的两个指纹至少有一段完全相同
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.bands)]
+
+    def is_duplicate(self, fingerprint: int) -> bool:
+        for bucket, key in zip(self._buckets, self._band_keys(fingerprint)):
+            for candidate in bucket.get(key, ()):
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return True
+        return False
+
+    def add(self, fingerprint: int) -> bool:
+        """加入索引，已存在近重复内容时返回 False"""
+        if self.is_duplicate(fingerprint):
+            return False
+        for bucket, key in zip(self._buckets, self._band_keys(fingerprint)):
+            bucket.setdefault(key, []).append(fingerprint)
+        return True
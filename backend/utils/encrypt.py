@@ -1,7 +1,98 @@
+from typing import Optional
+import base64
 import hashlib
+import hmac
+import os
+
+try:
+    import bcrypt
+except ImportError:
+    bcrypt = None
+
+try:
+    from argon2 import PasswordHasher as Argon2Hasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:
+    Argon2Hasher = None
+
+# 各算法的默认成本：scrypt 为 log2(N)，bcrypt 为 rounds，argon2 为 time_cost
+DEFAULT_COSTS = {'scrypt': 14, 'bcrypt': 12, 'argon2': 3}
+MIN_COSTS = {'scrypt': 10, 'bcrypt': 4, 'argon2': 1}
+
+SCRYPT_R = 8
+SCRYPT_P = 1
 
 def encrypt_password(password: str) -> str:
     """
-    使用MD5加密密码
+    使用MD5加密密码（旧格式，仅用于兼容历史数据）
     """
-    return hashlib.md5(password.encode()).hexdigest() 
\ No newline at end of file
+    return hashlib.md5(password.encode()).hexdigest()
+
+def hash_password(password: str, algorithm: str = 'scrypt', cost: Optional[int] = None) -> str:
+    """使用慢哈希算法加密密码，返回带算法和成本参数的字符串"""
+    cost = cost or DEFAULT_COSTS[algorithm]
+    if algorithm == 'scrypt':
+        salt = os.urandom(16)
+        digest = _scrypt(password, salt, cost)
+        return '$'.join([
+            'scrypt', str(cost), str(SCRYPT_R), str(SCRYPT_P),
+            base64.b64encode(salt).decode(), base64.b64encode(digest).decode()
+        ])
+    if algorithm == 'bcrypt':
+        if bcrypt is None:
+            raise RuntimeError("未安装 bcrypt")
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=cost)).decode()
+    if algorithm == 'argon2':
+        if Argon2Hasher is None:
+            raise RuntimeError("未安装 argon2-cffi")
+        return Argon2Hasher(time_cost=cost).hash(password)
+    raise ValueError(f"不支持的密码算法: {algorithm}")
+
+def verify_password(password: str, stored: str) -> bool:
+    """校验密码，兼容旧的 MD5 格式；格式损坏的哈希视为校验失败"""
+    try:
+        algorithm, cost = parse_hash(stored)
+        if algorithm == 'md5':
+            return hmac.compare_digest(encrypt_password(password), stored)
+        if algorithm == 'scrypt':
+            _, _, r, p, salt, digest = stored.split('$')
+            expected = base64.b64decode(digest, validate=True)
+            actual = _scrypt(password, base64.b64decode(salt, validate=True), cost, int(r), int(p), len(expected))
+            return hmac.compare_digest(actual, expected)
+    except ValueError:
+        return False
+    if algorithm == 'bcrypt' and bcrypt is not None:
+        return bcrypt.checkpw(password.encode(), stored.encode())
+    if algorithm == 'argon2' and Argon2Hasher is not None:
+        try:
+            return Argon2Hasher().verify(stored, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return False
+
+def needs_rehash(stored: str, algorithm: str = 'scrypt', cost: Optional[int] = None) -> bool:
+    """旧格式、其它算法或成本低于当前配置的哈希需要重新加密"""
+    stored_algorithm, stored_cost = parse_hash(stored)
+    return stored_algorithm != algorithm or (stored_cost or 0) < (cost or DEFAULT_COSTS[algorithm])
+
+def parse_hash(stored: str):
+    """返回 (算法, 成本)，无法识别时算法为 None"""
+    if stored.startswith('scrypt$'):
+        return 'scrypt', int(stored.split('$')[1])
+    if stored.startswith(('$2a$', '$2b$', '$2y$')):
+        return 'bcrypt', int(stored.split('$')[2])
+    if stored.startswith('$argon2'):
+        params = dict(
+            item.split('=') for item in stored.split('$')[3].split(',') if '=' in item
+        )
+        return 'argon2', int(params.get('t', 0))
+    if len(stored) == 32 and all(c in '0123456789abcdef' for c in stored):
+        return 'md5', None
+    return None, None
+
+def _scrypt(password: str, salt: bytes, cost: int, r: int = SCRYPT_R, p: int = SCRYPT_P, length: int = 32) -> bytes:
+    n = 1 << cost
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * r * n + 1024 * 1024, dklen=length
+    )
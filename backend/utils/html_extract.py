@@ -0,0 +1,218 @@
+from typing import AsyncIterator, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+import asyncio
+import codecs
+import re
+from config import RESEARCH_CONFIG
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+SKIPPED_TAGS = ("script", "style", "noscript", "template")
+
+# <meta charset="gbk"> 或 <meta http-equiv="Content-Type" content="text/html; charset=gb2312">
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+# GBK 系列的标签按超集 GB18030 解码，页面常声明 gb2312 却使用 GBK 字符
+CHARSET_ALIASES = {'gb2312': 'gb18030', 'gbk': 'gb18030', 'x-gbk': 'gb18030', 'gb_2312-80': 'gb18030'}
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+)
+
+def normalize_charset(name: Optional[str]) -> Optional[str]:
+    """规范化编码名称，未知编码返回 None"""
+    if not name:
+        return None
+    name = name.strip().lower()
+    name = CHARSET_ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+def sniff_charset(head: bytes) -> str:
+    """根据页面开头的字节判断编码：BOM、<meta> 声明、是否为合法 UTF-8，否则使用后备编码"""
+    for bom, name in BOMS:
+        if head.startswith(bom):
+            return name
+    match = META_CHARSET.search(head)
+    if match:
+        declared = normalize_charset(match.group(1).decode('ascii', 'ignore'))
+        if declared:
+            return declared
+    try:
+        # 末尾可能截断在多字节字符中间，不作为错误
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return RESEARCH_CONFIG['fallback_charset']
+
+def select_parser(name: str = "auto") -> str:
+    """选择可用的最快解析器"""
+    if name != "auto":
+        return name
+    if SelectolaxParser is not None:
+        return "selectolax"
+    if lxml is not None:
+        return "lxml"
+    return "html.parser"
+
+def clean_text(text: str, max_chars: int) -> str:
+    """合并空白字符并截断"""
+    text = ' '.join(text.split())
+    return text[:max_chars]
+
+class StreamingTextExtractor(HTMLParser):
+    """增量文本提取器，文本达到预算后停止解析"""
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self._parts: List[str] = []
+        self._length = 0
+        self._skip_depth = 0
+
+    @property
+    def full(self) -> bool:
+        return self._length >= self.max_chars
+
+    def feed(self, data: str):
+        if not self.full:
+            super().feed(data)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth or self.full:
+            return
+        words = data.split()
+        if words:
+            chunk = ' '.join(words)
+            self._length += len(chunk) + (1 if self._parts else 0)
+            self._parts.append(chunk)
+
+    def get_text(self) -> str:
+        return ' '.join(self._parts)[:self.max_chars]
+
+def _extract_streaming(html: str, max_chars: int, chunk_size: int = 64 * 1024) -> str:
+    extractor = StreamingTextExtractor(max_chars)
+    for start in range(0, len(html), chunk_size):
+        extractor.feed(html[start:start + chunk_size])
+        if extractor.full:
+            break
+    return extractor.get_text()
+
+def extract_text(html: str, parser: str = "auto", max_chars: Optional[int] = None) -> str:
+    """从HTML中提取正文文本（在工作进程中执行）"""
+    max_chars = max_chars or RESEARCH_CONFIG['max_content_chars']
+    parser = select_parser(parser)
+
+    if parser == "streaming":
+        return _extract_streaming(html, max_chars)
+
+    if parser == "selectolax":
+        tree = SelectolaxParser(html)
+        tree.strip_tags(list(SKIPPED_TAGS))
+        text = tree.root.text(separator=' ') if tree.root is not None else ''
+    elif parser == "lxml":
+        try:
+            tree = lxml.html.fromstring(html)
+        except (etree.ParserError, ValueError):
+            return ''
+        etree.strip_elements(tree, *SKIPPED_TAGS, with_tail=False)
+        text = ' '.join(tree.itertext())
+    else:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup(SKIPPED_TAGS):
+            tag.decompose()
+        text = soup.get_text(separator=' ')
+
+    return clean_text(text, max_chars)
+
+_parse_pool: ProcessPoolExecutor = None
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=RESEARCH_CONFIG['parse_workers'])
+    return _parse_pool
+
+def shutdown_parse_pool():
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+async def extract_text_async(html: str, parser: str = None, max_chars: Optional[int] = None) -> str:
+    """异步提取文本，大页面交给进程池解析，不阻塞事件循环"""
+    parser = parser or RESEARCH_CONFIG['html_parser']
+    # 字符数不超过字节数，先用字符数排除大页面，避免对大页面编码
+    limit = RESEARCH_CONFIG['parse_inline_max_bytes']
+    if len(html) <= limit and len(html.encode('utf-8')) <= limit:
+        return extract_text(html, parser, max_chars)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parse_pool(), extract_text, html, parser, max_chars)
+
+def _make_decoder(encoding: str) -> codecs.IncrementalDecoder:
+    return codecs.getincrementaldecoder(encoding)(errors='replace')
+
+async def extract_text_from_stream(
+    chunks: AsyncIterator[bytes],
+    encoding: str = None,
+    max_bytes: int = None,
+    parser: str = None,
+    max_chars: Optional[int] = None
+) -> str:
+    """边下载边解码，超过字节预算后停止读取，再交给 extract_text_async 提取文本"""
+    parser = parser or RESEARCH_CONFIG['html_parser']
+    max_bytes = max_bytes or RESEARCH_CONFIG['max_page_bytes']
+    max_chars = max_chars or RESEARCH_CONFIG['max_content_chars']
+
+    # 响应头没有可用的编码时，先缓存开头若干字节再判断编码
+    encoding = normalize_charset(encoding)
+    sniff_bytes = RESEARCH_CONFIG['charset_sniff_bytes']
+    decoder = None
+    head = b''
+
+    # 所有解析器（包括 streaming）统一由 extract_text_async 处理，大页面在进程池中解析
+    parts: List[str] = []
+    received = 0
+
+    async for chunk in chunks:
+        chunk = chunk[:max_bytes - received]
+        received += len(chunk)
+        if decoder is None:
+            head += chunk
+            if encoding is None and len(head) < sniff_bytes and received < max_bytes:
+                continue
+            decoder = _make_decoder(encoding or sniff_charset(head))
+            chunk, head = head, b''
+        parts.append(decoder.decode(chunk, final=received >= max_bytes))
+        if received >= max_bytes:
+            break
+    else:
+        if decoder is None:
+            decoder = _make_decoder(encoding or sniff_charset(head))
+        parts.append(decoder.decode(head, final=True))
+
+    return await extract_text_async(''.join(parts), parser, max_chars)
@@ -0,0 +1,166 @@
+from typing import AsyncIterator, Dict, Any
+from types import SimpleNamespace
+import asyncio
+import aiohttp
+from config import HTTP_CONFIG
+
+try:
+    import brotli  # noqa: F401  aiohttp 在安装 brotli 时支持 br 解压
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+class HTTPClientStats:
+    """连接池统计：连接复用、下载字节数以及 DNS/连接/读取耗时"""
+
+    def __init__(self):
+        self.requests = 0
+        self.failed_requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_lookups = 0
+        self.bytes_fetched = 0
+        self.dns_seconds = 0.0
+        self.connect_seconds = 0.0
+        self.read_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        total_connections = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "failed_requests": self.failed_requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "connection_reuse_ratio": self.connections_reused / total_connections if total_connections else 0.0,
+            "dns_lookups": self.dns_lookups,
+            "dns_cache_hits": self.dns_cache_hits,
+            "bytes_fetched": self.bytes_fetched,
+            "dns_seconds": round(self.dns_seconds, 4),
+            "connect_seconds": round(self.connect_seconds, 4),
+            "read_seconds": round(self.read_seconds, 4)
+        }
+
+class HTTPClient:
+    """进程级共享的 aiohttp 会话，随应用启动和关闭"""
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or HTTP_CONFIG
+        self.stats = HTTPClientStats()
+        self._session: aiohttp.ClientSession = None
+
+    async def start(self):
+        """创建连接池（应用启动时调用）"""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+
+    async def close(self):
+        """关闭连接池（应用关闭时调用）"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """获取共享会话，未启动时按需创建"""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    async def iter_body(self, response: aiohttp.ClientResponse, chunk_size: int) -> AsyncIterator[bytes]:
+        """流式读取响应体并计入下载统计（iter_chunked 不触发追踪钩子）"""
+        loop = asyncio.get_running_loop()
+        read_start = loop.time()
+        async for chunk in response.content.iter_chunked(chunk_size):
+            current = loop.time()
+            self.stats.bytes_fetched += len(chunk)
+            self.stats.read_seconds += current - read_start
+            read_start = current
+            yield chunk
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.stats.to_dict()
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.config['pool_limit'],
+            limit_per_host=self.config['pool_limit_per_host'],
+            ttl_dns_cache=self.config['dns_cache_ttl'],
+            keepalive_timeout=self.config['keepalive_timeout']
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.config['total_timeout'],
+            sock_connect=self.config['connect_timeout'],
+            sock_read=self.config['read_timeout']
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={
+                "User-Agent": self.config['user_agent'],
+                "Accept-Encoding": ACCEPT_ENCODING
+            },
+            auto_decompress=True,
+            trace_configs=[self._create_trace_config()]
+        )
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        """通过 aiohttp 追踪钩子收集连接池统计"""
+        stats = self.stats
+        trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=lambda trace_request_ctx: SimpleNamespace())
+
+        def now() -> float:
+            return asyncio.get_running_loop().time()
+
+        async def on_request_start(session, ctx, params):
+            stats.requests += 1
+
+        async def on_request_exception(session, ctx, params):
+            stats.failed_requests += 1
+
+        async def on_dns_resolvehost_start(session, ctx, params):
+            ctx.dns_start = now()
+
+        async def on_dns_resolvehost_end(session, ctx, params):
+            stats.dns_lookups += 1
+            stats.dns_seconds += now() - ctx.dns_start
+
+        async def on_dns_cache_hit(session, ctx, params):
+            stats.dns_cache_hits += 1
+
+        async def on_connection_create_start(session, ctx, params):
+            ctx.connect_start = now()
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.connections_created += 1
+            stats.connect_seconds += now() - ctx.connect_start
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats.connections_reused += 1
+
+        async def on_request_end(session, ctx, params):
+            # 响应头已到达，之后的时间计为读取时间
+            ctx.read_start = now()
+
+        async def on_response_chunk_received(session, ctx, params):
+            stats.bytes_fetched += len(params.chunk)
+            read_start = getattr(ctx, 'read_start', None)
+            if read_start is not None:
+                current = now()
+                stats.read_seconds += current - read_start
+                ctx.read_start = current
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_response_chunk_received.append(on_response_chunk_received)
+        return trace_config
+
+# 全局共享客户端
+http_client = HTTPClient()
@@ -0,0 +1,209 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from datetime import datetime
+import asyncio
+import itertools
+import uuid
+from config import JOB_QUEUE_CONFIG
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+class Job:
+    """后台任务，执行函数通过 report() 上报进度"""
+
+    def __init__(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        args: tuple,
+        kwargs: dict,
+        priority: int,
+        owner: Any = None,
+        on_cancel: Optional[Callable[["Job"], Awaitable[Any]]] = None
+    ):
+        self.id = uuid.uuid4().hex
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.owner = owner
+        # 任务在开始执行前被取消时调用，执行函数自身不会再运行
+        self.on_cancel = on_cancel
+        self.status = "queued"
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.create_time = datetime.now()
+        self.start_time: Optional[datetime] = None
+        self.end_time: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    async def report(self, **progress):
+        """上报进度并通知订阅者"""
+        self.progress.update(progress)
+        self._publish("progress", progress)
+
+    def _publish(self, event: str, data: Dict[str, Any]):
+        for queue in self._subscribers:
+            queue.put_nowait((event, data))
+
+    def set_status(self, status: str):
+        self.status = status
+        self._publish("status", self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": self.progress,
+            "error": self.error,
+            "create_time": self.create_time.isoformat(),
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "end_time": self.end_time.isoformat() if self.end_time else None
+        }
+
+    async def events(self) -> AsyncIterator[tuple]:
+        """订阅任务事件，首先返回当前快照，任务结束后停止"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            yield "status", self.to_dict()
+            while self.status not in TERMINAL_STATUSES:
+                event, data = await queue.get()
+                yield event, data
+        finally:
+            self._subscribers.remove(queue)
+
+class JobQueue:
+    """进程内任务队列：有界优先级队列 + 固定数量的工作协程，支持取消"""
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or JOB_QUEUE_CONFIG
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._hooks: Set[asyncio.Task] = set()
+
+    async def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue(maxsize=self.config['max_queued'])
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.config['workers'])]
+
+    async def stop(self):
+        for job in list(self.jobs.values()):
+            if job.status == "queued":
+                self.cancel(job.id)
+        # 运行中的任务随工作协程一起取消，等待其执行函数完成清理
+        running = [job.task for job in self.jobs.values() if job.task is not None and not job.task.done()]
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, *running, *self._hooks, return_exceptions=True)
+        self._workers = []
+
+    def submit(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        priority: Any = None,
+        owner: Any = None,
+        on_cancel: Optional[Callable[[Job], Awaitable[Any]]] = None,
+        **kwargs
+    ) -> Job:
+        """提交任务，priority 越小越先执行；队列已满时抛出 asyncio.QueueFull，priority 不是整数时抛出 ValueError"""
+        if self._queue is None:
+            raise RuntimeError("任务队列未启动")
+        priority = self._normalize_priority(priority)
+        job = Job(func, args, kwargs, priority, owner, on_cancel)
+        self._queue.put_nowait((priority, next(self._sequence), job))
+        self.jobs[job.id] = job
+        return job
+
+    def _normalize_priority(self, priority: Any) -> int:
+        """转换为整数并限制在配置范围内，避免任意小的值插队"""
+        if priority is None:
+            return self.config['default_priority']
+        if isinstance(priority, bool):
+            raise ValueError("priority 必须是整数")
+        try:
+            priority = int(priority)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError("priority 必须是整数")
+        return min(max(priority, self.config['min_priority']), self.config['max_priority'])
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return False
+        if job.task is not None:
+            job.task.cancel()
+        else:
+            # 尚未开始的任务由工作协程取出时跳过
+            self._finish(job, "cancelled")
+            self._run_cancel_hook(job)
+        return True
+
+    def _run_cancel_hook(self, job: Job):
+        if job.on_cancel is None:
+            return
+        task = asyncio.ensure_future(job.on_cancel(job))
+        self._hooks.add(task)
+        task.add_done_callback(self._hook_done)
+
+    def _hook_done(self, task: asyncio.Task):
+        self._hooks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Job cancel hook error: {task.exception()}")
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                if job.status == "queued":
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.start_time = datetime.now()
+        job.set_status("running")
+        job.task = asyncio.ensure_future(job.func(job, *job.args, **job.kwargs))
+        try:
+            job.result = await asyncio.shield(job.task)
+        except asyncio.CancelledError:
+            if not job.task.cancelled():
+                # 工作协程自身被取消（应用关闭）
+                job.task.cancel()
+                self._finish(job, "cancelled")
+                raise
+            self._finish(job, "cancelled")
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, "failed")
+        else:
+            self._finish(job, "completed")
+
+    def _finish(self, job: Job, status: str):
+        job.end_time = datetime.now()
+        job.set_status(status)
+        # 保留一段时间供查询，之后清理
+        asyncio.get_running_loop().call_later(
+            self.config['job_retention_seconds'], self.jobs.pop, job.id, None
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "workers": len(self._workers),
+            "jobs": counts
+        }
+
+# 全局任务队列
+job_queue = JobQueue()
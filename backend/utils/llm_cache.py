@@ -0,0 +1,162 @@
+from typing import List, Dict, Any, Callable, Awaitable, Optional
+from datetime import datetime
+import hashlib
+import json
+import numpy as np
+from config import LLM_CACHE_CONFIG
+from utils.cache import TTLCache, DiskStore, MongoStore
+
+async def openai_embedding(text: str) -> List[float]:
+    """调用 OpenAI 计算文本向量"""
+    import openai
+    response = await openai.Embedding.acreate(model=LLM_CACHE_CONFIG['embedding_model'], input=text)
+    return response["data"][0]["embedding"]
+
+class SemanticIndex:
+    """内存向量索引：按命名空间保存归一化向量，余弦相似度超过阈值视为命中。
+    索引不持久化，进程重启后为空，随新的响应重新积累；磁盘/Mongo 后端只保存精确匹配的条目"""
+
+    def __init__(self, threshold: float, max_entries: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # 每个命名空间预分配向量矩阵，容量不足时翻倍，前 len(keys) 行有效
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._keys: Dict[str, List[str]] = {}
+        self._next: Dict[str, int] = {}
+
+    def size(self, namespace: str) -> int:
+        return len(self._keys.get(namespace, ()))
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._keys.values())
+
+    def search(self, namespace: str, vector: np.ndarray) -> Optional[str]:
+        keys = self._keys.get(namespace)
+        if not keys:
+            return None
+        similarities = self._vectors[namespace][:len(keys)] @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return keys[best]
+        return None
+
+    def add(self, namespace: str, vector: np.ndarray, key: str):
+        matrix = self._vectors.get(namespace)
+        keys = self._keys.setdefault(namespace, [])
+        size = len(keys)
+        if size < self.max_entries:
+            if matrix is None or size == len(matrix):
+                grown = np.empty((min(self.max_entries, max(16, 2 * size)), len(vector)), dtype=np.float32)
+                grown[:size] = matrix[:size] if matrix is not None else 0
+                matrix = self._vectors[namespace] = grown
+            matrix[size] = vector
+            keys.append(key)
+        else:
+            # 达到上限后循环覆盖最早写入的向量
+            i = self._next.get(namespace, 0)
+            matrix[i] = vector
+            keys[i] = key
+            self._next[namespace] = (i + 1) % self.max_entries
+
+class LLMResponseCache:
+    """LLM响应缓存：精确匹配 (model, messages) 哈希，可选向量相似度匹配"""
+
+    def __init__(
+        self,
+        config: Dict[str, Any] = None,
+        embed: Callable[[str], Awaitable[List[float]]] = None
+    ):
+        self.config = config or LLM_CACHE_CONFIG
+        self.ttl = self.config['ttl_seconds']
+        self.memory = TTLCache(max_size=self.config['max_memory_entries'], ttl=self.ttl)
+        self.backend = self._create_backend(self.config['backend'])
+        self.embed = embed or openai_embedding
+        self.semantic = SemanticIndex(
+            self.config['similarity_threshold'],
+            self.config['max_semantic_entries']
+        ) if self.config['semantic_enabled'] else None
+        # 未命中请求的向量，写入响应时加入语义索引
+        self._pending_vectors = TTLCache(max_size=1000, ttl=600)
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _create_backend(self, name: str):
+        if name == "disk":
+            return DiskStore(self.config['disk_path'], self.config['max_disk_entries'])
+        if name == "mongo":
+            return MongoStore("llm_cache")
+        return None
+
+    @staticmethod
+    def _namespace(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        """语义匹配的命名空间：模型、参数和除最后一条外的消息必须完全一致"""
+        payload = json.dumps([model, messages[:-1], params], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def _embed(self, messages: List[Dict[str, str]]) -> np.ndarray:
+        vector = np.asarray(await self.embed(messages[-1]["content"]), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def get(self, key: str, model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Optional[str]:
+        entry = await self._get_entry(key)
+        if entry is not None:
+            self.exact_hits += 1
+            return entry["content"]
+
+        # 命名空间中还没有向量时不可能语义命中，跳过向量计算，写入响应时再计算
+        namespace = self._namespace(model, messages, params) if self.semantic is not None and messages else None
+        if namespace is not None and self.semantic.size(namespace):
+            try:
+                vector = await self._embed(messages)
+            except Exception as e:
+                print(f"向量计算错误: {str(e)}")
+            else:
+                similar_key = self.semantic.search(namespace, vector)
+                entry = await self._get_entry(similar_key) if similar_key else None
+                if entry is not None:
+                    self.semantic_hits += 1
+                    return entry["content"]
+                self._pending_vectors.set(key, vector)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, model: str, messages: List[Dict[str, str]], params: Dict[str, Any], content: str):
+        entry = {"content": content, "model": model, "created_at": datetime.utcnow().timestamp()}
+        self.memory.set(key, entry)
+        if self.backend is not None:
+            await self.backend.set(key, entry)
+
+        if self.semantic is not None and messages:
+            vector = self._pending_vectors.get(key)
+            if vector is None:
+                try:
+                    vector = await self._embed(messages)
+                except Exception as e:
+                    print(f"向量计算错误: {str(e)}")
+                    return
+            self._pending_vectors.delete(key)
+            self.semantic.add(self._namespace(model, messages, params), vector, key)
+
+    async def _get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.memory.get(key)
+        if entry is None and self.backend is not None:
+            entry = await self.backend.get(key)
+            if entry is not None:
+                if datetime.utcnow().timestamp() - entry["created_at"] > self.ttl:
+                    return None
+                self.memory.set(key, entry)
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "exact_hit_ratio": self.exact_hits / total if total else 0.0,
+            "semantic_hit_ratio": self.semantic_hits / total if total else 0.0,
+            "hit_ratio": (self.exact_hits + self.semantic_hits) / total if total else 0.0
+        }
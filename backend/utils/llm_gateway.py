@@ -0,0 +1,328 @@
+from typing import AsyncIterator, List, Dict, Any, Callable, Optional
+from collections import deque
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import openai
+from config import OPENAI_API_KEY, LLM_CONFIG, HTTP_CONFIG
+from utils.cache import SingleFlight
+from utils.http_client import HTTPClient
+from utils.llm_cache import LLMResponseCache
+
+openai.api_key = OPENAI_API_KEY
+
+def request_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any] = None) -> str:
+    """根据模型、消息和参数生成请求指纹"""
+    payload = json.dumps([model, messages, params or {}], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """粗略估算提示词token数（中文约1字1token，英文约4字符1token）"""
+    total = 0
+    for message in messages:
+        content = message.get("content", "")
+        ascii_chars = sum(1 for ch in content if ord(ch) < 128)
+        total += (len(content) - ascii_chars) + ascii_chars // 4 + 4
+    return total
+
+class TokenBucket:
+    """令牌桶限流器，rate_per_minute 为每分钟补充的令牌数"""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+class OpenAIBackend:
+    """OpenAI 后端，复用独立的 aiohttp 连接池"""
+
+    RETRYABLE_ERRORS = tuple(
+        getattr(openai.error, name) for name in (
+            "RateLimitError", "APIError", "Timeout", "ServiceUnavailableError", "APIConnectionError"
+        ) if hasattr(getattr(openai, "error", None), name)
+    )
+
+    def __init__(self):
+        self.http_client = HTTPClient({
+            **HTTP_CONFIG,
+            'read_timeout': LLM_CONFIG['request_timeout'],
+            'total_timeout': LLM_CONFIG['request_timeout']
+        })
+
+    async def complete(self, model: str, messages: List[Dict[str, str]], **params) -> Dict[str, Any]:
+        openai.aiosession.set(self.http_client.session)
+        response = await openai.ChatCompletion.acreate(model=model, messages=messages, **params)
+        usage = response.get("usage") or {}
+        return {
+            "content": response.choices[0].message.content,
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0)
+        }
+
+    async def stream(self, model: str, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        openai.aiosession.set(self.http_client.session)
+        response = await openai.ChatCompletion.acreate(model=model, messages=messages, stream=True, **params)
+        async for chunk in response:
+            delta = chunk.choices[0].delta.get("content")
+            if delta:
+                yield delta
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, self.RETRYABLE_ERRORS + (asyncio.TimeoutError,))
+
+    def retry_after(self, error: Exception) -> Optional[float]:
+        headers = getattr(error, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    async def close(self):
+        await self.http_client.close()
+
+class StubBackend:
+    """本地桩后端，用于离线测试"""
+
+    def __init__(self, responder: Callable[[List[Dict[str, str]]], str] = None, latency: float = 0.0):
+        self.responder = responder or (lambda messages: f"stub: {messages[-1]['content'][:50]}")
+        self.latency = latency
+        self.calls: List[Dict[str, Any]] = []
+
+    async def complete(self, model: str, messages: List[Dict[str, str]], **params) -> Dict[str, Any]:
+        self.calls.append({"model": model, "messages": messages, **params})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        content = self.responder(messages)
+        return {
+            "content": content,
+            "prompt_tokens": estimate_tokens(messages),
+            "completion_tokens": len(content)
+        }
+
+    async def stream(self, model: str, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        result = await self.complete(model, messages, **params)
+        for piece in re.findall(r"\S+\s*|\s+", result["content"]):
+            yield piece
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, (ConnectionError, asyncio.TimeoutError))
+
+    def retry_after(self, error: Exception) -> Optional[float]:
+        return None
+
+    async def close(self):
+        pass
+
+class LLMMetrics:
+    """LLM调用统计：延迟、token用量、重试与合并次数"""
+
+    def __init__(self, window: int = 1000):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.streams = 0
+        self.latencies = deque(maxlen=window)
+        self.first_token_latencies = deque(maxlen=window)
+
+    def record(self, latency: float, prompt_tokens: int, completion_tokens: int):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.latencies.append(latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        first_token_latencies = sorted(self.first_token_latencies)
+
+        def percentile(p: float, values: List[float] = latencies) -> float:
+            if not values:
+                return 0.0
+            return round(values[min(len(values) - 1, int(p * len(values)))], 4)
+
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "latency_max": round(latencies[-1], 4) if latencies else 0.0,
+            "streams": self.streams,
+            "first_token_p50": percentile(0.5, first_token_latencies),
+            "first_token_p95": percentile(0.95, first_token_latencies)
+        }
+
+class LLMGateway:
+    """统一的LLM调用入口：限流、重试、合并相同的在途请求并记录指标"""
+
+    def __init__(self, backend=None, config: Dict[str, Any] = None, cache: LLMResponseCache = None):
+        self.config = config or LLM_CONFIG
+        self.backend = backend or self._create_backend(self.config['backend'])
+        self.cache = cache
+        self.request_limiter = TokenBucket(self.config['requests_per_minute'])
+        self.token_limiter = TokenBucket(self.config['tokens_per_minute'])
+        self.metrics = LLMMetrics()
+        self._inflight = SingleFlight()
+
+    def _create_backend(self, name: str):
+        if name == "stub":
+            return StubBackend()
+        return OpenAIBackend()
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = None,
+        use_cache: bool = True,
+        **params
+    ) -> str:
+        """发送对话请求，返回回复文本"""
+        model = model or self.config['model']
+        key = request_key(model, messages, params)
+        return await self._inflight.do(key, self._cached_call, key, model, messages, params, use_cache)
+
+    async def _cached_call(
+        self,
+        key: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        use_cache: bool
+    ) -> str:
+        """先查响应缓存，未命中再请求模型；缓存故障不影响调用"""
+        if self.cache is None or not use_cache:
+            return await self._call(model, messages, params)
+
+        try:
+            cached = await self.cache.get(key, model, messages, params)
+        except Exception as e:
+            print(f"LLM缓存读取错误: {str(e)}")
+            cached = None
+        if cached is not None:
+            return cached
+
+        content = await self._call(model, messages, params)
+        try:
+            await self.cache.set(key, model, messages, params, content)
+        except Exception as e:
+            print(f"LLM缓存写入错误: {str(e)}")
+        return content
+
+    async def _call(self, model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        estimated = estimate_tokens(messages) + params.get('max_tokens', self.config['default_completion_tokens'])
+
+        for attempt in range(self.config['max_retries'] + 1):
+            await self.request_limiter.acquire(1)
+            await self.token_limiter.acquire(estimated)
+
+            start = time.monotonic()
+            try:
+                result = await asyncio.wait_for(
+                    self.backend.complete(model, messages, **params),
+                    timeout=self.config['request_timeout']
+                )
+            except Exception as e:
+                if attempt >= self.config['max_retries'] or not self.backend.is_retryable(e):
+                    self.metrics.failures += 1
+                    raise
+                self.metrics.retries += 1
+                await asyncio.sleep(self._retry_delay(attempt, e))
+                continue
+
+            self.metrics.record(time.monotonic() - start, result["prompt_tokens"], result["completion_tokens"])
+            return result["content"]
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = None,
+        use_cache: bool = True,
+        **params
+    ) -> AsyncIterator[str]:
+        """流式对话请求，逐段返回回复文本；只在输出首个片段前重试"""
+        model = model or self.config['model']
+        key = request_key(model, messages, params)
+
+        if self.cache is not None and use_cache:
+            try:
+                cached = await self.cache.get(key, model, messages, params)
+            except Exception as e:
+                print(f"LLM缓存读取错误: {str(e)}")
+                cached = None
+            if cached is not None:
+                yield cached
+                return
+
+        estimated = estimate_tokens(messages) + params.get('max_tokens', self.config['default_completion_tokens'])
+        parts: List[str] = []
+
+        for attempt in range(self.config['max_retries'] + 1):
+            await self.request_limiter.acquire(1)
+            await self.token_limiter.acquire(estimated)
+
+            start = time.monotonic()
+            try:
+                async for delta in self.backend.stream(model, messages, **params):
+                    if not parts:
+                        self.metrics.first_token_latencies.append(time.monotonic() - start)
+                    parts.append(delta)
+                    yield delta
+            except Exception as e:
+                if parts or attempt >= self.config['max_retries'] or not self.backend.is_retryable(e):
+                    self.metrics.failures += 1
+                    raise
+                self.metrics.retries += 1
+                await asyncio.sleep(self._retry_delay(attempt, e))
+                continue
+            break
+
+        content = ''.join(parts)
+        self.metrics.streams += 1
+        self.metrics.record(time.monotonic() - start, estimate_tokens(messages), estimate_tokens([{"content": content}]))
+        if self.cache is not None and use_cache:
+            try:
+                await self.cache.set(key, model, messages, params, content)
+            except Exception as e:
+                print(f"LLM缓存写入错误: {str(e)}")
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """指数退避加随机抖动，优先使用服务端的 Retry-After"""
+        retry_after = self.backend.retry_after(error)
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.config['retry_max_delay'], self.config['retry_base_delay'] * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {**self.metrics.to_dict(), "coalesced": self._inflight.coalesced}
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+        return stats
+
+    async def close(self):
+        await self.backend.close()
+
+# 全局LLM网关
+llm_gateway = LLMGateway(cache=LLMResponseCache())
@@ -1,22 +1,16 @@
-from typing import List, Dict, Any
-import openai
-from config import OPENAI_API_KEY
-
-openai.api_key = OPENAI_API_KEY
+from typing import AsyncIterator, List, Dict, Any
+from datetime import datetime
+from utils.llm_gateway import llm_gateway
 
 class LLMHelper:
     @staticmethod
     async def analyze_text(text: str, prompt: str) -> str:
         """使用LLM分析文本"""
         try:
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": text}
-                ]
-            )
-            return response.choices[0].message.content
+            return await llm_gateway.chat([
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": text}
+            ])
         except Exception as e:
             print(f"LLM分析错误: {str(e)}")
             return ""
@@ -34,22 +28,31 @@ class LLMHelper:
         """
         
         try:
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "你是一个专业的研究分析师"},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            focus_areas = response.choices[0].message.content.strip().split('\n')
+            content = await llm_gateway.chat([
+                {"role": "system", "content": "你是一个专业的研究分析师"},
+                {"role": "user", "content": prompt}
+            ])
+            focus_areas = content.strip().split('\n')
             return [area.strip('- ') for area in focus_areas]
         except Exception as e:
             print(f"生成研究重点错误: {str(e)}")
             return []
 
     @staticmethod
-    async def analyze_decision_criteria(options: List[Dict], criteria: List[Dict]) -> Dict[str, Any]:
-        """分析决策选项和标准"""
+    async def stream_analyze_text(text: str, prompt: str) -> AsyncIterator[str]:
+        """使用LLM分析文本，逐段返回结果"""
+        try:
+            async for delta in llm_gateway.stream([
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": text}
+            ]):
+                yield delta
+        except Exception as e:
+            print(f"LLM分析错误: {str(e)}")
+
+    @staticmethod
+    def _decision_messages(options: List[Dict], criteria: List[Dict]) -> List[Dict[str, str]]:
+        """构建决策分析的对话消息"""
         prompt = f"""
         请分析以下决策选项和标准，提供专业的决策建议。
 
@@ -65,19 +68,29 @@ class LLMHelper:
         3. 最终建议和理由
         4. 潜在风险提示
         """
-        
+        return [
+            {"role": "system", "content": "你是一个专业的决策分析顾问"},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    async def analyze_decision_criteria(options: List[Dict], criteria: List[Dict]) -> Dict[str, Any]:
+        """分析决策选项和标准"""
         try:
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "你是一个专业的决策分析顾问"},
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            content = await llm_gateway.chat(LLMHelper._decision_messages(options, criteria))
             return {
-                "analysis": response.choices[0].message.content,
+                "analysis": content,
                 "timestamp": datetime.now().isoformat()
             }
         except Exception as e:
             print(f"决策分析错误: {str(e)}")
-            return {} 
\ No newline at end of file
+            return {}
+
+    @staticmethod
+    async def stream_decision_criteria(options: List[Dict], criteria: List[Dict]) -> AsyncIterator[str]:
+        """分析决策选项和标准，逐段返回结果"""
+        try:
+            async for delta in llm_gateway.stream(LLMHelper._decision_messages(options, criteria)):
+                yield delta
+        except Exception as e:
+            print(f"决策分析错误: {str(e)}")
@@ -0,0 +1,168 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import asyncio
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from config import LOGIN_WRITER_CONFIG
+from database import db
+from utils.auth_cache import auth_cache
+
+_STOP = object()
+
+class LoginEventWriter:
+    """登录记录与最后登录时间的异步批量写入，登录请求只负责入队"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**LOGIN_WRITER_CONFIG, **(config or {})}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._getter: Optional[asyncio.Future] = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.backpressure_waits = 0
+        self.dropped = 0
+        self.failed = 0
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.config['max_queued'])
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """写完队列中剩余的记录后停止；入队结束标记与等待写完共用 shutdown_timeout"""
+        if self._task is None:
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config['shutdown_timeout']
+        try:
+            # 队列满时结束标记要等写入任务腾出位置，不能无限等待
+            await asyncio.wait_for(self._queue.put(_STOP), self.config['shutdown_timeout'])
+            await asyncio.wait_for(self._task, max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            print(f"登录记录未写完即关闭，剩余 {self._queue.qsize()} 条")
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._getter is not None:
+            self._getter.cancel()
+            self._getter = None
+        self._task = None
+        # 关闭后的登录记录直接写入
+        self._queue = None
+
+    async def record(
+        self,
+        user_id: ObjectId,
+        login_type: str,
+        status: str,
+        login_ip: str = "",
+        device_info: str = "",
+        fail_reason: Optional[str] = None
+    ):
+        """记录一次登录；队列满时最多等待 enqueue_timeout，超时丢弃而不影响登录"""
+        event = {
+            "user_id": user_id,
+            "login_time": datetime.now(),
+            "login_ip": login_ip,
+            "device_info": device_info,
+            "login_type": login_type,
+            "status": status,
+            "fail_reason": fail_reason
+        }
+        if self._queue is None:
+            await self._write([event])
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.backpressure_waits += 1
+            try:
+                await asyncio.wait_for(self._queue.put(event), self.config['enqueue_timeout'])
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                return
+        self.enqueued += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "backpressure_waits": self.backpressure_waits,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await self._next(None)
+            if event is _STOP:
+                return
+            batch = [event]
+            deadline = loop.time() + self.config['flush_interval_seconds']
+            stopping = False
+            while len(batch) < self.config['batch_size']:
+                event = await self._next(max(deadline - loop.time(), 0))
+                if event is None:
+                    break
+                if event is _STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _next(self, timeout: Optional[float]) -> Any:
+        """取下一条记录，超时返回 None；未完成的 get 保留到下次，避免取消时丢失记录"""
+        if self._getter is None:
+            self._getter = asyncio.ensure_future(self._queue.get())
+        done, _ = await asyncio.wait({self._getter}, timeout=timeout)
+        if not done:
+            return None
+        event = self._getter.result()
+        self._getter = None
+        return event
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        login_times: Dict[ObjectId, datetime] = {}
+        for event in batch:
+            if event["status"] == "success":
+                user_id = event["user_id"]
+                login_times[user_id] = max(event["login_time"], login_times.get(user_id, event["login_time"]))
+
+        for attempt in range(self.config['max_retries'] + 1):
+            try:
+                await db.login_history.insert_many(batch, ordered=False)
+                error = None
+            except BulkWriteError as e:
+                # 重试时已写入的记录（_id 已分配）会报重复键，视为成功
+                write_errors = e.details.get("writeErrors", [])
+                error = None if write_errors and all(item.get("code") == 11000 for item in write_errors) else e
+            except Exception as e:
+                error = e
+            if error is None:
+                self.written += len(batch)
+                break
+            if attempt == self.config['max_retries']:
+                print(f"登录记录写入失败: {str(error)}")
+                self.failed += len(batch)
+                break
+            await asyncio.sleep(2 ** attempt * 0.1)
+        # 登录记录写入失败时仍更新最后登录时间；$max 保证乱序写入时不会回退
+        try:
+            if login_times:
+                await db.users.bulk_write([
+                    UpdateOne({"_id": user_id}, {"$max": {"last_login_time": login_time}})
+                    for user_id, login_time in login_times.items()
+                ], ordered=False)
+        except Exception as e:
+            print(f"最后登录时间更新失败: {str(e)}")
+        for user_id in login_times:
+            auth_cache.invalidate_user(str(user_id))
+        self.batches += 1
+
+login_writer = LoginEventWriter()
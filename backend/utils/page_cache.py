@@ -0,0 +1,92 @@
+from typing import Dict, Any, Optional
+from datetime import datetime
+import hashlib
+from config import PAGE_CACHE_CONFIG
+from utils.cache import TTLCache, DiskStore, MongoStore
+from utils.dedup import canonicalize_url
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(canonicalize_url(url).encode()).hexdigest()
+
+class PageCache:
+    """调研网页缓存：按规范化URL缓存清洗后的文本及 ETag/Last-Modified"""
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or PAGE_CACHE_CONFIG
+        self.ttl = self.config['ttl_seconds']
+        self.memory = TTLCache(max_size=self.config['max_memory_entries'])
+        self.backend = self._create_backend(self.config['backend'])
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _create_backend(self, name: str):
+        if name == "disk":
+            return DiskStore(self.config['disk_path'], self.config['max_disk_entries'])
+        if name == "mongo":
+            return MongoStore("page_cache")
+        return None
+
+    async def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """获取缓存条目（可能已过期，需要调用方重新验证）"""
+        key = cache_key(url)
+        entry = self.memory.get(key)
+        if entry is None and self.backend is not None:
+            entry = await self.backend.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+
+        if entry is None:
+            self.misses += 1
+        elif self.is_fresh(entry):
+            self.fresh_hits += 1
+        else:
+            self.stale_hits += 1
+        return entry
+
+    async def set(self, url: str, text: str, etag: str = None, last_modified: str = None):
+        key = cache_key(url)
+        entry = {
+            "url": canonicalize_url(url),
+            "text": text,
+            "content_hash": hashlib.sha256(text.encode()).hexdigest(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.utcnow().timestamp()
+        }
+        self.memory.set(key, entry)
+        if self.backend is not None:
+            await self.backend.set(key, entry)
+
+    async def touch(self, url: str, entry: Dict[str, Any]):
+        """304 重新验证成功后刷新时间戳"""
+        self.revalidated += 1
+        await self.set(url, entry["text"], entry.get("etag"), entry.get("last_modified"))
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return datetime.utcnow().timestamp() - entry["fetched_at"] < self.ttl
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """生成条件请求头"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.fresh_hits + self.stale_hits + self.misses
+        return {
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_ratio": (self.fresh_hits + self.revalidated) / total if total else 0.0,
+            "memory": self.memory.get_stats()
+        }
+
+# 全局网页缓存
+page_cache = PageCache()
@@ -0,0 +1,113 @@
+from typing import Any, Dict, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import time
+from config import PASSWORD_CONFIG
+from utils.encrypt import MIN_COSTS, hash_password, needs_rehash, verify_password
+
+def benchmark(algorithm: str, cost: int, rounds: int = 3) -> float:
+    """返回指定成本下单次加密的耗时中位数（毫秒）"""
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hash_password("calibration-password", algorithm, cost)
+        durations.append((time.perf_counter() - start) * 1000)
+    return sorted(durations)[len(durations) // 2]
+
+def calibrate(algorithm: str, target_ms: float, max_cost: int = 31) -> Tuple[int, float]:
+    """逐步提高成本，返回耗时不超过目标的最大成本及其耗时"""
+    cost = MIN_COSTS[algorithm]
+    elapsed = benchmark(algorithm, cost)
+    while cost < max_cost:
+        next_elapsed = benchmark(algorithm, cost + 1)
+        if next_elapsed > target_ms:
+            break
+        cost, elapsed = cost + 1, next_elapsed
+    return cost, elapsed
+
+class PasswordHasher:
+    """在有界线程池/进程池中执行密码加密和校验，不阻塞事件循环"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**PASSWORD_CONFIG, **(config or {})}
+        self.algorithm = self.config['algorithm']
+        self.cost = self.config['cost']
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashes = 0
+        self.total_ms = 0.0
+
+    async def hash(self, password: str) -> str:
+        self.hashes += 1
+        return await self._run(hash_password, password, self.algorithm, self.cost)
+
+    async def verify(self, password: str, stored: str) -> bool:
+        self.verifications += 1
+        return await self._run(verify_password, password, stored)
+
+    async def verify_and_upgrade(self, password: str, stored: str) -> Tuple[bool, Optional[str]]:
+        """校验密码；通过且哈希为旧格式或成本过低时，同时返回新的哈希"""
+        if not await self.verify(password, stored):
+            return False, None
+        if not self.needs_rehash(stored):
+            return True, None
+        self.rehashes += 1
+        return True, await self.hash(password)
+
+    def needs_rehash(self, stored: str) -> bool:
+        return needs_rehash(stored, self.algorithm, self.cost)
+
+    async def calibrate(self, target_ms: Optional[float] = None) -> Dict[str, Any]:
+        """在工作线程中校准成本，使单次加密耗时接近目标；与加密请求共用排队上限"""
+        target_ms = target_ms or self.config['target_ms']
+        cost, elapsed = await self._run(calibrate, self.algorithm, target_ms, timed=False)
+        self.cost = cost
+        return {"algorithm": self.algorithm, "cost": cost, "elapsed_ms": elapsed, "target_ms": target_ms}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = self.hashes + self.verifications
+        return {
+            "algorithm": self.algorithm,
+            "cost": self.cost,
+            "workers": self.config['workers'],
+            "hashes": self.hashes,
+            "verifications": self.verifications,
+            "rehashes": self.rehashes,
+            "avg_ms": self.total_ms / calls if calls else 0.0
+        }
+
+    async def _run(self, func, *args, timed: bool = True):
+        """在执行器中运行，timed 为 False 时不计入平均耗时（如校准）"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.config['max_pending'])
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+            finally:
+                if timed:
+                    self.total_ms += (time.perf_counter() - start) * 1000
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.config['executor'] == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.config['workers'])
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config['workers'],
+                    thread_name_prefix="password"
+                )
+        return self._executor
+
+password_hasher = PasswordHasher()
+
+if __name__ == "__main__":
+    cost, elapsed = calibrate(PASSWORD_CONFIG['algorithm'], PASSWORD_CONFIG['target_ms'])
+    print(f"{PASSWORD_CONFIG['algorithm']} 推荐成本: {cost}（单次约 {elapsed:.1f}ms）")
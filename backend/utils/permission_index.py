@@ -0,0 +1,210 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+from datetime import datetime
+import asyncio
+from bson import ObjectId
+from pymongo import UpdateOne
+from config import PERMISSION_INDEX_CONFIG
+from database import db
+
+class PermissionIndex:
+    """用户 → 权限名集合的内存索引，校验权限时不访问数据库。
+    角色分配和授权应通过 assign_role/grant_permission 等方法写入，以便立即生效；
+    其它进程直接写库的修改由变更监听（需副本集）或定期全量重建同步"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**PERMISSION_INDEX_CONFIG, **(config or {})}
+        self.permission_names: Dict[str, str] = {}                # permission_id → 权限名
+        self.role_permissions: Dict[str, FrozenSet[str]] = {}     # role_id → 权限名集合
+        self.user_roles: Dict[str, FrozenSet[str]] = {}           # user_id → role_id 集合
+        self.role_users: Dict[str, set] = {}                      # role_id → user_id 集合
+        self.user_permissions: Dict[str, FrozenSet[str]] = {}
+        self.loaded = False
+        self.built_at: Optional[datetime] = None
+        self.rebuilds = 0
+        self.incremental_updates = 0
+        self._lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+
+    def has_permission(self, user_id: str, permission: str) -> bool:
+        return permission in self.user_permissions.get(str(user_id), frozenset())
+
+    def get_permissions(self, user_id: str) -> FrozenSet[str]:
+        return self.user_permissions.get(str(user_id), frozenset())
+
+    async def rebuild(self):
+        """全量重建：三个集合各扫描一次，在内存中完成关联"""
+        async with self._lock:
+            permissions = await db.permissions.find({}, {"permission_name": 1}).to_list(None)
+            role_links = await db.role_permissions.find({}, {"role_id": 1, "permission_id": 1}).to_list(None)
+            user_links = await db.user_roles.find({}, {"user_id": 1, "role_id": 1}).to_list(None)
+
+            self.permission_names = {str(p["_id"]): p["permission_name"] for p in permissions}
+            self.role_permissions = self._group(
+                (str(link["role_id"]), self.permission_names.get(str(link["permission_id"])))
+                for link in role_links
+            )
+            self.user_roles = self._group((str(link["user_id"]), str(link["role_id"])) for link in user_links)
+            self.role_users = {}
+            for user_id, role_ids in self.user_roles.items():
+                for role_id in role_ids:
+                    self.role_users.setdefault(role_id, set()).add(user_id)
+            self.user_permissions = {
+                user_id: self._resolve(role_ids) for user_id, role_ids in self.user_roles.items()
+            }
+            self.loaded = True
+            self.built_at = datetime.now()
+            self.rebuilds += 1
+        await self._persist(self.user_permissions)
+
+    async def refresh_user(self, user_id: str):
+        """用户角色变更后调用，只重新加载该用户"""
+        user_id = str(user_id)
+        async with self._lock:
+            links = await db.user_roles.find({"user_id": ObjectId(user_id)}, {"role_id": 1}).to_list(None)
+            role_ids = frozenset(str(link["role_id"]) for link in links)
+            for role_id in self.user_roles.get(user_id, frozenset()) - role_ids:
+                self.role_users.get(role_id, set()).discard(user_id)
+            for role_id in role_ids:
+                self.role_users.setdefault(role_id, set()).add(user_id)
+            self._set_user(user_id, role_ids)
+            self.incremental_updates += 1
+            changed = {user_id: self.get_permissions(user_id)}
+        await self._persist(changed)
+
+    async def refresh_role(self, role_id: str):
+        """角色权限或权限定义变更后调用，重新计算拥有该角色的用户"""
+        role_id = str(role_id)
+        async with self._lock:
+            links = await db.role_permissions.find({"role_id": ObjectId(role_id)}, {"permission_id": 1}).to_list(None)
+            missing = [link["permission_id"] for link in links if str(link["permission_id"]) not in self.permission_names]
+            if missing:
+                permissions = await db.permissions.find({"_id": {"$in": missing}}, {"permission_name": 1}).to_list(None)
+                self.permission_names.update({str(p["_id"]): p["permission_name"] for p in permissions})
+            names = frozenset(
+                self.permission_names[str(link["permission_id"])] for link in links
+                if str(link["permission_id"]) in self.permission_names
+            )
+            if names:
+                self.role_permissions[role_id] = names
+            else:
+                self.role_permissions.pop(role_id, None)
+            changed = {}
+            for user_id in self.role_users.get(role_id, set()):
+                self._set_user(user_id, self.user_roles[user_id])
+                changed[user_id] = self.get_permissions(user_id)
+            self.incremental_updates += 1
+        await self._persist(changed)
+
+    async def assign_role(self, user_id: str, role_id: str):
+        """给用户分配角色，写入后立即刷新该用户"""
+        await db.user_roles.update_one(
+            {"user_id": ObjectId(user_id), "role_id": ObjectId(role_id)},
+            {"$setOnInsert": {"create_time": datetime.now()}},
+            upsert=True
+        )
+        await self.refresh_user(user_id)
+
+    async def revoke_role(self, user_id: str, role_id: str):
+        await db.user_roles.delete_one({"user_id": ObjectId(user_id), "role_id": ObjectId(role_id)})
+        await self.refresh_user(user_id)
+
+    async def grant_permission(self, role_id: str, permission_id: str):
+        """给角色授予权限，写入后立即刷新拥有该角色的用户"""
+        await db.role_permissions.update_one(
+            {"role_id": ObjectId(role_id), "permission_id": ObjectId(permission_id)},
+            {"$setOnInsert": {"create_time": datetime.now()}},
+            upsert=True
+        )
+        await self.refresh_role(role_id)
+
+    async def revoke_permission(self, role_id: str, permission_id: str):
+        await db.role_permissions.delete_one({"role_id": ObjectId(role_id), "permission_id": ObjectId(permission_id)})
+        await self.refresh_role(role_id)
+
+    async def start(self):
+        try:
+            await self.rebuild()
+        except Exception as e:
+            # 加载前所有权限校验均拒绝，由定期重建重试
+            print(f"权限索引加载失败: {str(e)}")
+        self._tasks.append(asyncio.ensure_future(self._rebuild_periodically()))
+        if self.config['watch_changes']:
+            self._tasks.append(asyncio.ensure_future(self._watch("user_roles", "user_id", self.refresh_user)))
+            self._tasks.append(asyncio.ensure_future(self._watch("role_permissions", "role_id", self.refresh_role)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+            "users": len(self.user_permissions),
+            "roles": len(self.role_permissions),
+            "permissions": len(self.permission_names),
+            "rebuilds": self.rebuilds,
+            "incremental_updates": self.incremental_updates
+        }
+
+    def _set_user(self, user_id: str, role_ids: FrozenSet[str]):
+        if role_ids:
+            self.user_roles[user_id] = role_ids
+            self.user_permissions[user_id] = self._resolve(role_ids)
+        else:
+            self.user_roles.pop(user_id, None)
+            self.user_permissions.pop(user_id, None)
+
+    def _resolve(self, role_ids: Iterable[str]) -> FrozenSet[str]:
+        return frozenset().union(*(self.role_permissions.get(role_id, frozenset()) for role_id in role_ids))
+
+    @staticmethod
+    def _group(pairs: Iterable[tuple]) -> Dict[str, FrozenSet[str]]:
+        groups: Dict[str, set] = {}
+        for key, value in pairs:
+            if value is not None:
+                groups.setdefault(key, set()).add(value)
+        return {key: frozenset(values) for key, values in groups.items()}
+
+    async def _persist(self, user_permissions: Dict[str, FrozenSet[str]]):
+        """可选：把用户权限集合反规范化写入 user_permissions 集合"""
+        if not self.config['denormalize'] or not user_permissions:
+            return
+        now = datetime.now()
+        await db.user_permissions.bulk_write([
+            UpdateOne(
+                {"_id": ObjectId(user_id)},
+                {"$set": {"permissions": sorted(permissions), "update_time": now}},
+                upsert=True
+            )
+            for user_id, permissions in user_permissions.items()
+        ], ordered=False)
+
+    async def _rebuild_periodically(self):
+        while True:
+            await asyncio.sleep(self.config['rebuild_interval_seconds'])
+            try:
+                await self.rebuild()
+            except Exception as e:
+                print(f"权限索引重建失败: {str(e)}")
+
+    async def _watch(self, collection: str, key: str, refresh):
+        """监听关联集合变更；删除事件不含原文档，退回全量重建"""
+        while True:
+            try:
+                async with db[collection].watch(full_document="updateLookup") as stream:
+                    async for change in stream:
+                        document = change.get("fullDocument")
+                        if document is not None and key in document:
+                            await refresh(document[key])
+                        else:
+                            await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"权限变更监听中断: {str(e)}")
+                await asyncio.sleep(self.config['rebuild_interval_seconds'])
+
+permission_index = PermissionIndex()
@@ -1,30 +1,110 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Awaitable, Optional
 import asyncio
 from datetime import datetime
-from duckduckgo_search import ddg
-from bs4 import BeautifulSoup
 import aiohttp
 import json
+from urllib.parse import urlparse
+from config import RESEARCH_CONFIG
+from utils.http_client import http_client
+from utils.search_provider import SearchProvider, default_search_provider
+from utils.page_cache import page_cache
+from utils.html_extract import extract_text_from_stream
+from utils.dedup import canonicalize_url, simhash, NearDuplicateIndex
+
+class FetchScheduler:
+    """调研抓取调度器：全局并发上限、单主机并发上限和单次调研截止时间"""
+
+    def __init__(self, max_concurrency: int, per_host_concurrency: int, deadline_seconds: float):
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+        self._per_host_concurrency = per_host_concurrency
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._deadline = asyncio.get_running_loop().time() + deadline_seconds
+
+    def remaining(self) -> float:
+        """距离截止时间的剩余秒数"""
+        return max(0.0, self._deadline - asyncio.get_running_loop().time())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    async def run(self, url: str, coro_func, *args):
+        """在全局和主机并发限制下执行任务，超过截止时间返回 None"""
+        if self.expired():
+            return None
+
+        host = urlparse(url).netloc.lower() or url
+        host_limit = self._host_limits.get(host)
+        if host_limit is None:
+            host_limit = self._host_limits[host] = asyncio.Semaphore(self._per_host_concurrency)
+
+        try:
+            async with self._global_limit, host_limit:
+                return await asyncio.wait_for(coro_func(*args), timeout=self.remaining())
+        except asyncio.TimeoutError:
+            return None
 
 class ResearchAssistant:
-    def __init__(self):
+    def __init__(
+        self,
+        search_provider: SearchProvider = None,
+        on_progress: Optional[Callable[[List[Dict[str, Any]], Dict[str, Any]], Awaitable[None]]] = None
+    ):
         self.findings = []
         self.data_sources = []
         self.focus_areas = []
+        self.scheduler: FetchScheduler = None
+        self.search_provider = search_provider or default_search_provider
+        self.seen_urls = set()
+        self.content_index = NearDuplicateIndex()
+        self.duplicate_urls = 0
+        self.duplicate_pages = 0
+        # 每个查询完成后回调新发现和进度，用于增量保存
+        self.on_progress = on_progress
+        self.total_queries = 0
+        self.completed_queries = 0
         
-    async def start_research(self, topic: str, focus_areas: List[str] = None) -> Dict[str, Any]:
+    async def start_research(
+        self,
+        topic: str,
+        focus_areas: List[str] = None,
+        deadline_seconds: float = None
+    ) -> Dict[str, Any]:
         """开始调研"""
         if not focus_areas:
             # 自动生成研究重点
             focus_areas = self.generate_focus_areas(topic)
         
         self.focus_areas = focus_areas
-        research_results = []
+        self.findings = []
+        self.data_sources = []
+        self.seen_urls = set()
+        self.content_index = NearDuplicateIndex()
+        self.duplicate_urls = 0
+        self.duplicate_pages = 0
+        self.total_queries = sum(len(self.generate_search_queries(area)) for area in focus_areas)
+        self.completed_queries = 0
+        self.scheduler = self._create_scheduler(deadline_seconds)
+        
+        # 所有重点领域并行调研，抓取统一由调度器限流
+        tasks = [asyncio.ensure_future(self.research_focus_area(area)) for area in focus_areas]
+        try:
+            # 截止时抓取会自行返回，额外等待一小段时间让已完成的页面记录下来
+            done, pending = await asyncio.wait(
+                tasks,
+                timeout=self.scheduler.remaining() + RESEARCH_CONFIG['deadline_grace_seconds']
+            )
+        except asyncio.CancelledError:
+            # 调研被取消时一并取消所有子任务
+            for task in tasks:
+                task.cancel()
+            raise
         
-        for area in focus_areas:
-            # 针对每个重点领域进行调研
-            area_results = await self.research_focus_area(area)
-            research_results.extend(area_results)
+        if pending:
+            # 截止时间已到，取消未完成的任务；已抓取的页面在完成时即已记录
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        research_results = list(self.findings)
             
         # 分析和总结结果
         summary = self.analyze_findings(research_results)
@@ -34,9 +114,22 @@ class ResearchAssistant:
             "focus_areas": focus_areas,
             "findings": research_results,
             "summary": summary,
-            "data_sources": self.data_sources
+            "data_sources": self.data_sources,
+            "partial": bool(pending),
+            "dedup": {
+                "duplicate_urls": self.duplicate_urls,
+                "duplicate_pages": self.duplicate_pages
+            }
         }
     
+    def _create_scheduler(self, deadline_seconds: float = None) -> FetchScheduler:
+        """创建本次调研的抓取调度器"""
+        return FetchScheduler(
+            max_concurrency=RESEARCH_CONFIG['max_concurrency'],
+            per_host_concurrency=RESEARCH_CONFIG['per_host_concurrency'],
+            deadline_seconds=deadline_seconds or RESEARCH_CONFIG['deadline_seconds']
+        )
+    
     def generate_focus_areas(self, topic: str) -> List[str]:
         """根据主题生成研究重点"""
         # TODO: 使用 LLM 生成更智能的研究重点
@@ -52,14 +145,16 @@ class ResearchAssistant:
     async def research_focus_area(self, focus: str) -> List[Dict[str, Any]]:
         """研究特定重点领域"""
         search_results = []
+        if self.scheduler is None:
+            self.scheduler = self._create_scheduler()
         
         # 构建搜索查询
         queries = self.generate_search_queries(focus)
         
-        # 并行执行搜索
-        async with aiohttp.ClientSession() as session:
-            tasks = [self.search_and_analyze(session, query) for query in queries]
-            results = await asyncio.gather(*tasks)
+        # 并行执行搜索，复用进程级连接池
+        session = http_client.session
+        tasks = [self.search_and_analyze(session, query) for query in queries]
+        results = await asyncio.gather(*tasks)
             
         for result in results:
             if result:
@@ -79,22 +174,41 @@ class ResearchAssistant:
     async def search_and_analyze(self, session: aiohttp.ClientSession, query: str) -> List[Dict[str, Any]]:
         """执行搜索并分析结果"""
         try:
-            # 使用 DuckDuckGo 搜索
-            search_results = ddg(query, max_results=5)
+            # 异步搜索，默认使用 DuckDuckGo
+            search_results = await self.search_provider.search(
+                query, max_results=RESEARCH_CONFIG['results_per_query']
+            )
+            
+            # 跳过规范化后已抓取过的URL（不同查询参数、镜像站点）
+            search_results = [result for result in search_results if self._claim_url(result['link'])]
             
+            # 并行抓取和分析网页内容，由调度器控制并发与截止时间；
+            # 每个页面完成即记录，截止时间到达时不丢失已完成的页面
+            fetches = [
+                asyncio.ensure_future(self._fetch_result(session, result))
+                for result in search_results
+            ]
             findings = []
-            for result in search_results:
-                # 抓取和分析网页内容
-                content = await self.fetch_and_parse(session, result['link'])
-                if content:
-                    finding = {
-                        'title': result['title'],
-                        'source': result['link'],
-                        'content': content,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    findings.append(finding)
-                    self.data_sources.append(result['link'])
+            try:
+                for fetch in asyncio.as_completed(fetches):
+                    result, content = await fetch
+                    if content and self._is_new_content(content):
+                        finding = {
+                            'title': result['title'],
+                            'source': result['link'],
+                            'content': content,
+                            'timestamp': datetime.now().isoformat()
+                        }
+                        findings.append(finding)
+                        self.findings.append(finding)
+                        self.data_sources.append(result['link'])
+                        await self._report_progress([finding])
+            finally:
+                for fetch in fetches:
+                    fetch.cancel()
+            
+            self.completed_queries += 1
+            await self._report_progress([])
             
             return findings
             
@@ -102,18 +216,65 @@ class ResearchAssistant:
             print(f"搜索错误: {str(e)}")
             return []
     
+    async def _fetch_result(self, session: aiohttp.ClientSession, result: Dict[str, Any]):
+        content = await self.scheduler.run(result['link'], self.fetch_and_parse, session, result['link'])
+        return result, content
+    
+    async def _report_progress(self, findings: List[Dict[str, Any]]):
+        if self.on_progress:
+            await self.on_progress(findings, {
+                "completed_queries": self.completed_queries,
+                "total_queries": self.total_queries,
+                "findings": len(self.findings)
+            })
+    
+    def _claim_url(self, url: str) -> bool:
+        """登记待抓取的URL，规范化后重复则返回 False"""
+        canonical = canonicalize_url(url)
+        if canonical in self.seen_urls:
+            self.duplicate_urls += 1
+            return False
+        self.seen_urls.add(canonical)
+        return True
+    
+    def _is_new_content(self, content: str) -> bool:
+        """基于 SimHash 判断内容是否与已有发现近似重复"""
+        if self.content_index.add(simhash(content)):
+            return True
+        self.duplicate_pages += 1
+        return False
+    
     async def fetch_and_parse(self, session: aiohttp.ClientSession, url: str) -> str:
         """获取和解析网页内容"""
         try:
-            async with session.get(url) as response:
+            # 命中未过期缓存时跳过网络请求和解析
+            cached = await page_cache.get(url)
+            if cached and page_cache.is_fresh(cached):
+                return cached['text']
+            
+            headers = page_cache.conditional_headers(cached)
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and cached:
+                    await page_cache.touch(url, cached)
+                    return cached['text']
+                
                 if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
+                    # 只处理HTML页面
+                    if response.content_type not in RESEARCH_CONFIG['allowed_content_types']:
+                        return None
                     
-                    # 提取主要内容
-                    # 这里可以添加更复杂的内容提取逻辑
-                    content = soup.get_text()
-                    return self.clean_content(content)
+                    # 流式读取并提取主要内容，超过字节预算即停止下载
+                    content = self.clean_content(await extract_text_from_stream(
+                        http_client.iter_body(response, RESEARCH_CONFIG['read_chunk_bytes']),
+                        encoding=response.charset
+                    ))
+                    await page_cache.set(
+                        url,
+                        content,
+                        etag=response.headers.get('ETag'),
+                        last_modified=response.headers.get('Last-Modified')
+                    )
+                    return content
                     
         except Exception as e:
             print(f"解析错误: {str(e)}")
@@ -124,7 +285,8 @@ class ResearchAssistant:
         # 移除多余空白字符
         content = ' '.join(content.split())
         # 限制长度
-        return content[:5000] if len(content) > 5000 else content
+        max_chars = RESEARCH_CONFIG['max_content_chars']
+        return content[:max_chars] if len(content) > max_chars else content
     
     def analyze_findings(self, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
         """分析研究发现并生成摘要"""
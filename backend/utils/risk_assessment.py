@@ -1,6 +1,7 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
+from config import RISK_CONFIG
 
 @dataclass
 class RiskFactor:
@@ -12,60 +13,165 @@ class RiskFactor:
 
 class RiskAssessor:
     def __init__(self):
-        self.risk_levels = {
-            'low': (0, 0.3),
-            'medium': (0.3, 0.6),
-            'high': (0.6, 1.0)
-        }
+        # 按区间下限排序，用 np.digitize 一次性确定等级
+        levels = sorted(
+            RISK_CONFIG['risk_matrix'].items(),
+            key=lambda item: item[1]['score_range'][0]
+        )
+        self.risk_levels = {name: level['score_range'] for name, level in levels}
+        self.level_names = np.array([name for name, _ in levels])
+        self.level_edges = np.array([level['score_range'][0] for _, level in levels[1:]])
+        self.min_score = levels[0][1]['score_range'][0]
         
-    def assess_risks(self, risk_factors: List[RiskFactor]) -> Dict[str, Any]:
+    def assess_risks(
+        self,
+        risk_factors: List[RiskFactor],
+        include_factors: bool = True,
+        monte_carlo: bool = False,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
         """评估风险"""
-        assessments = []
-        
-        for factor in risk_factors:
-            # 计算风险分数
-            risk_score = factor.probability * factor.impact
-            
-            # 确定风险等级
-            risk_level = self.determine_risk_level(risk_score)
-            
-            assessment = {
-                'factor': factor.name,
-                'score': risk_score,
-                'level': risk_level,
-                'probability': factor.probability,
-                'impact': factor.impact,
-                'description': factor.description,
-                'mitigation': factor.mitigation
-            }
-            assessments.append(assessment)
-            
-        # 整体风险评估
-        overall_assessment = self.calculate_overall_risk(assessments)
+        probabilities, impacts = self._to_arrays(risk_factors)
+        scores, level_index = self._score(probabilities, impacts)
         
-        return {
-            'risk_factors': assessments,
-            'overall_assessment': overall_assessment
+        result = {
+            'overall_assessment': self._overall(scores, level_index)
         }
         
+        if include_factors:
+            levels = self.level_names[level_index]
+            result['risk_factors'] = [
+                {
+                    'factor': factor.name,
+                    'score': float(score),
+                    'level': str(level),
+                    'probability': factor.probability,
+                    'impact': factor.impact,
+                    'description': factor.description,
+                    'mitigation': factor.mitigation
+                }
+                for factor, score, level in zip(risk_factors, scores, levels)
+            ]
+        
+        if monte_carlo:
+            result['monte_carlo'] = self.simulate(probabilities, impacts, seed=seed)
+        
+        return result
+        
     def determine_risk_level(self, score: float) -> str:
         """确定风险等级"""
-        for level, (min_score, max_score) in self.risk_levels.items():
-            if min_score <= score < max_score:
-                return level
-        return 'high'
+        return str(self.level_names[self._level_index(score)])
         
     def calculate_overall_risk(self, assessments: List[Dict[str, Any]]) -> Dict[str, Any]:
         """计算整体风险"""
-        scores = [a['score'] for a in assessments]
+        scores = np.array([a['score'] for a in assessments], dtype=float)
+        return self._overall(scores, self._level_index(scores))
+    
+    def simulate(
+        self,
+        probabilities: np.ndarray,
+        impacts: np.ndarray,
+        n_samples: int = None,
+        correlation: float = None,
+        uncertainty: float = None,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """蒙特卡洛模拟：在 logit 尺度上对概率和影响加入相关扰动，得到整体风险的分布"""
+        if not len(probabilities):
+            return {'samples': 0}
+        n_samples = n_samples or RISK_CONFIG['monte_carlo_samples']
+        correlation = RISK_CONFIG['correlation'] if correlation is None else correlation
+        uncertainty = RISK_CONFIG['uncertainty'] if uncertainty is None else uncertainty
+        rng = np.random.default_rng(seed)
+        n_factors = len(probabilities)
+        n_samples = max(
+            min(n_samples, RISK_CONFIG['max_total_elements'] // max(n_factors, 1)),
+            RISK_CONFIG['min_monte_carlo_samples']
+        )
+        
+        # 采样在 float32 上进行，减少内存和计算量
+        eps = 1e-6
+        logit_p = self._logit(np.clip(probabilities, eps, 1 - eps)).astype(np.float32)
+        logit_i = self._logit(np.clip(impacts, eps, 1 - eps)).astype(np.float32)
         
+        mean_scores = np.empty(n_samples)
+        max_scores = np.empty(n_samples)
+        realized_impacts = np.empty(n_samples)
+        high_counts = np.empty(n_samples)
+        high_index = len(self.level_names) - 1
+        
+        # 分批采样，单批元素数不超过上限
+        chunk = max(1, RISK_CONFIG['max_chunk_elements'] // max(n_factors, 1))
+        for start in range(0, n_samples, chunk):
+            size = min(chunk, n_samples - start)
+            # 共同冲击使各风险因素同向变化，相关系数为 correlation
+            common = np.float32(np.sqrt(correlation) * uncertainty) * rng.standard_normal((size, 1), dtype=np.float32)
+            idiosyncratic = np.float32(np.sqrt(1 - correlation) * uncertainty)
+            sampled_p = self._sigmoid(logit_p + common + idiosyncratic * rng.standard_normal((size, n_factors), dtype=np.float32))
+            sampled_i = self._sigmoid(logit_i + common + idiosyncratic * rng.standard_normal((size, n_factors), dtype=np.float32))
+            
+            scores = sampled_p * sampled_i
+            occurred = rng.random((size, n_factors), dtype=np.float32) < sampled_p
+            window = slice(start, start + size)
+            mean_scores[window] = scores.mean(axis=1)
+            max_scores[window] = scores.max(axis=1)
+            realized_impacts[window] = (occurred * sampled_i).sum(axis=1)
+            high_counts[window] = (self._level_index(scores) == high_index).sum(axis=1)
+        
+        percentiles = [5, 25, 50, 75, 95]
+        
+        def distribution(values: np.ndarray) -> Dict[str, float]:
+            return {
+                'mean': float(values.mean()),
+                **{f'p{p}': float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+            }
+        
+        overall_levels = self._level_index(mean_scores)
+        return {
+            'samples': n_samples,
+            'average_score': distribution(mean_scores),
+            'max_score': distribution(max_scores),
+            'realized_impact': distribution(realized_impacts),
+            'high_risk_count': distribution(high_counts),
+            'level_probability': {
+                str(name): float(p)
+                for name, p in zip(self.level_names, np.bincount(overall_levels, minlength=len(self.level_names)) / n_samples)
+            }
+        }
+    
+    def _to_arrays(self, risk_factors: List[RiskFactor]) -> Tuple[np.ndarray, np.ndarray]:
+        probabilities = np.fromiter((factor.probability for factor in risk_factors), dtype=float, count=len(risk_factors))
+        impacts = np.fromiter((factor.impact for factor in risk_factors), dtype=float, count=len(risk_factors))
+        return probabilities, impacts
+    
+    def _score(self, probabilities: np.ndarray, impacts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        scores = probabilities * impacts
+        return scores, self._level_index(scores)
+    
+    def _level_index(self, scores):
+        """等级下标；与原逐条判断一致，低于最低区间的分数（如负数）和 NaN 归为最高等级"""
+        index = np.digitize(scores, self.level_edges)
+        return np.where(np.asarray(scores) < self.min_score, len(self.level_names) - 1, index)
+    
+    def _overall(self, scores: np.ndarray, level_index: np.ndarray) -> Dict[str, Any]:
+        counts = np.bincount(level_index, minlength=len(self.level_names))
+        average = float(scores.mean()) if len(scores) else 0.0
         overall = {
-            'average_score': np.mean(scores),
-            'max_score': max(scores),
-            'risk_level': self.determine_risk_level(np.mean(scores)),
-            'high_risk_count': sum(1 for a in assessments if a['level'] == 'high'),
-            'medium_risk_count': sum(1 for a in assessments if a['level'] == 'medium'),
-            'low_risk_count': sum(1 for a in assessments if a['level'] == 'low')
+            'average_score': average,
+            'max_score': float(scores.max()) if len(scores) else 0.0,
+            'risk_level': self.determine_risk_level(average)
         }
-        
-        return overall 
\ No newline at end of file
+        for name, count in zip(self.level_names, counts):
+            overall[f'{name}_risk_count'] = int(count)
+        return overall
+    
+    @staticmethod
+    def _logit(x: np.ndarray) -> np.ndarray:
+        return np.log(x / (1 - x))
+    
+    @staticmethod
+    def _sigmoid(x: np.ndarray) -> np.ndarray:
+        x = np.negative(x, out=x)
+        np.exp(x, out=x)
+        x += 1
+        return np.reciprocal(x, out=x)
@@ -0,0 +1,40 @@
+from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from config import RESEARCH_CONFIG
+
+try:
+    from duckduckgo_search import ddg
+except ImportError:
+    ddg = None
+
+class SearchProvider:
+    """异步搜索服务接口，返回包含 title 和 link 的结果列表"""
+
+    async def search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class DuckDuckGoSearchProvider(SearchProvider):
+    """DuckDuckGo 搜索，同步的 ddg() 调用放到有界线程池执行，避免阻塞事件循环"""
+
+    def __init__(self, max_workers: int = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or RESEARCH_CONFIG['search_workers'],
+            thread_name_prefix="ddg-search"
+        )
+
+    async def search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        if ddg is None:
+            raise RuntimeError("未安装 duckduckgo_search")
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self._executor, lambda: ddg(query, max_results=max_results))
+        return results or []
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+# 默认搜索服务
+default_search_provider = DuckDuckGoSearchProvider()
@@ -0,0 +1,279 @@
+from typing import List, Dict, Any, AsyncIterable, Optional, Tuple
+from collections import deque
+from datetime import datetime, timezone
+import copy
+import numpy as np
+import pandas as pd
+from config import ANALYSIS_CONFIG
+
+class TrendEngine:
+    """增量趋势分析：按块更新统计量和窗口回归斜率，内存占用与数据量无关，可跨分片合并"""
+
+    def __init__(
+        self,
+        window_size: Optional[int] = None,
+        max_windows: Optional[int] = None,
+        max_change_points: Optional[int] = None,
+        change_point_z: Optional[float] = None
+    ):
+        self.window_size = window_size or ANALYSIS_CONFIG['trend_window_size']
+        self.change_point_z = change_point_z or ANALYSIS_CONFIG['change_point_z']
+        self.time_based: Optional[bool] = None
+
+        # Welford/Chan 累计量：y 的均值与二阶矩，x 的均值与二阶矩，xy 协矩
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.mean_x = 0.0
+        self.m2_x = 0.0
+        self.c_xy = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.first: Optional[Tuple[float, float]] = None
+        self.last: Optional[Tuple[float, float]] = None
+
+        self.windows = deque(maxlen=max_windows or ANALYSIS_CONFIG['trend_max_windows'])
+        self.change_points = deque(maxlen=max_change_points or ANALYSIS_CONFIG['trend_max_change_points'])
+        self._first_window: Optional[Dict[str, float]] = None
+        self._last_window: Optional[Dict[str, float]] = None
+        # 未凑满一个窗口的数据点，最多 window_size - 1 个
+        self._buffer_x = np.empty(0)
+        self._buffer_y = np.empty(0)
+
+    def update(self, values: Any, timestamps: Any = None) -> "TrendEngine":
+        """加入一块数据；带时间戳时块内按时间排序，块之间需按时间顺序到达"""
+        y = np.asarray(values, dtype=np.float64)
+        time_based = timestamps is not None
+        if self.time_based is None:
+            self.time_based = time_based
+        elif self.time_based != time_based:
+            raise ValueError("不能混用带时间戳和不带时间戳的数据")
+
+        if time_based:
+            x = to_seconds(timestamps)
+            valid = ~np.isnan(x)
+            order = np.argsort(x[valid], kind='stable')
+            x, y = x[valid][order], y[valid][order]
+        else:
+            x = np.arange(self.count, self.count + len(y), dtype=np.float64)
+        if len(y) == 0:
+            return self
+
+        mean, mean_x = float(y.mean()), float(x.mean())
+        dy, dx = y - mean, x - mean_x
+        self._merge_moments(
+            len(y), mean, float(dy @ dy), mean_x, float(dx @ dx), float(dx @ dy),
+            y.min(), y.max(), (x[0], y[0]), (x[-1], y[-1])
+        )
+        self._add_windows(x, y)
+        return self
+
+    def update_records(self, records: List[Dict[str, Any]]) -> "TrendEngine":
+        """加入一块 {'value', 'timestamp'} 记录"""
+        if not records:
+            return self
+        values = np.fromiter((item.get('value', 0) for item in records), dtype=np.float64, count=len(records))
+        timestamps = [item.get('timestamp') for item in records] if 'timestamp' in records[0] else None
+        return self.update(values, timestamps)
+
+    async def consume(self, chunks: AsyncIterable[List[Dict[str, Any]]]) -> "TrendEngine":
+        """从异步数据流逐块加入记录"""
+        async for records in chunks:
+            self.update_records(records)
+        return self
+
+    def merge(self, other: "TrendEngine") -> "TrendEngine":
+        """合并另一分片的结果；不带时间戳时 other 视为紧接在本分片之后的数据"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(copy.deepcopy(other.__dict__))
+            return self
+        if self.time_based != other.time_based:
+            raise ValueError("不能合并带时间戳和不带时间戳的分片")
+
+        other = copy.deepcopy(other)
+        if not self.time_based:
+            other._shift(self.count)
+        left, right = (other, self) if other.first[0] < self.first[0] else (self, other)
+        merged = copy.deepcopy(left) if left is self else left
+
+        # 左分片尾部不足一个窗口的数据单独成窗，保证窗口按时间首尾相接
+        merged._flush_buffer()
+        merged._merge_moments(
+            right.count, right.mean, right.m2, right.mean_x, right.m2_x, right.c_xy,
+            right.min, right.max, right.first, right.last
+        )
+        if right._first_window is not None:
+            merged._link(merged._last_window, right._first_window)
+            merged.change_points.extend(right.change_points)
+            merged.windows.extend(right.windows)
+            merged._first_window = merged._first_window or right._first_window
+            merged._last_window = right._last_window
+        merged._buffer_x, merged._buffer_y = right._buffer_x, right._buffer_y
+
+        self.__dict__.update(merged.__dict__)
+        return self
+
+    @classmethod
+    def merge_all(cls, engines: List["TrendEngine"]) -> "TrendEngine":
+        result = cls()
+        for engine in engines:
+            result.merge(engine)
+        return result
+
+    def result(self) -> Dict[str, Any]:
+        """汇总统计量、整体趋势、窗口斜率和变点"""
+        if self.count == 0:
+            return {
+                'statistics': {'count': 0, 'mean': None, 'std': None, 'min': None, 'max': None},
+                'trend': 'unknown'
+            }
+
+        slope = self.c_xy / self.m2_x if self.m2_x > 0 else 0.0
+        if self.count < 2:
+            trend = 'unknown'
+        else:
+            trend = 'increasing' if slope > 0 else 'decreasing' if slope < 0 else 'stable'
+
+        return {
+            'statistics': {
+                'count': self.count,
+                'mean': self.mean,
+                'std': float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else None,
+                'min': self.min,
+                'max': self.max
+            },
+            'trend': trend,
+            'slope': slope,
+            'slope_unit': 'per_second' if self.time_based else 'per_point',
+            'first': {'position': self._position(self.first[0]), 'value': self.first[1]},
+            'last': {'position': self._position(self.last[0]), 'value': self.last[1]},
+            'windows': [
+                {**window, 'start': self._position(window['start']), 'end': self._position(window['end'])}
+                for window in self.windows
+            ],
+            'change_points': [
+                {**point, 'position': self._position(point['position'])}
+                for point in self.change_points
+            ]
+        }
+
+    def _merge_moments(
+        self,
+        count: int,
+        mean: float,
+        m2: float,
+        mean_x: float,
+        m2_x: float,
+        c_xy: float,
+        minimum: float,
+        maximum: float,
+        first: Tuple[float, float],
+        last: Tuple[float, float]
+    ):
+        total = self.count + count
+        delta = mean - self.mean
+        delta_x = mean_x - self.mean_x
+        weight = self.count * count / total
+        self.m2 += m2 + delta * delta * weight
+        self.m2_x += m2_x + delta_x * delta_x * weight
+        self.c_xy += c_xy + delta_x * delta * weight
+        self.mean += delta * count / total
+        self.mean_x += delta_x * count / total
+        self.count = total
+        self.min = min(self.min, float(minimum))
+        self.max = max(self.max, float(maximum))
+        if self.first is None or first[0] < self.first[0]:
+            self.first = (float(first[0]), float(first[1]))
+        if self.last is None or last[0] >= self.last[0]:
+            self.last = (float(last[0]), float(last[1]))
+
+    def _add_windows(self, x: np.ndarray, y: np.ndarray):
+        x = np.concatenate([self._buffer_x, x])
+        y = np.concatenate([self._buffer_y, y])
+        full = len(y) // self.window_size * self.window_size
+        if full:
+            self._close_windows(
+                x[:full].reshape(-1, self.window_size),
+                y[:full].reshape(-1, self.window_size)
+            )
+        self._buffer_x = x[full:].copy()
+        self._buffer_y = y[full:].copy()
+
+    def _flush_buffer(self):
+        if len(self._buffer_y) > 1:
+            self._close_windows(self._buffer_x[None, :], self._buffer_y[None, :])
+        self._buffer_x = np.empty(0)
+        self._buffer_y = np.empty(0)
+
+    def _close_windows(self, xs: np.ndarray, ys: np.ndarray):
+        """对若干完整窗口一次性计算均值、方差和回归斜率"""
+        mean_x = xs.mean(axis=1)
+        mean_y = ys.mean(axis=1)
+        dx = xs - mean_x[:, None]
+        dy = ys - mean_y[:, None]
+        sxx = np.einsum('ij,ij->i', dx, dx)
+        slopes = np.divide(np.einsum('ij,ij->i', dx, dy), sxx, out=np.zeros_like(sxx), where=sxx > 0)
+        variances = np.einsum('ij,ij->i', dy, dy) / xs.shape[1]
+
+        for start, end, mean, variance, slope in zip(
+            xs[:, 0].tolist(), xs[:, -1].tolist(), mean_y.tolist(), variances.tolist(), slopes.tolist()
+        ):
+            window = {
+                'start': start,
+                'end': end,
+                'count': xs.shape[1],
+                'mean': mean,
+                'variance': variance,
+                'slope': slope
+            }
+            self._link(self._last_window, window)
+            self.windows.append(window)
+            if self._first_window is None:
+                self._first_window = window
+            self._last_window = window
+
+    def _link(self, previous: Optional[Dict[str, float]], window: Dict[str, float]):
+        """相邻窗口均值差异的 z 检验，超过阈值记为变点"""
+        if previous is None:
+            return
+        diff = window['mean'] - previous['mean']
+        se = np.sqrt(previous['variance'] / previous['count'] + window['variance'] / window['count'])
+        if se > 0:
+            z = float(abs(diff) / se)
+            if z <= self.change_point_z:
+                return
+        elif diff == 0:
+            return
+        else:
+            z = None
+        self.change_points.append({
+            'position': window['start'],
+            'before': previous['mean'],
+            'after': window['mean'],
+            'z': z
+        })
+
+    def _shift(self, offset: float):
+        """不带时间戳的分片按序号平移"""
+        self.mean_x += offset
+        self.first = (self.first[0] + offset, self.first[1])
+        self.last = (self.last[0] + offset, self.last[1])
+        self._buffer_x = self._buffer_x + offset
+        windows = {id(window): window for window in [*self.windows, self._first_window, self._last_window] if window}
+        for window in windows.values():
+            window['start'] += offset
+            window['end'] += offset
+        for point in self.change_points:
+            point['position'] += offset
+
+    def _position(self, x: float) -> Any:
+        if self.time_based:
+            return datetime.fromtimestamp(x, tz=timezone.utc).isoformat()
+        return int(x)
+
+def to_seconds(timestamps: Any) -> np.ndarray:
+    """时间戳转换为 UTC 秒数，无法解析的记为 NaN；按时间差计算，不依赖索引的存储精度（ns/us）"""
+    index = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True, errors='coerce'))
+    return np.asarray((index - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1), dtype=np.float64)